@@ -0,0 +1,193 @@
+import ast
+import dataclasses
+import hashlib
+import importlib.metadata
+import json
+import subprocess
+from pathlib import Path
+
+CACHE_VERSION = 1
+
+
+def _module_file(parts: list[str], search_roots: list[Path]) -> Path | None:
+    """Resolves dotted module parts to a local source file, if there is one."""
+    if not parts:
+        return None
+    for search_root in search_roots:
+        module_path = search_root.joinpath(*parts)
+        for candidate in (module_path.with_suffix(".py"), module_path / "__init__.py"):
+            if candidate.is_file():
+                return candidate.resolve()
+    return None
+
+
+def _imported_modules(source_path: Path, package_parts: list[str]) -> list[list[str]]:
+    """Lists the dotted module names (as parts) imported by a source file."""
+    tree = ast.parse(source_path.read_bytes(), filename=str(source_path))
+    modules: list[list[str]] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name.split(".") for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package_parts[: len(package_parts) - node.level + 1]
+            else:
+                base = []
+            module = base + (node.module.split(".") if node.module else [])
+            modules.append(module)
+            # `from package import name` may refer to a submodule
+            modules.extend(module + [alias.name] for alias in node.names)
+    return modules
+
+
+def local_sources(contract_path: Path, root_path: Path) -> list[Path]:
+    """
+    Collects the contract file and every local module it (transitively) imports.
+    Modules are resolved against the project directory and the smart_contracts
+    directory, so `_`-prefixed helper folders are included as well.
+    """
+    project_root = root_path.parent.resolve()
+    search_roots = [project_root, root_path.resolve()]
+    pending = [contract_path.resolve()]
+    found: set[Path] = set()
+    while pending:
+        source_path = pending.pop()
+        if source_path in found:
+            continue
+        found.add(source_path)
+        try:
+            package_parts = list(source_path.parent.relative_to(project_root).parts)
+        except ValueError:
+            package_parts = []
+        for module in _imported_modules(source_path, package_parts):
+            module_file = _module_file(module, search_roots)
+            if module_file is not None and module_file not in found:
+                pending.append(module_file)
+    return sorted(found)
+
+
+def package_version(package: str) -> str:
+    """Returns the installed version of a package, or "unknown"."""
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def tool_versions(compile_command: list[str]) -> dict[str, str]:
+    """Returns the versions of the compiler and client generator used for a build."""
+    versions = {
+        package: package_version(package)
+        for package in ("puyapy", "algokit-client-generator")
+    }
+    if versions["puyapy"] == "unknown":
+        # Fall back to asking the compiler itself
+        try:
+            result = subprocess.run(
+                [*compile_command, "--version"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+        except OSError:
+            return versions
+        versions["puyapy"] = result.stdout.strip()
+    return versions
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclasses.dataclass
+class BuildCache:
+    """
+    Persistent record of the inputs each contract was last built from, together
+    with a fingerprint of the artifacts that build produced.
+    """
+
+    path: Path
+    entries: dict[str, dict] = dataclasses.field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "BuildCache":
+        """Loads the cache from disk, starting empty if it is missing or stale."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls(path=path)
+        if data.get("version") != CACHE_VERSION:
+            return cls(path=path)
+        return cls(path=path, entries=data.get("contracts", {}))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self.path.write_text(
+            json.dumps(
+                {"version": CACHE_VERSION, "contracts": self.entries},
+                indent=2,
+                sort_keys=True,
+            )
+        )
+
+    @staticmethod
+    def compute_key(
+        contract_path: Path,
+        root_path: Path,
+        versions: dict[str, str],
+        compile_flags: list[str],
+    ) -> str:
+        """Hashes every input that can change the output of a contract build."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(versions, sort_keys=True).encode())
+        digest.update(json.dumps(compile_flags).encode())
+        project_root = root_path.parent.resolve()
+        for source_path in local_sources(contract_path, root_path):
+            digest.update(str(source_path.relative_to(project_root)).encode())
+            digest.update(source_path.read_bytes())
+        return digest.hexdigest()
+
+    def is_fresh(self, name: str, key: str, output_dir: Path) -> bool:
+        """Checks that the recorded build matches `key` and its outputs are intact."""
+        entry = self.entries.get(name)
+        if entry is None or entry.get("key") != key:
+            return False
+        outputs: dict[str, str] = entry.get("outputs", {})
+        if not outputs:
+            return False
+        for file_name, file_hash in outputs.items():
+            output_file = output_dir / file_name
+            if not output_file.is_file() or _hash_file(output_file) != file_hash:
+                return False
+        return True
+
+    def record(self, name: str, key: str, output_dir: Path) -> None:
+        """Stores the key and output fingerprint of a successful build."""
+        self.entries[name] = {
+            "key": key,
+            "timings": self.entries.get(name, {}).get("timings", {}),
+            "sizes": self.entries.get(name, {}).get("sizes", {}),
+            "outputs": {
+                file.name: _hash_file(file)
+                for file in sorted(output_dir.iterdir())
+                if file.is_file()
+            },
+        }
+
+    def timing(self, name: str, mode: str) -> float | None:
+        """Returns how long the last build of a contract in `mode` took, if known."""
+        return self.entries.get(name, {}).get("timings", {}).get(mode)
+
+    def record_timing(self, name: str, mode: str, seconds: float) -> None:
+        self.entries[name].setdefault("timings", {})[mode] = round(seconds, 3)
+
+    def sizes(self, name: str, profile: str) -> dict[str, dict[str, int]] | None:
+        """Returns the program sizes of the last build of a contract in `profile`."""
+        return self.entries.get(name, {}).get("sizes", {}).get(profile)
+
+    def record_sizes(
+        self, name: str, profile: str, sizes: dict[str, dict[str, int]]
+    ) -> None:
+        self.entries[name].setdefault("sizes", {})[profile] = sizes
@@ -0,0 +1,328 @@
+"""
+Measures what each ABI method of the contracts costs to run, through simulate.
+
+Usage: python -m smart_contracts._helpers.cost_benchmark [CONTRACT...]
+[--check] [--threshold FRACTION]
+
+Each contract folder with a `benchmark_config.py` describes how to create its
+app, the calls that set up representative state, and the calls to measure.
+Against the network configured in .env (normally LocalNet) every contract is
+created afresh, funded and set up, then each benchmark call is simulated
+against that state. Opcode cost, log bytes, minimum fee (including inner
+transactions) and box accesses are recorded per call, program size and pages
+per contract, into `smart_contracts/artifacts/cost_baseline.json`.
+
+With --check the baseline is left untouched and the run exits non-zero when a
+metric grew by more than --threshold (5% by default) compared to it, and when
+the baseline is missing, from another BASELINE_VERSION, or lacks a measured
+contract, method or metric, so an unrecorded change can't pass unnoticed.
+"""
+
+import argparse
+import base64
+import dataclasses
+import importlib
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from smart_contracts._helpers import session
+
+if TYPE_CHECKING:
+    import algokit_utils
+
+root_path = Path(__file__).parents[1]
+baseline_path = root_path / "artifacts" / "cost_baseline.json"
+
+BASELINE_VERSION = 1
+MAX_PROGRAM_PAGE_SIZE = 2048
+
+
+@dataclasses.dataclass
+class BenchmarkContext:
+    """Accounts and app available to benchmark arguments."""
+
+    deployer: str
+    other: str
+    app_id: int = 0
+    app_address: str = ""
+
+
+Args = list[Any] | Callable[[BenchmarkContext], list[Any]]
+
+
+@dataclasses.dataclass
+class MethodCall:
+    """An ABI method call; `name` distinguishes several benchmarks of one method."""
+
+    method: str
+    args: Args = dataclasses.field(default_factory=list)
+    name: str | None = None
+    inner_transactions: int = 0
+
+    @property
+    def label(self) -> str:
+        return self.name or self.method
+
+    def resolve_args(self, context: BenchmarkContext) -> list[Any]:
+        return self.args(context) if callable(self.args) else list(self.args)
+
+
+def _count_inner_transactions(txn_result: dict) -> int:
+    inner = txn_result.get("inner-txns", [])
+    return len(inner) + sum(_count_inner_transactions(txn) for txn in inner)
+
+
+def _box_writes(trace: dict) -> int:
+    writes = 0
+    for step in trace.get("approval-program-trace", []):
+        writes += sum(
+            1
+            for change in step.get("state-changes", [])
+            if change.get("app-state-type") == "b"
+        )
+    for inner_trace in trace.get("inner-trace", []):
+        writes += _box_writes(inner_trace)
+    return writes
+
+
+def measure(simulate_response: dict, min_fee: int) -> dict[str, int]:
+    """
+    Extracts the cost metrics of the app call in a simulate response. It is the
+    last transaction of its group, after any transactions passed as arguments.
+    """
+    group = simulate_response["txn-groups"][0]
+    result = group["txn-results"][-1]
+    txn_result = result["txn-result"]
+    accessed = [
+        result.get("unnamed-resources-accessed", {}),
+        group.get("unnamed-resources-accessed", {}),
+    ]
+    return {
+        "opcode_cost": int(result.get("app-budget-consumed", 0)),
+        "log_bytes": sum(
+            len(base64.b64decode(log)) for log in txn_result.get("logs", [])
+        ),
+        "min_fee": min_fee * (1 + _count_inner_transactions(txn_result)),
+        "boxes_accessed": sum(
+            len(resources.get("boxes", [])) for resources in accessed
+        ),
+        "box_writes": _box_writes(result.get("exec-trace", {})),
+    }
+
+
+def benchmark_contract(name: str) -> dict[str, Any]:
+    """Creates, funds and sets up a fresh app of a contract and measures each call."""
+    import algokit_utils
+    from algosdk.v2client.models import SimulateTraceConfig
+
+    config = importlib.import_module(f"{root_path.name}.{name}.benchmark_config")
+    algorand = session.algorand_client()
+    deployer = session.deployer_account()
+    min_fee = algorand.get_suggested_params().min_fee
+
+    other = algorand.account.random()
+    algorand.send.payment(
+        algokit_utils.PaymentParams(
+            sender=deployer.address,
+            receiver=other.address,
+            amount=algokit_utils.AlgoAmount(algo=1),
+        )
+    )
+    context = BenchmarkContext(deployer=deployer.address, other=other.address)
+
+    app_spec_path = next((root_path / "artifacts" / name).glob("*.arc56.json"))
+    factory = algorand.client.get_app_factory(
+        app_spec=app_spec_path.read_text(), default_sender=deployer.address
+    )
+    create: MethodCall | None = getattr(config, "create", None)
+    app_client: algokit_utils.AppClient
+    if create is None:
+        app_client, _ = factory.send.bare.create()
+    else:
+        app_client, _ = factory.send.create(
+            algokit_utils.AppFactoryCreateMethodCallParams(
+                method=create.method, args=create.resolve_args(context)
+            )
+        )
+    context.app_id = app_client.app_id
+    context.app_address = app_client.app_address
+    algorand.send.payment(
+        algokit_utils.PaymentParams(
+            sender=deployer.address,
+            receiver=app_client.app_address,
+            amount=algokit_utils.AlgoAmount(algo=10),
+        )
+    )
+
+    app = algorand.app.get_by_id(app_client.app_id)
+    program_bytes = len(app.approval_program) + len(app.clear_state_program)
+    costs: dict[str, Any] = {
+        "approval_program_bytes": len(app.approval_program),
+        "clear_program_bytes": len(app.clear_state_program),
+        "pages": -(-program_bytes // MAX_PROGRAM_PAGE_SIZE),
+        "methods": {},
+    }
+
+    for call in getattr(config, "setup", []):
+        app_client.send.call(
+            algokit_utils.AppClientMethodCallParams(
+                method=call.method,
+                args=call.resolve_args(context),
+                extra_fee=algokit_utils.AlgoAmount(
+                    micro_algo=min_fee * call.inner_transactions
+                ),
+            )
+        )
+
+    for call in config.benchmarks:
+        result = (
+            algorand.new_group()
+            .add_app_call_method_call(
+                app_client.params.call(
+                    algokit_utils.AppClientMethodCallParams(
+                        method=call.method,
+                        args=call.resolve_args(context),
+                        extra_fee=algokit_utils.AlgoAmount(
+                            micro_algo=min_fee * call.inner_transactions
+                        ),
+                    )
+                )
+            )
+            .simulate(
+                allow_unnamed_resources=True,
+                skip_signatures=True,
+                exec_trace_config=SimulateTraceConfig(enable=True, state_change=True),
+            )
+        )
+        assert result.simulate_response is not None
+        costs["methods"][call.label] = measure(result.simulate_response, min_fee)
+    return costs
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """
+    Lists every metric that grew by more than `threshold` over the baseline, and
+    every contract, method or metric the baseline has no value for.
+    """
+    regressions: list[str] = []
+
+    def check(label: str, before: Any, after: Any) -> None:
+        if not isinstance(before, int):
+            regressions.append(f"{label}: not in the baseline")
+        elif after > before * (1 + threshold):
+            regressions.append(f"{label}: {before} -> {after}")
+
+    for contract_name, costs in current.items():
+        previous = baseline.get(contract_name)
+        if previous is None:
+            regressions.append(f"{contract_name}: not in the baseline")
+            continue
+        for metric, value in costs.items():
+            if metric != "methods":
+                check(f"{contract_name} {metric}", previous.get(metric), value)
+        for method, metrics in costs["methods"].items():
+            previous_metrics = previous.get("methods", {}).get(method)
+            if previous_metrics is None:
+                regressions.append(f"{contract_name}.{method}: not in the baseline")
+                continue
+            for metric, value in metrics.items():
+                check(
+                    f"{contract_name}.{method} {metric}",
+                    previous_metrics.get(metric),
+                    value,
+                )
+    return regressions
+
+
+def _benchmarked_contracts() -> list[str]:
+    return sorted(
+        folder.name
+        for folder in root_path.iterdir()
+        if folder.is_dir()
+        and not folder.name.startswith("_")
+        and (folder / "benchmark_config.py").exists()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts._helpers.cost_benchmark"
+    )
+    parser.add_argument("contracts", nargs="*")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Compare against the baseline instead of updating it",
+    )
+    parser.add_argument("--threshold", type=float, default=0.05)
+    options = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    try:
+        baseline = json.loads(baseline_path.read_text())
+    except (OSError, ValueError) as ex:
+        if options.check:
+            sys.exit(
+                f"No readable cost baseline at {baseline_path} ({ex}); record one "
+                "by running without --check"
+            )
+        baseline = {}
+    if baseline.get("version") == BASELINE_VERSION:
+        baseline_contracts: dict[str, Any] = baseline.get("contracts", {})
+    elif options.check:
+        sys.exit(
+            f"The cost baseline is version {baseline.get('version')}, not "
+            f"{BASELINE_VERSION}; record it again by running without --check"
+        )
+    else:
+        baseline_contracts = {}
+
+    current = {
+        name: benchmark_contract(name)
+        for name in options.contracts or _benchmarked_contracts()
+    }
+    for contract_name, costs in current.items():
+        print(
+            f"{contract_name}: {costs['approval_program_bytes']} + "
+            f"{costs['clear_program_bytes']} program bytes, {costs['pages']} page(s)"
+        )
+        for method, metrics in costs["methods"].items():
+            print(
+                f"  {method:<32} "
+                + "  ".join(f"{metric} {value}" for metric, value in metrics.items())
+            )
+
+    if options.check:
+        regressions = compare(baseline_contracts, current, options.threshold)
+        if regressions:
+            print(
+                f"Cost regressions over {options.threshold:.0%}, or missing from "
+                "the baseline (record them by running without --check):"
+            )
+            print("\n".join(f"  {regression}" for regression in regressions))
+            sys.exit(1)
+        print("No cost regressions")
+        return
+
+    baseline_contracts.update(current)
+    baseline_path.parent.mkdir(exist_ok=True, parents=True)
+    baseline_path.write_text(
+        json.dumps(
+            {"version": BASELINE_VERSION, "contracts": baseline_contracts},
+            indent=2,
+            sort_keys=True,
+        )
+        + "\n"
+    )
+    print(f"Baseline written to {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+MANIFEST_VERSION = 2
+# Build output, whose mtime changes with every build's staging folder
+ARTIFACTS_FOLDER = "artifacts"
+
+
+def _scan(root_path: Path) -> dict:
+    """Lists every contract folder under `root_path`, without importing anything."""
+    folders: dict[str, int] = {}
+    contracts: list[dict[str, str | bool]] = []
+    for folder in sorted(root_path.iterdir()):
+        # Exclude folders that start with '_' (internal helpers).
+        if (
+            not folder.is_dir()
+            or folder.name.startswith("_")
+            or folder.name == ARTIFACTS_FOLDER
+            or not (folder / "contract.py").exists()
+        ):
+            continue
+        folders[folder.name] = folder.stat().st_mtime_ns
+        contracts.append(
+            {
+                "name": folder.name,
+                "has_deploy_config": (folder / "deploy_config.py").exists(),
+            }
+        )
+    return {
+        "version": MANIFEST_VERSION,
+        "root_mtime_ns": root_path.stat().st_mtime_ns,
+        "folders": folders,
+        "contracts": contracts,
+    }
+
+
+def _is_current(manifest: dict, root_path: Path) -> bool:
+    """
+    Checks a manifest against directory mtimes: adding or removing a folder
+    changes the root's mtime, and removing a contract.py or adding or removing a
+    deploy_config.py changes the mtime of its contract folder. Only contract
+    folders are tracked, so builds writing to artifacts/ don't invalidate the
+    manifest. A contract.py added to an existing non-contract folder is only
+    picked up once the manifest is rescanned, e.g. after deleting it.
+    """
+    if manifest.get("version") != MANIFEST_VERSION:
+        return False
+    if manifest.get("root_mtime_ns") != root_path.stat().st_mtime_ns:
+        return False
+    for name, mtime_ns in manifest.get("folders", {}).items():
+        try:
+            if (root_path / name).stat().st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def discover_contracts(
+    root_path: Path, manifest_path: Path
+) -> list[dict[str, str | bool]]:
+    """
+    Returns the name of each contract folder and whether it has a deploy_config,
+    reusing the cached manifest while the directory mtimes still match it.
+    """
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        if _is_current(manifest, root_path):
+            return manifest["contracts"]  # type: ignore[no-any-return]
+    except (OSError, ValueError, KeyError):
+        pass
+    manifest = _scan(root_path)
+    try:
+        manifest_path.parent.mkdir(exist_ok=True, parents=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+    except OSError:
+        pass  # the manifest is only an optimisation
+    return manifest["contracts"]  # type: ignore[no-any-return]
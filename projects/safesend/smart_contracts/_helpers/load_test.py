@@ -0,0 +1,177 @@
+"""
+Drives the algopy contracts through many calls in-process, with no network.
+
+Usage: python -m smart_contracts._helpers.load_test [SCENARIO...] [--calls N]
+[--seed S] [--processes P] [--min-calls-per-second R]
+
+Each contract folder with a `load_test_config.py` lists its scenarios, named
+`<contract>.<scenario>` on the command line. A scenario runs in a fresh
+algorand-python-testing context, which emulates the ledger (accounts, balances,
+app state and boxes) in memory. Accounts, balances and arguments all derive
+from --seed, so two runs with the same seed make the same calls and end with
+the same result.
+
+The emulator runs the contracts' Python directly, so calls per second measure
+contract logic and state layout, not TEAL opcode cost; see `cost_benchmark`
+for that. It is CPU bound, so --processes splits each scenario over worker
+processes, each with its own app and accounts.
+"""
+
+import argparse
+import dataclasses
+import importlib
+import random
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+root_path = Path(__file__).parents[1]
+
+# Transaction groups accumulate in the testing context; dropping them every so
+# often keeps memory flat over long runs without touching ledger state
+CLEAR_TRANSACTIONS_EVERY = 1_000
+ACCOUNT_BALANCE = 100_000_000_000
+
+
+@dataclasses.dataclass
+class Scenario:
+    """
+    A load test. `setup` receives the testing context and a seeded Random,
+    creates and funds its app, and returns the call to repeat: given the call
+    number it makes one contract call and returns an int, summed into the
+    scenario's result.
+    """
+
+    name: str
+    setup: Callable[[Any, random.Random], Callable[[int], int]]
+    calls: int = 100_000
+
+
+def deterministic_addresses(rng: random.Random, count: int) -> list[str]:
+    from algosdk.encoding import encode_address
+
+    return [encode_address(rng.randbytes(32)) for _ in range(count)]
+
+
+def fund(context: Any, *addresses: Any) -> None:
+    """Sets the balance of each address or Account on the emulated ledger."""
+    from algopy import UInt64
+
+    for address in addresses:
+        context.ledger.update_account(address, balance=UInt64(ACCOUNT_BALANCE))
+
+
+def load_scenarios() -> dict[str, Scenario]:
+    scenarios: dict[str, Scenario] = {}
+    for folder in sorted(root_path.iterdir()):
+        if (
+            not folder.is_dir()
+            or folder.name.startswith("_")
+            or not (folder / "load_test_config.py").exists()
+        ):
+            continue
+        config = importlib.import_module(
+            f"{root_path.name}.{folder.name}.load_test_config"
+        )
+        for scenario in config.scenarios:
+            scenarios[f"{folder.name}.{scenario.name}"] = scenario
+    return scenarios
+
+
+def run_worker(name: str, calls: int, seed: int, worker: int) -> tuple[float, int]:
+    """
+    Runs one worker's share of a scenario in a fresh testing context. Returns
+    the time its calls took, excluding setup, and its result.
+    """
+    from algopy_testing import algopy_testing_context
+
+    scenario = load_scenarios()[name]
+    rng = random.Random(f"{seed}/{name}/{worker}")
+    (owner,) = deterministic_addresses(rng, 1)
+    with algopy_testing_context(default_sender=owner) as context:
+        fund(context, owner)
+        call = scenario.setup(context, rng)
+        context.clear_transaction_context()
+        result = 0
+        start = time.perf_counter()
+        for number in range(calls):
+            result += call(number)
+            if number % CLEAR_TRANSACTIONS_EVERY == CLEAR_TRANSACTIONS_EVERY - 1:
+                context.clear_transaction_context()
+        return time.perf_counter() - start, result
+
+
+def run_scenario(name: str, calls: int, seed: int, processes: int) -> tuple[float, int]:
+    """
+    Splits a scenario's calls over `processes` workers. Returns the slowest
+    worker's time and the summed results, which are identical for runs with
+    the same seed and number of processes.
+    """
+    if processes == 1:
+        return run_worker(name, calls, seed, 0)
+    shares = [
+        calls // processes + (worker < calls % processes) for worker in range(processes)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(run_worker, name, share, seed, worker)
+            for worker, share in enumerate(shares)
+        ]
+        results = [future.result() for future in futures]
+    return max(elapsed for elapsed, _ in results), sum(result for _, result in results)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts._helpers.load_test"
+    )
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO")
+    parser.add_argument(
+        "--calls",
+        type=int,
+        default=None,
+        help="Calls per scenario, instead of each scenario's default",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=1,
+        help="Split each scenario's calls over this many processes",
+    )
+    parser.add_argument("--min-calls-per-second", type=float, default=None)
+    options = parser.parse_args()
+
+    scenarios = load_scenarios()
+    unknown = sorted(set(options.scenarios) - set(scenarios))
+    if unknown:
+        parser.error(
+            f"unknown scenario(s) {', '.join(unknown)}, "
+            f"choose from {', '.join(scenarios)}"
+        )
+
+    too_slow = []
+    for name in options.scenarios or scenarios:
+        calls = options.calls or scenarios[name].calls
+        elapsed, result = run_scenario(name, calls, options.seed, options.processes)
+        rate = calls / elapsed
+        print(
+            f"{name}: {calls} calls in {elapsed:.2f}s, "
+            f"{rate:,.0f} calls/s (result {result})"
+        )
+        if options.min_calls_per_second is not None:
+            if rate < options.min_calls_per_second:
+                too_slow.append(name)
+    if too_slow:
+        print(
+            f"Below {options.min_calls_per_second:,.0f} calls/s: {', '.join(too_slow)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
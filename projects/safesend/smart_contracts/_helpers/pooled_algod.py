@@ -0,0 +1,253 @@
+"""
+An algod client that keeps its HTTP connections open, retries transient
+failures and caches suggested params by round.
+
+algosdk's AlgodClient opens a new connection (and TLS handshake) for every
+request. This subclass keeps one persistent connection per thread instead, so
+concurrent deployments don't share a socket. Failures are retried up to
+MAX_RETRIES times after a randomized exponential delay ("full jitter"), so that
+clients hitting the same overloaded node don't retry in lockstep. Only requests
+that are safe to repeat are retried: GETs after connection errors and the
+statuses in TRANSIENT_STATUSES, and other requests, such as POSTs sending
+transactions, only when connecting failed or with the UNPROCESSED_STATUSES, so
+a transaction algod may already have accepted is never sent twice. A request
+that fails on a kept-alive connection before any response arrives is resent
+once on a new connection, whatever its method: algod closes idle connections,
+and a request written to one of those never reached it.
+
+Suggested params are reused until the chain has moved SUGGESTED_PARAMS_TTL_ROUNDS
+rounds past the ones they were fetched at, well inside the default ten round
+validity window. Rounds are learned for free from the `last-round` and
+`confirmed-round` fields of responses; SUGGESTED_PARAMS_MAX_AGE bounds the
+reuse when no response has carried a round for a while.
+
+`compile` answers from `prebuilt_programs` (see `prebuilt`) when the TEAL is
+one the build already assembled, with its source map from `prebuilt_source_maps`
+when one was generated (see `source_maps`).
+"""
+
+import base64
+import copy
+import hashlib
+import http.client
+import json
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib import parse
+
+from algosdk import constants, error, logic
+from algosdk.transaction import SuggestedParams
+from algosdk.v2client import algod
+
+from smart_contracts._helpers.session import NetworkStats
+
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.25
+RETRY_MAX_DELAY = 4.0
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+# Too many requests, and gateway or node errors, which idempotent requests are
+# retried on
+TRANSIENT_STATUSES = {429, 502, 503, 504}
+# Of those, the ones that mean the request was turned away before it was
+# processed, which any request is retried on. A gateway error may come after
+# algod accepted a transaction
+UNPROCESSED_STATUSES = {429, 503}
+
+SUGGESTED_PARAMS_TTL_ROUNDS = 4
+# About four MainNet rounds
+SUGGESTED_PARAMS_MAX_AGE = 12.0
+
+# Prebuilt programs without a generated source map get an empty one
+EMPTY_SOURCE_MAP = {"version": 3, "sources": [], "names": [], "mappings": ""}
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: dict[str, str] | None = None,
+        stats: NetworkStats | None = None,
+    ):
+        super().__init__(algod_token, algod_address, headers)
+        address = parse.urlsplit(algod_address)
+        self._https = address.scheme == "https"
+        self._host = address.netloc
+        self._base_path = address.path.rstrip("/")
+        self._connections = threading.local()
+        self._lock = threading.Lock()
+        self._suggested_params: SuggestedParams | None = None
+        self._suggested_params_fetched_at = 0.0
+        self.stats = stats or NetworkStats()
+        self.latest_round = 0
+        # Called with the raw bytes of each signed group algod accepted
+        self.on_send: Callable[[bytes], None] | None = None
+        # Bytecode by SHA-256 of the TEAL it was assembled from
+        self.prebuilt_programs: dict[str, bytes] = {}
+        self.prebuilt_source_maps: dict[str, dict[str, Any]] = {}
+
+    def _connection(self, timeout: float | None) -> http.client.HTTPConnection:
+        connection: http.client.HTTPConnection | None = getattr(
+            self._connections, "connection", None
+        )
+        if connection is None:
+            connection_class = (
+                http.client.HTTPSConnection
+                if self._https
+                else http.client.HTTPConnection
+            )
+            connection = connection_class(self._host, timeout=timeout)
+            self._connections.connection = connection
+            self.stats.add(connections=1)
+        else:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+        return connection
+
+    def _close_connection(self) -> None:
+        connection = getattr(self._connections, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._connections.connection = None
+
+    def _observe_round(self, response: Any) -> None:
+        if isinstance(response, dict):
+            round_ = response.get("last-round") or response.get("confirmed-round")
+            if isinstance(round_, int) and round_ > self.latest_round:
+                with self._lock:
+                    self.latest_round = max(self.latest_round, round_)
+
+    def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: algod.ParamsType | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        response_format: str | None = "json",
+        timeout: int | None = 30,
+    ) -> algod.AlgodResponseType:
+        # Same headers and URL as AlgodClient.algod_request
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+        path = self._base_path + requrl
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retried_statuses = TRANSIENT_STATUSES if idempotent else UNPROCESSED_STATUSES
+        attempt = 0
+        while True:
+            self.stats.add(requests=1)
+            sent = False
+            try:
+                connection = self._connection(timeout)
+                reused = connection.sock is not None
+                if not reused:
+                    connection.connect()
+                # Past this point the request may have reached algod
+                sent = True
+                try:
+                    connection.request(method, path, body=data, headers=header)
+                    response = connection.getresponse()
+                except ConnectionError:
+                    # Writing to a connection algod closed while it was idle
+                    # fails, or the connection is closed without a response
+                    if not reused:
+                        raise
+                    self._close_connection()
+                    self.stats.add(requests=1)
+                    sent = False
+                    connection = self._connection(timeout)
+                    connection.connect()
+                    sent = True
+                    connection.request(method, path, body=data, headers=header)
+                    response = connection.getresponse()
+                body = response.read()
+                if response.will_close:
+                    self._close_connection()
+            except (OSError, http.client.HTTPException):
+                self._close_connection()
+                if attempt >= MAX_RETRIES or (sent and not idempotent):
+                    raise
+            else:
+                if response.status not in retried_statuses or attempt >= MAX_RETRIES:
+                    break
+            attempt += 1
+            self.stats.add(retries=1)
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+            time.sleep(random.uniform(0, delay))
+
+        if response.status >= 400:
+            text = body.decode("utf-8", errors="replace")
+            try:
+                details = json.loads(text)
+            except ValueError:
+                raise error.AlgodHTTPError(text, response.status) from None
+            raise error.AlgodHTTPError(
+                details.get("message", text), response.status, details.get("data")
+            )
+        if response_format != "json":
+            return body
+        if not body:
+            # Some algod responses are a 200 OK with an empty body
+            return {}
+        try:
+            result = json.loads(body)
+        except ValueError as ex:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from ex
+        self._observe_round(result)
+        return result
+
+    def compile(
+        self, source: str, source_map: bool = False, **kwargs: Any
+    ) -> dict[str, Any]:
+        key = hashlib.sha256(source.encode()).hexdigest()
+        bytecode = self.prebuilt_programs.get(key)
+        if bytecode is None:
+            return super().compile(source, source_map, **kwargs)
+        self.stats.add(prebuilt_compiles=1)
+        result: dict[str, Any] = {
+            "hash": logic.address(bytecode),
+            "result": base64.b64encode(bytecode).decode(),
+        }
+        if source_map:
+            result["sourcemap"] = self.prebuilt_source_maps.get(key, EMPTY_SOURCE_MAP)
+        return result
+
+    def send_raw_transaction(self, txn: bytes | str, **kwargs: Any) -> str:
+        txid = super().send_raw_transaction(txn, **kwargs)
+        if self.on_send is not None:
+            self.on_send(base64.b64decode(txn))
+        return txid
+
+    def suggested_params(self, **kwargs: Any) -> SuggestedParams:
+        with self._lock:
+            cached = self._suggested_params
+            if (
+                cached is not None
+                and self.latest_round < cached.first + SUGGESTED_PARAMS_TTL_ROUNDS
+                and time.monotonic() - self._suggested_params_fetched_at
+                < SUGGESTED_PARAMS_MAX_AGE
+            ):
+                self.stats.add(suggested_params_hits=1)
+                return copy.deepcopy(cached)
+        suggested_params = super().suggested_params(**kwargs)
+        self.stats.add(suggested_params_fetches=1)
+        with self._lock:
+            self._suggested_params = suggested_params
+            self._suggested_params_fetched_at = time.monotonic()
+        return copy.deepcopy(suggested_params)
@@ -0,0 +1,150 @@
+"""
+Network state shared by every deployment in one `python -m smart_contracts` run,
+and by the operational scripts.
+
+A single AlgorandClient, and with it one set of algod/indexer/kmd clients, one
+suggested params cache and one signer registry, is created on first use and
+passed to each `deploy_config.deploy` together with the deployer account, so
+contracts deployed in the same run (including concurrently) share them.
+
+Its algod client is a `PooledAlgodClient`: connections stay open between
+requests, transient failures are retried with jittered backoff and suggested
+params are cached by round (see `pooled_algod`). `stats()` counts what that
+saved. TRACE_SAMPLE_RATE turns on sampled trace capture (see `tracing`).
+"""
+
+import atexit
+import dataclasses
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from smart_contracts._helpers import profiling
+
+if TYPE_CHECKING:
+    from algokit_utils import AlgorandClient, SigningAccount
+
+DEPLOYER_ACCOUNT_NAME = "DEPLOYER"
+# Seconds to let queued sampled traces finish when the process exits
+TRACE_FLUSH_TIMEOUT = 30.0
+
+_lock = threading.Lock()
+_algorand: "AlgorandClient | None" = None
+_deployer: "SigningAccount | None" = None
+_genesis_hash: str | None = None
+
+
+@dataclasses.dataclass
+class NetworkStats:
+    """Counters of the shared algod client's requests and what it avoided."""
+
+    requests: int = 0
+    connections: int = 0
+    retries: int = 0
+    suggested_params_fetches: int = 0
+    suggested_params_hits: int = 0
+    # Compiles answered with bytecode from the build instead of by algod
+    prebuilt_compiles: int = 0
+    _lock: threading.Lock = dataclasses.field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} algod request(s) over {self.connections} "
+            f"connection(s), {self.retries} retried; suggested params "
+            f"{self.suggested_params_hits} cached, "
+            f"{self.suggested_params_fetches} fetched; "
+            f"{self.prebuilt_compiles} program(s) from prebuilt bytecode"
+        )
+
+
+_stats = NetworkStats()
+
+
+def stats() -> NetworkStats:
+    return _stats
+
+
+def _create_algorand_client() -> "AlgorandClient":
+    import algokit_utils
+    from algokit_utils import ClientManager
+
+    from smart_contracts._helpers.pooled_algod import PooledAlgodClient
+
+    configs = ClientManager.get_config_from_environment_or_localnet()
+    algod_config = configs.algod_config
+    algod = PooledAlgodClient(
+        algod_token=algod_config.token or "",
+        algod_address=algod_config.full_url(),
+        headers={"X-Algo-API-Token": algod_config.token or ""},
+        stats=_stats,
+    )
+    trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE") or 0)
+    if trace_sample_rate > 0:
+        from smart_contracts._helpers import tracing
+
+        sampler = tracing.TraceSampler(
+            algod,
+            trace_sample_rate,
+            buffer_size_mb=float(
+                os.getenv("TRACE_BUFFER_SIZE_MB") or tracing.DEFAULT_BUFFER_SIZE_MB
+            ),
+        )
+        algod.on_send = sampler.offer
+        atexit.register(sampler.flush, TRACE_FLUSH_TIMEOUT)
+    # The algod client caches suggested params by round, so the time-based
+    # cache AlgorandClient keeps in front of it is turned off
+    return algokit_utils.AlgorandClient.from_clients(
+        algod=algod,
+        indexer=(
+            ClientManager.get_indexer_client(configs.indexer_config)
+            if configs.indexer_config
+            else None
+        ),
+        kmd=(
+            ClientManager.get_kmd_client(configs.kmd_config)
+            if configs.kmd_config
+            else None
+        ),
+    ).set_suggested_params_cache_timeout(0)
+
+
+def algorand_client() -> "AlgorandClient":
+    """Returns the shared AlgorandClient, creating it from the environment once."""
+    global _algorand
+    with _lock:
+        if _algorand is None:
+            with profiling.phase("AlgorandClient.from_environment"):
+                _algorand = _create_algorand_client()
+        return _algorand
+
+
+def deployer_account() -> "SigningAccount":
+    """
+    Returns the shared deployer account. It is resolved once, so concurrent
+    deployments on LocalNet don't race to create the DEPLOYER KMD wallet.
+    """
+    global _deployer
+    algorand = algorand_client()
+    with _lock:
+        if _deployer is None:
+            with profiling.phase("deployer account"):
+                _deployer = algorand.account.from_environment(DEPLOYER_ACCOUNT_NAME)
+        return _deployer
+
+
+def genesis_hash() -> str:
+    """Returns the genesis hash of the network the shared client targets, fetched once."""
+    global _genesis_hash
+    algorand = algorand_client()
+    with _lock:
+        if _genesis_hash is None:
+            # Also primes the client's suggested params cache for the first transaction
+            _genesis_hash = str(algorand.get_suggested_params().gh)
+        return _genesis_hash
@@ -0,0 +1,63 @@
+"""
+Measures how long `python -m smart_contracts` takes to start and finish a run.
+
+Usage: python -m smart_contracts._helpers.startup_benchmark [--runs N]
+[--max-seconds S] [-- ARGS...]
+
+ARGS default to `--help`, which times module import and contract discovery
+alone. Pass e.g. `-- build my_contract` to time a warm, fully cached build.
+With --max-seconds the benchmark exits non-zero when the median run is slower,
+so it can guard against startup regressions in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parents[2]
+
+
+def time_run(args: list[str]) -> float:
+    """Runs `python -m smart_contracts ARGS` once and returns its wall time."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "smart_contracts", *args],
+        cwd=project_root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        raise Exception(f"`smart_contracts {' '.join(args)}` failed:\n{result.stdout}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts._helpers.startup_benchmark"
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    parser.add_argument("args", nargs="*", default=["--help"])
+    options = parser.parse_args()
+
+    # The first run warms the discovery manifest, build cache and OS file cache
+    time_run(options.args)
+    timings = [time_run(options.args) for _ in range(options.runs)]
+    median = statistics.median(timings)
+    print(
+        f"smart_contracts {' '.join(options.args)}: "
+        f"min {min(timings):.3f}s, median {median:.3f}s, max {max(timings):.3f}s "
+        f"over {options.runs} runs"
+    )
+    if options.max_seconds is not None and median > options.max_seconds:
+        print(f"Median startup exceeds {options.max_seconds:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
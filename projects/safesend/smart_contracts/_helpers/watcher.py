@@ -0,0 +1,170 @@
+"""
+Minimal file watching for `python -m smart_contracts watch`.
+
+Uses Linux inotify through ctypes when it is available and falls back to
+polling file mtimes elsewhere, so no extra dependency is needed.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_IGNORED = 0x8000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_source(path: Path) -> bool:
+    return path.suffix == ".py" and "__pycache__" not in path.parts
+
+
+class InotifyWatcher:
+    """Reports changed source files in a set of directories using inotify."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: dict[int, Path] = {}
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        """
+        Starts watching any of `directories` not already watched. Directories
+        that no longer exist are skipped; watching them again once they are
+        recreated is up to a later call.
+        """
+        watched = set(self._directories.values())
+        for directory in directories:
+            if directory in watched:
+                continue
+            descriptor = self._add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if descriptor < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                raise OSError(error, f"Could not watch {directory}")
+            self._directories[descriptor] = directory
+
+    def poll(self, timeout: float | None) -> set[Path]:
+        """Waits up to `timeout` seconds (forever if None) for changed files."""
+        changed: set[Path] = set()
+        while not changed:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                return changed
+            data = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, name_length = _EVENT_HEADER.unpack_from(
+                    data, offset
+                )
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + name_length].rstrip(b"\0")
+                offset += name_length
+                if mask & _IN_IGNORED:
+                    # The directory was removed, and its watch with it
+                    self._directories.pop(descriptor, None)
+                    continue
+                directory = self._directories.get(descriptor)
+                if directory is not None and name:
+                    path = directory / os.fsdecode(name)
+                    if _is_source(path):
+                        changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Reports changed source files by comparing mtimes at a fixed interval."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self._interval = interval
+        self._directories: set[Path] = set()
+        self._mtimes: dict[Path, int] = {}
+
+    def _snapshot(self) -> dict[Path, int]:
+        mtimes: dict[Path, int] = {}
+        for directory in self._directories:
+            for path in directory.glob("*.py"):
+                try:
+                    mtimes[path] = path.stat().st_mtime_ns
+                except OSError:
+                    continue
+        return mtimes
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        """Starts watching any of `directories` not already watched."""
+        self._directories.update(directories)
+        self._mtimes = self._snapshot()
+
+    def poll(self, timeout: float | None) -> set[Path]:
+        """Waits up to `timeout` seconds (forever if None) for changed files."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            mtimes = self._snapshot()
+            changed = {
+                path
+                for path in mtimes.keys() | self._mtimes.keys()
+                if mtimes.get(path) != self._mtimes.get(path)
+            }
+            self._mtimes = mtimes
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self._interval)
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(directories: Iterable[Path]) -> InotifyWatcher | PollingWatcher:
+    """Creates an inotify watcher where supported, otherwise a polling one."""
+    watcher: InotifyWatcher | PollingWatcher
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError):
+            watcher = PollingWatcher()
+    else:
+        watcher = PollingWatcher()
+    watcher.watch(directories)
+    return watcher
+
+
+def wait_for_changes(
+    watcher: InotifyWatcher | PollingWatcher, debounce: float
+) -> set[Path]:
+    """
+    Blocks until files change, then keeps collecting changes until none arrive
+    for `debounce` seconds, so a burst of saves is handled as one change.
+    """
+    changed = watcher.poll(None)
+    while more := watcher.poll(debounce):
+        changed |= more
+    return changed
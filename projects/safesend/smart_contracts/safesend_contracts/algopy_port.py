@@ -0,0 +1,166 @@
+# pyright: reportMissingModuleSource=false
+"""
+Algorand Python port of the beaker `SafeSendApp` in contract.py, for load tests.
+
+algorand-python-testing only executes algopy contracts, so `load_test_config`
+drives this port. It mirrors the app's state layout (owner and whitelisted
+receiver in global state, one empty box per extra whitelisted receiver, the
+audit log records), its checks and its inner payments; keep the two in step
+when either changes.
+
+The audit log layout comes from `smart_contracts._helpers.audit_log` and the
+record kinds from interface.py, as in contract.py.
+"""
+
+from algopy import (
+    Account,
+    ARC4Contract,
+    Bytes,
+    Global,
+    GlobalState,
+    Txn,
+    UInt64,
+    arc4,
+    itxn,
+    op,
+    subroutine,
+    uenumerate,
+    urange,
+)
+
+from smart_contracts._helpers import audit_log
+from smart_contracts.safesend_contracts import interface
+
+MAX_AMOUNT = 1_000_000  # 1 Algo per transfer
+WHITELIST_PREFIX = b"w"
+
+
+class SafeSendPort(ARC4Contract):
+    def __init__(self) -> None:
+        self.owner = GlobalState(Account)
+        self.whitelisted_receiver = GlobalState(Account)
+        self.audit_seq = GlobalState(UInt64)
+
+    @arc4.abimethod(create="require")
+    def create_app(self, owner: arc4.Address) -> None:
+        self.owner.value = owner.native
+        self.whitelisted_receiver.value = owner.native
+        self.audit_seq.value = UInt64(0)
+
+    @arc4.abimethod()
+    def create_audit_log(self) -> None:
+        assert Txn.sender == self.owner.value, "Only the owner can create the audit log"
+        for index in urange(audit_log.BOXES):
+            op.Box.create(
+                Bytes(audit_log.BOX_PREFIX) + op.extract(op.itob(index), 7, 1),
+                audit_log.BOX_SIZE,
+            )
+
+    @subroutine
+    def _audit(self, kind: UInt64, account: Bytes, amount: UInt64, ref: UInt64) -> None:
+        self.audit_seq.value += 1
+        slot = (self.audit_seq.value - 1) % audit_log.CAPACITY
+        op.Box.replace(
+            Bytes(audit_log.BOX_PREFIX)
+            + op.extract(op.itob(slot // audit_log.RECORDS_PER_BOX), 7, 1),
+            slot % audit_log.RECORDS_PER_BOX * audit_log.RECORD_SIZE,
+            op.itob(self.audit_seq.value)
+            + op.itob(Global.round)
+            + op.extract(op.itob(kind), 7, 1)
+            + account
+            + op.itob(amount)
+            + op.itob(ref),
+        )
+
+    @arc4.abimethod()
+    def get_owner(self) -> arc4.Address:
+        return arc4.Address(self.owner.value)
+
+    @arc4.abimethod()
+    def get_whitelist(self) -> arc4.Address:
+        return arc4.Address(self.whitelisted_receiver.value)
+
+    @arc4.abimethod()
+    def update_whitelist(self, new_receiver: arc4.Address) -> None:
+        assert Txn.sender == self.owner.value, "Only the owner can change the whitelist"
+        assert (
+            new_receiver.native != Global.zero_address
+        ), "Receiver cannot be zero address"
+        self.whitelisted_receiver.value = new_receiver.native
+        self._audit(
+            UInt64(interface.AUDIT_RECEIVER_SET),
+            new_receiver.bytes,
+            UInt64(0),
+            UInt64(0),
+        )
+
+    @subroutine
+    def _is_whitelisted(self, receiver: Account) -> bool:
+        _length, listed = op.Box.length(Bytes(WHITELIST_PREFIX) + receiver.bytes)
+        return receiver == self.whitelisted_receiver.value or listed
+
+    @subroutine
+    def _check_transfer(self, receiver: Account, amount: UInt64) -> None:
+        assert amount <= MAX_AMOUNT, "Amount exceeds limit"
+        assert self._is_whitelisted(receiver), "Receiver not allowed"
+
+    @arc4.abimethod()
+    def add_to_whitelist(self, receivers: arc4.DynamicArray[arc4.Address]) -> None:
+        assert Txn.sender == self.owner.value, "Only the owner can change the whitelist"
+        for receiver in receivers:
+            assert (
+                receiver.native != Global.zero_address
+            ), "Receiver cannot be zero address"
+            op.Box.create(Bytes(WHITELIST_PREFIX) + receiver.bytes, 0)
+
+    @arc4.abimethod()
+    def remove_from_whitelist(self, receivers: arc4.DynamicArray[arc4.Address]) -> None:
+        assert Txn.sender == self.owner.value, "Only the owner can change the whitelist"
+        for receiver in receivers:
+            op.Box.delete(Bytes(WHITELIST_PREFIX) + receiver.bytes)
+
+    @arc4.abimethod(readonly=True)
+    def check_whitelist(
+        self, receivers: arc4.DynamicArray[arc4.Address]
+    ) -> arc4.DynamicBytes:
+        bitmap = op.bzero((receivers.length + 7) // 8)
+        for index, receiver in uenumerate(receivers):
+            if self._is_whitelisted(receiver.native):
+                bitmap = op.setbit_bytes(bitmap, index, 1)
+        return arc4.DynamicBytes(bitmap)
+
+    @arc4.abimethod()
+    def safe_transfer(self, receiver: arc4.Address, amount: arc4.UInt64) -> arc4.UInt64:
+        self._check_transfer(receiver.native, amount.native)
+        itxn.Payment(
+            receiver=receiver.native, amount=amount.native, fee=Global.min_txn_fee
+        ).submit()
+        arc4.emit("Transfer", receiver, amount)
+        self._audit(
+            UInt64(interface.AUDIT_TRANSFER), receiver.bytes, amount.native, UInt64(0)
+        )
+        return amount
+
+    @arc4.abimethod()
+    def safe_transfer_batch(
+        self,
+        receivers: arc4.DynamicArray[arc4.Address],
+        amounts: arc4.DynamicArray[arc4.UInt64],
+    ) -> arc4.UInt64:
+        assert (
+            receivers.length == amounts.length
+        ), "Receivers and amounts differ in length"
+        total = UInt64(0)
+        for index, receiver in uenumerate(receivers):
+            amount = amounts[index].native
+            self._check_transfer(receiver.native, amount)
+            itxn.Payment(receiver=receiver.native, amount=amount, fee=0).submit()
+            total += amount
+        arc4.emit("BatchTransfer", arc4.UInt64(receivers.length), arc4.UInt64(total))
+        self._audit(
+            UInt64(interface.AUDIT_BATCH_TRANSFER),
+            Txn.sender.bytes,
+            total,
+            receivers.length,
+        )
+        return arc4.UInt64(total)
@@ -0,0 +1,44 @@
+# Calls measured by `python -m smart_contracts._helpers.cost_benchmark`. The app is
+# created with the deployer as owner, which also makes it the global whitelisted
+# receiver, and setup creates the audit log and adds `other` to the box whitelist.
+from smart_contracts._helpers.cost_benchmark import MethodCall
+
+create = MethodCall("create_app", lambda context: [context.deployer])
+
+setup = [
+    MethodCall("create_audit_log"),
+    MethodCall("add_to_whitelist", lambda context: [[context.other]]),
+]
+
+benchmarks = [
+    MethodCall("get_owner"),
+    MethodCall("get_whitelist"),
+    MethodCall("update_whitelist", lambda context: [context.other]),
+    MethodCall(
+        "safe_transfer",
+        lambda context: [context.deployer, 100_000],
+        name="safe_transfer (global whitelist)",
+        inner_transactions=1,
+    ),
+    MethodCall(
+        "safe_transfer",
+        lambda context: [context.other, 100_000],
+        name="safe_transfer (box whitelist)",
+        inner_transactions=1,
+    ),
+    MethodCall(
+        "safe_transfer_batch",
+        lambda context: [[context.other] * 4, [100_000] * 4],
+        name="safe_transfer_batch (4 payments)",
+        inner_transactions=4,
+    ),
+    MethodCall(
+        "add_to_whitelist",
+        lambda context: [[context.app_address]],
+    ),
+    MethodCall("remove_from_whitelist", lambda context: [[context.other]]),
+    MethodCall(
+        "check_whitelist",
+        lambda context: [[context.deployer, context.other, context.app_address]],
+    ),
+]
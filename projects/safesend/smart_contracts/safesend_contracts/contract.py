@@ -1,11 +1,24 @@
 # type: ignore
 from beaker import Application, ApplicationStateValue
-from pyteal import abi, Txn, Global, Int, Assert, Seq, InnerTxnBuilder, TxnField, TxnType
+from pyteal import abi, Txn, Global, Int, Assert, Seq, InnerTxnBuilder, TxnField, TxnType, For, ScratchVar, TealType, App, Bytes, BytesZero, Concat, Extract, Itob, Log, Or, Pop, SetBit
+
+from smart_contracts._helpers import arc28, audit_log
+from smart_contracts.safesend_contracts import interface
+
+MAX_AMOUNT = Int(1_000_000)  # 1 Algo per transfer
+# Whitelisted receivers each have an empty box named prefix + address
+WHITELIST_PREFIX = Bytes("w")
+
+
+# ARC-28 event log: selector followed by the ABI encoded arguments
+def emit(signature: str, *encoded_args):
+    return Log(Concat(Bytes(arc28.selector(signature)), *encoded_args))
 
 # Define the application state
 class SafeSendState:
     owner = ApplicationStateValue(stack_type=abi.Address, descr="Owner of the SafeSend contract")
     whitelisted_receiver = ApplicationStateValue(stack_type=abi.Address, descr="Allowed address to receive funds")
+    audit_seq = ApplicationStateValue(stack_type=TealType.uint64, descr="Audit log records written")
 
 class SafeSendApp(Application):
 
@@ -13,7 +26,42 @@ class SafeSendApp(Application):
     def create_app(self, owner: abi.Address) -> Seq:
         return Seq(
             self.state.owner.set(owner),
-            self.state.whitelisted_receiver.set(owner)
+            self.state.whitelisted_receiver.set(owner),
+            self.state.audit_seq.set(Int(0)),
+        )
+
+    @Application.external
+    def create_audit_log(self) -> Seq:
+        """Creates the audit log ring buffer; the app account must hold its minimum balance."""
+        return Seq(
+            Assert(Txn.sender() == self.state.owner, comment="Only the owner can create the audit log"),
+            *[
+                Pop(App.box_create(Bytes(audit_log.box_name(index)), Int(audit_log.BOX_SIZE)))
+                for index in range(audit_log.BOXES)
+            ],
+        )
+
+    # ✅ Audit log: one fixed-size record per call, written in place (see _helpers/audit_log.py)
+    def _audit(self, kind: int, account, amount, ref) -> Seq:
+        slot = ScratchVar(TealType.uint64)
+        return Seq(
+            self.state.audit_seq.increment(),
+            slot.store((self.state.audit_seq - Int(1)) % Int(audit_log.CAPACITY)),
+            App.box_replace(
+                Concat(
+                    Bytes(audit_log.BOX_PREFIX),
+                    Extract(Itob(slot.load() / Int(audit_log.RECORDS_PER_BOX)), Int(7), Int(1)),
+                ),
+                slot.load() % Int(audit_log.RECORDS_PER_BOX) * Int(audit_log.RECORD_SIZE),
+                Concat(
+                    Itob(self.state.audit_seq),
+                    Itob(Global.round()),
+                    Bytes(bytes([kind])),
+                    account,
+                    Itob(amount),
+                    Itob(ref),
+                ),
+            ),
         )
 
     @Application.external
@@ -24,23 +72,101 @@ class SafeSendApp(Application):
     def get_whitelist(self, *, output: abi.Address) -> abi.Address:
         return output.set(self.state.whitelisted_receiver)
 
-    # ✅ Implementation with zero address check
+    # ✅ Implementation with owner and zero address checks
     def _update_whitelist_impl(self, new_receiver: abi.Address) -> Seq:
         return Seq(
+            Assert(Txn.sender() == self.state.owner, comment="Only the owner can change the whitelist"),
             Assert(new_receiver.get() != Global.zero_address(), comment="Receiver cannot be zero address"),
-            self.state.whitelisted_receiver.set(new_receiver)
+            self.state.whitelisted_receiver.set(new_receiver),
+            self._audit(interface.AUDIT_RECEIVER_SET, new_receiver.get(), Int(0), Int(0)),
         )
 
     @Application.external
     def update_whitelist(self, new_receiver: abi.Address) -> Seq:
         return self._update_whitelist_impl(new_receiver)
 
+    # ✅ Box whitelist: membership is one box lookup however many receivers are listed
+    def _whitelist_box(self, receiver: abi.Address):
+        return Concat(WHITELIST_PREFIX, receiver.get())
+
+    def _is_whitelisted(self, receiver: abi.Address):
+        listed = App.box_length(self._whitelist_box(receiver))
+        return Seq(
+            listed,
+            Or(receiver.get() == self.state.whitelisted_receiver, listed.hasValue()),
+        )
+
+    def _for_each_receiver(self, receivers: abi.DynamicArray[abi.Address], receiver: abi.Address, body) -> Seq:
+        index = ScratchVar(TealType.uint64)
+        return For(
+            index.store(Int(0)),
+            index.load() < receivers.length(),
+            index.store(index.load() + Int(1)),
+        ).Do(
+            receivers[index.load()].store_into(receiver),
+            body,
+        )
+
     @Application.external
-    def safe_transfer(self, receiver: abi.Address, amount: abi.Uint64, *, output: abi.String) -> Seq:
-        MAX_AMOUNT = Int(1_000_000)  # 1 Algo
+    def add_to_whitelist(self, receivers: abi.DynamicArray[abi.Address]) -> Seq:
+        """Whitelists every receiver; the app account covers each box's minimum balance."""
+        receiver = abi.Address()
+        return Seq(
+            Assert(Txn.sender() == self.state.owner, comment="Only the owner can change the whitelist"),
+            self._for_each_receiver(
+                receivers,
+                receiver,
+                Seq(
+                    Assert(receiver.get() != Global.zero_address(), comment="Receiver cannot be zero address"),
+                    Pop(App.box_create(self._whitelist_box(receiver), Int(0))),
+                ),
+            ),
+        )
+
+    @Application.external
+    def remove_from_whitelist(self, receivers: abi.DynamicArray[abi.Address]) -> Seq:
+        """Removes every receiver's box, returning its minimum balance to the app account."""
+        receiver = abi.Address()
+        return Seq(
+            Assert(Txn.sender() == self.state.owner, comment="Only the owner can change the whitelist"),
+            self._for_each_receiver(
+                receivers,
+                receiver,
+                Pop(App.box_delete(self._whitelist_box(receiver))),
+            ),
+        )
+
+    @Application.external(read_only=True)
+    def check_whitelist(self, receivers: abi.DynamicArray[abi.Address], *, output: abi.DynamicBytes) -> Seq:
+        """Returns a bitmap with bit i (most significant bit first) set if receivers[i] is whitelisted."""
+        receiver = abi.Address()
+        index = ScratchVar(TealType.uint64)
+        bitmap = ScratchVar(TealType.bytes)
+        return Seq(
+            bitmap.store(BytesZero((receivers.length() + Int(7)) / Int(8))),
+            For(
+                index.store(Int(0)),
+                index.load() < receivers.length(),
+                index.store(index.load() + Int(1)),
+            ).Do(
+                receivers[index.load()].store_into(receiver),
+                bitmap.store(SetBit(bitmap.load(), index.load(), self._is_whitelisted(receiver))),
+            ),
+            output.set(bitmap.load()),
+        )
+
+    # Checks shared by every transfer method
+    def _check_transfer(self, receiver: abi.Address, amount: abi.Uint64) -> Seq:
         return Seq(
             Assert(amount.get() <= MAX_AMOUNT, comment="Amount exceeds limit"),
-            Assert(receiver.get() == self.state.whitelisted_receiver, comment="Receiver not allowed"),
+            Assert(self._is_whitelisted(receiver), comment="Receiver not allowed"),
+        )
+
+    @Application.external
+    def safe_transfer(self, receiver: abi.Address, amount: abi.Uint64, *, output: abi.Uint64) -> Seq:
+        """Pays amount to receiver, returning the amount paid and emitting Transfer."""
+        return Seq(
+            self._check_transfer(receiver, amount),
             InnerTxnBuilder.Begin(),
             InnerTxnBuilder.SetFields({
                 TxnField.type_enum: TxnType.Payment,
@@ -48,7 +174,49 @@ class SafeSendApp(Application):
                 TxnField.amount: amount.get(),
             }),
             InnerTxnBuilder.Submit(),
-            output.set("Transfer successful"),
+            emit(interface.TRANSFER_EVENT, receiver.encode(), amount.encode()),
+            self._audit(interface.AUDIT_TRANSFER, receiver.get(), amount.get(), Int(0)),
+            output.set(amount),
+        )
+
+    # ✅ One inner payment per item, up to the AVM's pooled inner transaction limit
+    @Application.external
+    def safe_transfer_batch(
+        self,
+        receivers: abi.DynamicArray[abi.Address],
+        amounts: abi.DynamicArray[abi.Uint64],
+        *,
+        output: abi.Uint64,
+    ) -> Seq:
+        """Pays amounts[i] to receivers[i] for every i, returning the total paid and
+        emitting one BatchTransfer. Inner fees are 0, so the caller covers them by
+        raising this call's fee."""
+        index = ScratchVar(TealType.uint64)
+        total = ScratchVar(TealType.uint64)
+        receiver = abi.Address()
+        amount = abi.Uint64()
+        return Seq(
+            Assert(receivers.length() == amounts.length(), comment="Receivers and amounts differ in length"),
+            total.store(Int(0)),
+            For(
+                index.store(Int(0)),
+                index.load() < receivers.length(),
+                index.store(index.load() + Int(1)),
+            ).Do(
+                receivers[index.load()].store_into(receiver),
+                amounts[index.load()].store_into(amount),
+                self._check_transfer(receiver, amount),
+                InnerTxnBuilder.Execute({
+                    TxnField.type_enum: TxnType.Payment,
+                    TxnField.receiver: receiver.get(),
+                    TxnField.amount: amount.get(),
+                    TxnField.fee: Int(0),
+                }),
+                total.store(total.load() + amount.get()),
+            ),
+            output.set(total.load()),
+            emit(interface.BATCH_TRANSFER_EVENT, Itob(receivers.length()), output.encode()),
+            self._audit(interface.AUDIT_BATCH_TRANSFER, Txn.sender(), total.load(), receivers.length()),
         )
 
     # Optional: Reusable decorator for owner-only methods
@@ -2,43 +2,73 @@ import logging
 
 import algokit_utils
 
+from smart_contracts._helpers import audit_log, deploy_ledger, profiling
+
 logger = logging.getLogger(__name__)
 
 
-# define deployment behaviour based on supplied app spec
-def deploy() -> None:
+# define deployment behaviour based on supplied app spec; the AlgorandClient and
+# deployer account are shared by every contract deployed in the same run
+def deploy(
+    algorand: algokit_utils.AlgorandClient, deployer_: algokit_utils.SigningAccount
+) -> None:
     from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
         SafesendContractsFactory,
     )
 
-    algorand = algokit_utils.AlgorandClient.from_environment()
-    deployer_ = algorand.account.from_environment("DEPLOYER")
-
     factory = algorand.client.get_typed_app_factory(
         SafesendContractsFactory, default_sender=deployer_.address
     )
 
-    app_client, result = factory.deploy(
-        on_update=algokit_utils.OnUpdate.AppendApp,
-        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
-        args=[deployer_.address],  # owner address for create_app
-    )
-
-    if result.operation_performed in [
-        algokit_utils.OperationPerformed.Create,
-        algokit_utils.OperationPerformed.Replace,
-    ]:
-        algorand.send.payment(
-            algokit_utils.PaymentParams(
-                amount=algokit_utils.AlgoAmount(algo=1),
-                sender=deployer_.address,
-                receiver=app_client.app_address,
+    def fund_and_initialize(app_client: SafesendContractsClient) -> None:
+        # The app address is only known once the create is confirmed, so the funding
+        # payment and any initialization calls are sent together as one atomic group.
+        # The payment also covers the audit log boxes' minimum balance
+        with profiling.phase("fund and initialize"):
+            result = (
+                algorand.new_group()
+                .add_payment(
+                    algokit_utils.PaymentParams(
+                        amount=algokit_utils.AlgoAmount(
+                            micro_algo=1_000_000 + audit_log.MIN_BALANCE
+                        ),
+                        sender=deployer_.address,
+                        receiver=app_client.app_address,
+                    )
+                )
+                .add_app_call_method_call(
+                    app_client.params.create_audit_log(
+                        params=algokit_utils.CommonAppCallParams(
+                            box_references=[
+                                audit_log.box_name(index)
+                                for index in range(audit_log.BOXES)
+                            ]
+                        )
+                    )
+                )
+                .add_app_call_method_call(app_client.params.get_owner())
+                .send()
             )
+        logger.info(
+            f"Funded {app_client.app_name} ({app_client.app_id}), created its audit "
+            f"log and called get_owner, received: {result.returns[-1].value}"
+        )
+
+    def verify(app_client: SafesendContractsClient) -> None:
+        # An app that was initialized earlier only gets this readback
+        response = app_client.send.get_owner()
+        logger.info(
+            f"Called get_owner on {app_client.app_name} ({app_client.app_id}) "
+            f"received: {response.abi_return}"
         )
 
-    # Call get_owner to verify
-    response = app_client.send.get_owner()
-    logger.info(
-        f"Called get_owner on {app_client.app_name} ({app_client.app_id}) "
-        f"received: {response.abi_return}"
+    deploy_ledger.deploy(
+        factory,
+        deployer_.address,
+        initialize=fund_and_initialize,
+        verify=verify,
+        on_update=algokit_utils.OnUpdate.AppendApp,
+        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
+        args=[deployer_.address],  # owner address for create_app
     )
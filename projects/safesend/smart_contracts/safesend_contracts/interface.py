@@ -0,0 +1,26 @@
+"""
+ARC-28 events and audit log record kinds of the SafeSend app, shared by
+contract.py and off-chain code, which decodes the events with
+`smart_contracts._helpers.arc28.decode_logs` and the audit log with
+`smart_contracts._helpers.audit_log.read`.
+"""
+
+# Logged by safe_transfer: receiver, amount
+TRANSFER_EVENT = "Transfer(address,uint64)"
+# Logged once by safe_transfer_batch: payments made, total paid. The payments
+# themselves are its inner transactions
+BATCH_TRANSFER_EVENT = "BatchTransfer(uint64,uint64)"
+
+EVENTS = [TRANSFER_EVENT, BATCH_TRANSFER_EVENT]
+
+# Audit log record kinds, with the account, amount and ref each records.
+# safe_transfer_batch records one summary per call, like its event
+AUDIT_TRANSFER = 1  # receiver, amount, 0
+AUDIT_BATCH_TRANSFER = 2  # caller, total paid, payments made
+AUDIT_RECEIVER_SET = 3  # new whitelisted receiver, 0, 0
+
+AUDIT_KINDS = {
+    AUDIT_TRANSFER: "Transfer",
+    AUDIT_BATCH_TRANSFER: "BatchTransfer",
+    AUDIT_RECEIVER_SET: "ReceiverSet",
+}
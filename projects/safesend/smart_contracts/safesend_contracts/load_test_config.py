@@ -0,0 +1,108 @@
+# Scenarios run by `python -m smart_contracts._helpers.load_test` against the
+# algopy port of the app. The default sender owns it, its audit log is created and
+# RECEIVERS accounts are on the box whitelist before the calls start.
+from smart_contracts._helpers.load_test import (
+    Scenario,
+    deterministic_addresses,
+    fund,
+)
+
+RECEIVERS = 64
+BATCH_SIZE = 16  # inner payments per safe_transfer_batch call
+
+
+def _create(context, rng):
+    from algopy import arc4
+
+    from smart_contracts.safesend_contracts.algopy_port import SafeSendPort
+
+    receivers = deterministic_addresses(rng, RECEIVERS)
+    contract = SafeSendPort()
+    contract.create_app(arc4.Address(context.default_sender))
+    fund(context, context.ledger.get_app(contract).address, *receivers)
+    contract.create_audit_log()
+    for start in range(0, len(receivers), BATCH_SIZE):
+        contract.add_to_whitelist(
+            arc4.DynamicArray(
+                *(
+                    arc4.Address(address)
+                    for address in receivers[start : start + BATCH_SIZE]
+                )
+            )
+        )
+    return contract, receivers
+
+
+def safe_transfer(context, rng):
+    from algopy import arc4
+
+    contract, receivers = _create(context, rng)
+    transfers = [
+        (arc4.Address(rng.choice(receivers)), arc4.UInt64(rng.randint(1, 1_000_000)))
+        for _ in range(1_024)
+    ]
+
+    def call(number):
+        receiver, amount = transfers[number % len(transfers)]
+        contract.safe_transfer(receiver, amount)
+        return amount.native.value
+
+    return call
+
+
+def safe_transfer_batch(context, rng):
+    from algopy import arc4
+
+    contract, receivers = _create(context, rng)
+    batches = [
+        (
+            arc4.DynamicArray(
+                *(arc4.Address(rng.choice(receivers)) for _ in range(BATCH_SIZE))
+            ),
+            arc4.DynamicArray(
+                *(arc4.UInt64(rng.randint(1, 1_000_000)) for _ in range(BATCH_SIZE))
+            ),
+        )
+        for _ in range(64)
+    ]
+    return lambda number: contract.safe_transfer_batch(
+        *batches[number % len(batches)]
+    ).native.value
+
+
+def whitelist(context, rng):
+    """Cycles adding four receivers, checking 64 and removing the four again."""
+    from algopy import arc4
+
+    contract, receivers = _create(context, rng)
+    candidates = deterministic_addresses(rng, 256)
+    batches = [
+        arc4.DynamicArray(
+            *(arc4.Address(address) for address in candidates[start : start + 4])
+        )
+        for start in range(0, len(candidates), 4)
+    ]
+    to_check = arc4.DynamicArray(
+        *(arc4.Address(address) for address in [*receivers, *candidates][::5])
+    )
+
+    def call(number):
+        batch = batches[number // 3 % len(batches)]
+        step = number % 3
+        if step == 0:
+            contract.add_to_whitelist(batch)
+        elif step == 1:
+            bitmap = contract.check_whitelist(to_check).native.value
+            return sum(bin(byte).count("1") for byte in bitmap)
+        else:
+            contract.remove_from_whitelist(batch)
+        return 0
+
+    return call
+
+
+scenarios = [
+    Scenario("safe_transfer", safe_transfer),
+    Scenario("safe_transfer_batch", safe_transfer_batch, calls=5_000),
+    Scenario("whitelist", whitelist, calls=10_000),
+]
@@ -0,0 +1,106 @@
+"""
+Sends payout lists of any length through `safe_transfer_batch`.
+
+Payouts are split into app calls and each call's receivers, and their
+whitelist boxes, are referenced explicitly. The calls are then packed into
+full transaction groups, so a run needs as few groups, and so as few round
+trips, as the AVM allows.
+"""
+
+import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import algokit_utils
+from algosdk.encoding import decode_address
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
+    )
+
+logger = logging.getLogger(__name__)
+
+# AVM limits: transactions per group and inner transactions each app call adds
+# to the group's pool. Receivers per call leave two of an app call's eight
+# references for the audit log box(es) algokit_utils adds for its record
+MAX_GROUP_SIZE = 16
+MAX_INNER_TRANSACTIONS_PER_CALL = 16
+MAX_ACCOUNTS_PER_CALL = 3
+
+# Name prefix of the contract's per-receiver whitelist boxes
+WHITELIST_BOX_PREFIX = b"w"
+
+Payout = tuple[str, int]
+
+
+def split_payouts(
+    payouts: Sequence[Payout],
+    calls_per_group: int = MAX_GROUP_SIZE,
+    payouts_per_call: int = MAX_INNER_TRANSACTIONS_PER_CALL,
+) -> list[list[list[Payout]]]:
+    """
+    Splits (receiver, amount) payouts, in order, into groups of app calls. A
+    call holds at most `payouts_per_call` payouts to at most
+    MAX_ACCOUNTS_PER_CALL distinct receivers, so a call never needs more than
+    eight references (each receiver's account and whitelist box, and the audit
+    log).
+    """
+    calls: list[list[Payout]] = []
+    receivers: set[str] = set()
+    for receiver, amount in payouts:
+        if (
+            not calls
+            or len(calls[-1]) >= payouts_per_call
+            or (receiver not in receivers and len(receivers) >= MAX_ACCOUNTS_PER_CALL)
+        ):
+            calls.append([])
+            receivers = set()
+        calls[-1].append((receiver, amount))
+        receivers.add(receiver)
+    return [
+        calls[start : start + calls_per_group]
+        for start in range(0, len(calls), calls_per_group)
+    ]
+
+
+def send_payouts(
+    app_client: "SafesendContractsClient", payouts: Sequence[Payout]
+) -> int:
+    """
+    Pays out every (receiver, amount) through `safe_transfer_batch`, one atomic
+    group per full set of calls, and returns the total paid. Each call's fee is
+    raised to cover its inner payments.
+    """
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafeTransferBatchArgs,
+    )
+
+    min_fee = app_client.algorand.get_suggested_params().min_fee
+    total = 0
+    groups = split_payouts(payouts)
+    for number, calls in enumerate(groups, start=1):
+        composer = app_client.new_group()
+        for call in calls:
+            receivers = [receiver for receiver, _ in call]
+            distinct_receivers = list(dict.fromkeys(receivers))
+            composer.safe_transfer_batch(
+                args=SafeTransferBatchArgs(
+                    receivers=receivers, amounts=[amount for _, amount in call]
+                ),
+                params=algokit_utils.CommonAppCallParams(
+                    account_references=distinct_receivers,
+                    box_references=[
+                        WHITELIST_BOX_PREFIX + decode_address(receiver)
+                        for receiver in distinct_receivers
+                    ],
+                    extra_fee=algokit_utils.AlgoAmount(micro_algo=min_fee * len(call)),
+                ),
+            )
+        result = composer.send()
+        total += sum(int(value.value) for value in result.returns)
+        logger.info(
+            f"Sent payout group {number}/{len(groups)}: "
+            f"{sum(len(call) for call in calls)} payment(s) in {len(calls)} call(s)"
+        )
+    return total
@@ -0,0 +1,338 @@
+"""
+Applies whitelist changes in bulk through `add_to_whitelist` and
+`remove_from_whitelist`.
+
+Usage: python -m smart_contracts.safesend_contracts.update_whitelist APP_ID FILE
+[--concurrency N] [--checkpoint PATH]
+
+FILE is a CSV file with an `address` column and an optional `action` column
+(`add`, the default, or `remove`), or a JSONL file of objects with the same
+keys. Only the last change to each address counts, so the net changes are
+order-independent and groups can be sent concurrently. Changes are packed into
+app calls of MAX_BOXES_PER_CALL receivers and calls into atomic groups of up to
+15, with --concurrency groups in flight, all signed by the DEPLOYER account of
+the network configured in .env, which must be the app's owner.
+
+Each whitelist box the app creates raises its minimum balance by
+WHITELIST_BOX_MIN_BALANCE. Before sending, the receivers already whitelisted
+are read from the app's boxes, and a group that creates more boxes than it
+deletes starts with a payment from the owner to the app covering the
+difference. If the owner cannot afford every payment, nothing is sent.
+
+Every confirmed group is recorded in the checkpoint, by app and input file
+contents, so rerunning the same command after a crash or failed groups only
+sends the groups that are left.
+"""
+
+import argparse
+import csv
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import algokit_utils
+from algosdk.encoding import decode_address, encode_address, is_valid_address
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
+    )
+
+logger = logging.getLogger(__name__)
+
+# AVM limits: transactions per group and references per app call. Whitelist
+# calls only reference their receivers' boxes
+MAX_GROUP_SIZE = 16
+MAX_BOXES_PER_CALL = 8
+
+WHITELIST_BOX_PREFIX = b"w"
+# Minimum balance of a whitelist box: 2500 + 400 per byte of its 33-byte name
+# (it has no value)
+WHITELIST_BOX_MIN_BALANCE = 2_500 + 400 * (len(WHITELIST_BOX_PREFIX) + 32)
+ADD = "add"
+REMOVE = "remove"
+
+checkpoint_folder = Path(__file__).parents[2] / ".algokit" / "checkpoints"
+
+Update = tuple[str, str]
+Call = tuple[str, list[str]]
+
+
+def read_updates(path: Path) -> list[Update]:
+    """Reads (action, address) changes from a CSV or JSONL file."""
+    if path.suffix in (".jsonl", ".json"):
+        with path.open() as file:
+            rows = [json.loads(line) for line in file if line.strip()]
+    else:
+        with path.open(newline="") as file:
+            rows = list(csv.DictReader(file))
+    updates: list[Update] = []
+    for number, row in enumerate(rows, start=1):
+        address = (row.get("address") or "").strip()
+        action = (row.get("action") or ADD).strip().lower()
+        if not is_valid_address(address):
+            raise ValueError(f"{path}, entry {number}: invalid address {address!r}")
+        if action not in (ADD, REMOVE):
+            raise ValueError(f"{path}, entry {number}: unknown action {action!r}")
+        updates.append((action, address))
+    return updates
+
+
+def plan_groups(
+    updates: Sequence[Update],
+    calls_per_group: int = MAX_GROUP_SIZE - 1,
+    receivers_per_call: int = MAX_BOXES_PER_CALL,
+) -> list[list[Call]]:
+    """
+    Keeps the last change to each address and splits the changes into groups
+    of (action, receivers) calls, additions first. By default each group leaves
+    room for a funding payment.
+    """
+    latest = {address: action for action, address in updates}
+    calls: list[Call] = []
+    for action in (ADD, REMOVE):
+        receivers = [
+            address
+            for address, latest_action in latest.items()
+            if latest_action == action
+        ]
+        calls.extend(
+            (action, receivers[start : start + receivers_per_call])
+            for start in range(0, len(receivers), receivers_per_call)
+        )
+    return [
+        calls[start : start + calls_per_group]
+        for start in range(0, len(calls), calls_per_group)
+    ]
+
+
+def plan_funding(groups: Sequence[Sequence[Call]], whitelisted: set[str]) -> list[int]:
+    """
+    Returns the microAlgos each group must pay the app for the whitelist boxes
+    it creates, net of those it deletes, given the receivers whitelisted before
+    any group is sent. Groups may confirm in any order, so a group only counts on
+    the minimum balance freed by its own removals.
+    """
+    funding = []
+    for calls in groups:
+        added = 0
+        for action, receivers in calls:
+            if action == ADD:
+                added += sum(receiver not in whitelisted for receiver in receivers)
+            else:
+                added -= sum(receiver in whitelisted for receiver in receivers)
+        funding.append(max(added, 0) * WHITELIST_BOX_MIN_BALANCE)
+    return funding
+
+
+def whitelisted_receivers(app_client: "SafesendContractsClient") -> set[str]:
+    """Reads the receivers the app has whitelist boxes for."""
+    return {
+        encode_address(box.name_raw[len(WHITELIST_BOX_PREFIX) :])
+        for box in app_client.app_client.get_box_names()
+        if box.name_raw.startswith(WHITELIST_BOX_PREFIX)
+        and len(box.name_raw) == len(WHITELIST_BOX_PREFIX) + 32
+    }
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    """The groups of one input file already confirmed on one app."""
+
+    path: Path
+    key: str
+    done: set[int] = dataclasses.field(default_factory=set)
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> "Checkpoint":
+        """Loads the checkpoint, starting empty if it is missing or for other changes."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls(path=path, key=key)
+        if data.get("key") != key:
+            return cls(path=path, key=key)
+        return cls(path=path, key=key, done=set(data.get("done", [])))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        temporary_path.write_text(
+            json.dumps({"key": self.key, "done": sorted(self.done)})
+        )
+        os.replace(temporary_path, self.path)
+
+
+def send_group(
+    app_client: "SafesendContractsClient",
+    calls: Sequence[Call],
+    funding: int = 0,
+    funder: str | None = None,
+) -> None:
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        AddToWhitelistArgs,
+        RemoveFromWhitelistArgs,
+    )
+
+    composer = app_client.new_group()
+    if funding:
+        composer.composer().add_payment(
+            algokit_utils.PaymentParams(
+                sender=funder,
+                receiver=app_client.app_address,
+                amount=algokit_utils.AlgoAmount(micro_algo=funding),
+            )
+        )
+    for action, receivers in calls:
+        params = algokit_utils.CommonAppCallParams(
+            box_references=[
+                WHITELIST_BOX_PREFIX + decode_address(receiver)
+                for receiver in receivers
+            ]
+        )
+        if action == ADD:
+            composer.add_to_whitelist(
+                args=AddToWhitelistArgs(receivers=receivers), params=params
+            )
+        else:
+            composer.remove_from_whitelist(
+                args=RemoveFromWhitelistArgs(receivers=receivers), params=params
+            )
+    composer.send()
+
+
+def apply_updates(
+    app_client: "SafesendContractsClient",
+    groups: Sequence[Sequence[Call]],
+    checkpoint: Checkpoint,
+    concurrency: int = 4,
+    funding: Sequence[int] | None = None,
+    funder: str | None = None,
+) -> tuple[int, int]:
+    """
+    Sends every group not yet in the checkpoint, `concurrency` at a time, with
+    `funder` paying the app each group's `funding`, and records each confirmed
+    one. Returns the numbers of changes applied and of groups that failed.
+    """
+    pending = [number for number in range(len(groups)) if number not in checkpoint.done]
+    if len(pending) < len(groups):
+        logger.info(f"Resuming: {len(groups) - len(pending)} group(s) already sent")
+    applied = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                send_group,
+                app_client,
+                groups[number],
+                funding[number] if funding else 0,
+                funder,
+            ): number
+            for number in pending
+        }
+        for future in as_completed(futures):
+            number = futures[future]
+            try:
+                future.result()
+            except Exception as ex:
+                failed += 1
+                logger.warning(
+                    f"Whitelist group {number + 1}/{len(groups)} failed: {ex}"
+                )
+                continue
+            # Only this thread touches the checkpoint
+            checkpoint.done.add(number)
+            checkpoint.save()
+            applied += sum(len(receivers) for _, receivers in groups[number])
+            logger.info(
+                f"Sent whitelist group {number + 1}/{len(groups)} "
+                f"({len(checkpoint.done)} done)"
+            )
+    return applied, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts.safesend_contracts.update_whitelist"
+    )
+    parser.add_argument("app_id", type=int)
+    parser.add_argument("file", type=Path, help="CSV or JSONL whitelist changes")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Groups sent at the same time"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Progress file, by default one per app under .algokit/checkpoints",
+    )
+    options = parser.parse_args()
+
+    try:
+        updates = read_updates(options.file)
+    except (OSError, ValueError) as ex:
+        parser.error(str(ex))
+
+    from dotenv import load_dotenv
+
+    from smart_contracts._helpers import session
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
+    )
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    load_dotenv()
+    algorand = session.algorand_client()
+    owner = session.deployer_account()
+    app_client = algorand.client.get_typed_app_client_by_id(
+        SafesendContractsClient, app_id=options.app_id, default_sender=owner.address
+    )
+
+    groups = plan_groups(updates)
+    digest = hashlib.sha256(options.file.read_bytes()).hexdigest()
+    checkpoint = Checkpoint.load(
+        options.checkpoint or checkpoint_folder / f"whitelist-{options.app_id}.json",
+        key=f"{options.app_id}/{digest}",
+    )
+    funding = plan_funding(groups, whitelisted_receivers(app_client))
+    required = sum(
+        amount for number, amount in enumerate(funding) if number not in checkpoint.done
+    )
+    if required:
+        account = algorand.account.get_information(owner.address)
+        available = account.amount.micro_algo - account.min_balance.micro_algo
+        if available < required:
+            sys.exit(
+                f"The new whitelist boxes need {required / 1e6:,.6f} Algo of minimum "
+                f"balance but {owner.address} only has {available / 1e6:,.6f} Algo "
+                f"to spare; fund it and rerun"
+            )
+        logger.info(
+            f"Paying the app {required / 1e6:,.6f} Algo for "
+            f"{required // WHITELIST_BOX_MIN_BALANCE} new whitelist box(es)"
+        )
+    start = time.perf_counter()
+    applied, failed = apply_updates(
+        app_client, groups, checkpoint, options.concurrency, funding, owner.address
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"Applied {applied} whitelist change(s) from {len(updates)} entries in "
+        f"{elapsed:.2f}s, {applied / elapsed:,.1f} changes/s"
+    )
+    print(session.stats().summary())
+    if failed:
+        print(f"{failed} group(s) failed; rerun the same command to resume")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
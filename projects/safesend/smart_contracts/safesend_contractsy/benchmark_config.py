@@ -0,0 +1,7 @@
+# Calls measured by `python -m smart_contracts._helpers.cost_benchmark`; the app is
+# created with a bare call
+from smart_contracts._helpers.cost_benchmark import MethodCall
+
+benchmarks = [
+    MethodCall("hello", ["world"]),
+]
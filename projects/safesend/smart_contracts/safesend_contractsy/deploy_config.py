@@ -2,43 +2,63 @@ import logging
 
 import algokit_utils
 
+from smart_contracts._helpers import deploy_ledger, profiling
+
 logger = logging.getLogger(__name__)
 
 
-# define deployment behaviour based on supplied app spec
-def deploy() -> None:
+# define deployment behaviour based on supplied app spec; the AlgorandClient and
+# deployer account are shared by every contract deployed in the same run
+def deploy(
+    algorand: algokit_utils.AlgorandClient, deployer_: algokit_utils.SigningAccount
+) -> None:
     from smart_contracts.artifacts.safesend_contractsy.safesend_contractsy_client import (
+        SafesendContractsyClient,
         SafesendContractsyFactory,
         HelloArgs,
     )
 
-    algorand = algokit_utils.AlgorandClient.from_environment()
-    deployer_ = algorand.account.from_environment("DEPLOYER")
-
     factory = algorand.client.get_typed_app_factory(
         SafesendContractsyFactory, default_sender=deployer_.address
     )
 
-    app_client, result = factory.deploy(
-        on_update=algokit_utils.OnUpdate.AppendApp,
-        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
-    )
-
-    if result.operation_performed in [
-        algokit_utils.OperationPerformed.Create,
-        algokit_utils.OperationPerformed.Replace,
-    ]:
-        algorand.send.payment(
-            algokit_utils.PaymentParams(
-                amount=algokit_utils.AlgoAmount(algo=1),
-                sender=deployer_.address,
-                receiver=app_client.app_address,
+    def fund_and_initialize(app_client: SafesendContractsyClient) -> None:
+        # The app address is only known once the create is confirmed, so the funding
+        # payment and any initialization calls are sent together as one atomic group
+        with profiling.phase("fund and initialize"):
+            result = (
+                algorand.new_group()
+                .add_payment(
+                    algokit_utils.PaymentParams(
+                        amount=algokit_utils.AlgoAmount(algo=1),
+                        sender=deployer_.address,
+                        receiver=app_client.app_address,
+                    )
+                )
+                .add_app_call_method_call(
+                    app_client.params.hello(args=HelloArgs(name="world"))
+                )
+                .send()
             )
+        logger.info(
+            f"Funded {app_client.app_name} ({app_client.app_id}) and called hello "
+            f"with name=world, received: {result.returns[-1].value}"
+        )
+
+    def verify(app_client: SafesendContractsyClient) -> None:
+        # An app that was initialized earlier only gets this call
+        name = "world"
+        response = app_client.send.hello(args=HelloArgs(name=name))
+        logger.info(
+            f"Called hello on {app_client.app_name} ({app_client.app_id}) "
+            f"with name={name}, received: {response.abi_return}"
         )
 
-    name = "world"
-    response = app_client.send.hello(args=HelloArgs(name=name))
-    logger.info(
-        f"Called hello on {app_client.app_name} ({app_client.app_id}) "
-        f"with name={name}, received: {response.abi_return}"
+    deploy_ledger.deploy(
+        factory,
+        deployer_.address,
+        initialize=fund_and_initialize,
+        verify=verify,
+        on_update=algokit_utils.OnUpdate.AppendApp,
+        on_schema_break=algokit_utils.OnSchemaBreak.AppendApp,
     )
@@ -0,0 +1,17 @@
+# Scenarios run by `python -m smart_contracts._helpers.load_test`
+from smart_contracts._helpers.load_test import Scenario
+
+
+def hello(context, rng):
+    from algopy import String
+
+    from smart_contracts.safesend_contractsy.contract import SafesendContractsy
+
+    contract = SafesendContractsy()
+    names = [String(f"user{rng.randrange(1_000_000)}") for _ in range(256)]
+    return lambda number: len(contract.hello(names[number % len(names)]).bytes)
+
+
+scenarios = [
+    Scenario("hello", hello, calls=200_000),
+]
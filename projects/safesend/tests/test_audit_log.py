@@ -0,0 +1,155 @@
+import base64
+import random
+import struct
+
+import pytest
+from algosdk.encoding import decode_address, encode_address
+from algosdk.error import AlgodHTTPError
+
+from smart_contracts._helpers import audit_log
+from smart_contracts.safesend_contracts import interface
+
+ACCOUNT = encode_address(bytes(range(32)))
+
+
+def pack(seq: int, kind: int = interface.AUDIT_TRANSFER, amount: int = 0) -> bytes:
+    return struct.pack(
+        audit_log.RECORD_FORMAT,
+        seq,
+        100 + seq,
+        kind,
+        decode_address(ACCOUNT),
+        amount,
+        7,
+    )
+
+
+def test_layout_fits_one_box_reference_per_box():
+    # seq, round, kind, account, amount, ref
+    assert audit_log.RECORD_SIZE == 8 + 8 + 1 + 32 + 8 + 8
+    assert audit_log.BOX_SIZE <= audit_log.BOX_REFERENCE_QUOTA
+    assert audit_log.BOX_SIZE + audit_log.RECORD_SIZE > audit_log.BOX_REFERENCE_QUOTA
+    assert audit_log.CAPACITY == audit_log.BOXES * audit_log.RECORDS_PER_BOX
+    # An app call may have at most 8 references, and a record may span two boxes
+    assert audit_log.BOXES <= 8
+    assert audit_log.MIN_BALANCE == audit_log.BOXES * (
+        2_500 + 400 * (len(audit_log.box_name(0)) + audit_log.BOX_SIZE)
+    )
+
+
+def test_decode_box_skips_unwritten_slots():
+    empty = bytes(audit_log.RECORD_SIZE)
+    value = pack(3, amount=5) + empty + pack(2, interface.AUDIT_RECEIVER_SET)
+    value += empty * (audit_log.RECORDS_PER_BOX - 3)
+
+    records = audit_log.decode_box(value, interface.AUDIT_KINDS)
+
+    assert records == [
+        audit_log.Record(
+            seq=3,
+            round=103,
+            kind=interface.AUDIT_TRANSFER,
+            account=ACCOUNT,
+            amount=5,
+            ref=7,
+            kind_name="Transfer",
+        ),
+        audit_log.Record(
+            seq=2,
+            round=102,
+            kind=interface.AUDIT_RECEIVER_SET,
+            account=ACCOUNT,
+            amount=0,
+            ref=7,
+            kind_name="ReceiverSet",
+        ),
+    ]
+
+
+def test_decode_box_names_unknown_kinds_by_number():
+    (record,) = audit_log.decode_box(pack(1, kind=42))
+
+    assert record.kind_name == "42"
+
+
+def test_decode_box_ignores_a_partial_trailing_record():
+    assert [record.seq for record in audit_log.decode_box(pack(1) + pack(2)[:10])] == [
+        1
+    ]
+
+
+class FakeAlgod:
+    def __init__(self, boxes: dict[bytes, bytes]):
+        self.boxes = boxes
+
+    def application_box_by_name(self, app_id: int, name: bytes) -> dict:
+        assert app_id == 1
+        if name not in self.boxes:
+            raise AlgodHTTPError("box not found", 404)
+        return {"value": base64.b64encode(self.boxes[name]).decode()}
+
+
+def ring(last_seq: int) -> dict[bytes, bytes]:
+    """The boxes after records 1..last_seq were written at slot (seq - 1) % CAPACITY."""
+    slots = [bytes(audit_log.RECORD_SIZE)] * audit_log.CAPACITY
+    for seq in range(1, last_seq + 1):
+        slots[(seq - 1) % audit_log.CAPACITY] = pack(seq)
+    per_box = audit_log.RECORDS_PER_BOX
+    return {
+        audit_log.box_name(index): b"".join(
+            slots[index * per_box : (index + 1) * per_box]
+        )
+        for index in range(audit_log.BOXES)
+    }
+
+
+@pytest.mark.parametrize("last_seq", [0, 1, 20, audit_log.CAPACITY, 357])
+def test_read_returns_the_newest_records_oldest_first(last_seq):
+    records = audit_log.read(FakeAlgod(ring(last_seq)), 1, interface.AUDIT_KINDS)
+
+    first = max(1, last_seq - audit_log.CAPACITY + 1)
+    assert [record.seq for record in records] == list(range(first, last_seq + 1))
+
+
+def test_read_treats_missing_boxes_as_empty():
+    boxes = ring(5)
+    del boxes[audit_log.box_name(audit_log.BOXES - 1)]
+
+    assert [record.seq for record in audit_log.read(FakeAlgod(boxes), 1)] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+    assert audit_log.read(FakeAlgod({}), 1) == []
+
+
+def test_port_writes_records_the_reader_decodes():
+    from algopy import arc4
+    from algopy_testing import algopy_testing_context
+
+    from smart_contracts.safesend_contracts import load_test_config
+
+    amounts = list(range(1, audit_log.CAPACITY + 11))
+    with algopy_testing_context() as context:
+        contract, receivers = load_test_config._create(context, random.Random(1))
+        for amount in amounts:
+            contract.safe_transfer(arc4.Address(receivers[0]), arc4.UInt64(amount))
+        values = [
+            bytes(context.ledger.get_box(contract, audit_log.box_name(index)))
+            for index in range(audit_log.BOXES)
+        ]
+
+    records = sorted(
+        (
+            record
+            for value in values
+            for record in audit_log.decode_box(value, interface.AUDIT_KINDS)
+        ),
+        key=lambda record: record.seq,
+    )
+    assert [record.amount for record in records] == amounts[-audit_log.CAPACITY :]
+    assert {(record.kind_name, record.account) for record in records} == {
+        ("Transfer", receivers[0])
+    }
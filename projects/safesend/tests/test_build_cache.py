@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers.build_cache import (
+    CACHE_VERSION,
+    BuildCache,
+    local_sources,
+)
+
+VERSIONS = {"puyapy": "4.10.0", "algokit-client-generator": "2.1.0"}
+FLAGS = ["--optimization-level", "1"]
+
+
+@pytest.fixture
+def root_path(tmp_path: Path) -> Path:
+    """A project with one contract importing a helper, a sibling module and algopy."""
+    root = tmp_path / "smart_contracts"
+    (root / "_helpers").mkdir(parents=True)
+    (root / "_helpers" / "__init__.py").write_text("")
+    (root / "_helpers" / "util.py").write_text("VALUE = 1\n")
+    (root / "_helpers" / "unused.py").write_text("VALUE = 2\n")
+    (root / "counter").mkdir()
+    (root / "counter" / "contract.py").write_text(
+        "import algopy\n"
+        "from smart_contracts._helpers import util\n"
+        "from . import interface\n"
+    )
+    (root / "counter" / "interface.py").write_text("EVENTS = []\n")
+    return root
+
+
+def key(root_path: Path, versions=VERSIONS, flags=FLAGS) -> str:
+    return BuildCache.compute_key(
+        root_path / "counter" / "contract.py", root_path, versions, flags
+    )
+
+
+def test_local_sources_follow_local_imports_only(root_path: Path):
+    sources = local_sources(root_path / "counter" / "contract.py", root_path)
+
+    assert [path.relative_to(root_path).as_posix() for path in sources] == [
+        "_helpers/__init__.py",
+        "_helpers/util.py",
+        "counter/contract.py",
+        "counter/interface.py",
+    ]
+
+
+def test_key_changes_with_every_build_input(root_path: Path):
+    original = key(root_path)
+
+    assert key(root_path) == original
+    assert key(root_path, versions={**VERSIONS, "puyapy": "4.11.0"}) != original
+    assert key(root_path, flags=[*FLAGS, "--debug-level", "0"]) != original
+
+    (root_path / "_helpers" / "util.py").write_text("VALUE = 3\n")
+    changed_helper = key(root_path)
+    assert changed_helper != original
+
+    (root_path / "counter" / "interface.py").write_text("EVENTS = ['E()']\n")
+    assert key(root_path) != changed_helper
+
+
+def test_key_ignores_modules_the_contract_does_not_import(root_path: Path):
+    original = key(root_path)
+
+    (root_path / "_helpers" / "unused.py").write_text("VALUE = 4\n")
+    (root_path / "counter" / "deploy_config.py").write_text("")
+
+    assert key(root_path) == original
+
+
+def write_outputs(output_dir: Path) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "Counter.arc56.json").write_text("{}")
+    (output_dir / "Counter.approval.teal").write_text("#pragma version 10\n")
+
+
+def test_recorded_build_is_fresh_until_key_or_outputs_change(tmp_path: Path):
+    output_dir = tmp_path / "artifacts" / "counter"
+    write_outputs(output_dir)
+    cache = BuildCache(path=tmp_path / "cache.json")
+    assert not cache.is_fresh("counter", "k1", output_dir)
+
+    cache.record("counter", "k1", output_dir)
+
+    assert cache.is_fresh("counter", "k1", output_dir)
+    assert not cache.is_fresh("counter", "k2", output_dir)
+    (output_dir / "Counter.approval.teal").write_text("#pragma version 11\n")
+    assert not cache.is_fresh("counter", "k1", output_dir)
+    write_outputs(output_dir)
+    assert cache.is_fresh("counter", "k1", output_dir)
+    (output_dir / "Counter.arc56.json").unlink()
+    assert not cache.is_fresh("counter", "k1", output_dir)
+
+
+def test_record_keeps_timings_and_sizes(tmp_path: Path):
+    output_dir = tmp_path / "artifacts" / "counter"
+    write_outputs(output_dir)
+    cache = BuildCache(path=tmp_path / "cache.json")
+    cache.record("counter", "k1", output_dir)
+    cache.record_timing("counter", "subprocess", 1.23456)
+    cache.record_sizes("counter", "dev", {"Counter": {"approval": 100, "clear": 3}})
+
+    cache.record("counter", "k2", output_dir)
+
+    assert cache.timing("counter", "subprocess") == 1.235
+    assert cache.sizes("counter", "dev") == {"Counter": {"approval": 100, "clear": 3}}
+
+
+def test_cache_round_trips_and_drops_other_versions(tmp_path: Path):
+    output_dir = tmp_path / "artifacts" / "counter"
+    write_outputs(output_dir)
+    cache = BuildCache(path=tmp_path / "cache.json")
+    cache.record("counter", "k1", output_dir)
+    cache.save()
+
+    assert BuildCache.load(cache.path).is_fresh("counter", "k1", output_dir)
+
+    cache.path.write_text(
+        cache.path.read_text().replace(
+            f'"version": {CACHE_VERSION}', f'"version": {CACHE_VERSION + 1}'
+        )
+    )
+    assert BuildCache.load(cache.path).entries == {}
+    assert BuildCache.load(tmp_path / "missing.json").entries == {}
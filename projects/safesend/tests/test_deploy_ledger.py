@@ -0,0 +1,225 @@
+import base64
+import types
+
+import algokit_utils
+import pytest
+from algosdk.error import AlgodHTTPError
+
+from smart_contracts._helpers import deploy_ledger, session
+from smart_contracts._helpers.deploy_ledger import DeployLedger
+
+CREATOR = "CREATOR"
+GENESIS_HASH = "genesis"
+
+
+class FakeAlgod:
+    """Just enough of a network for deploy_ledger: apps by id, and
+    `factory.deploy`'s lookup of an app by creator, name and programs."""
+
+    def __init__(self):
+        self.apps: dict[int, types.SimpleNamespace] = {}
+        self.next_app_id = 1_000
+        self.lookups = 0
+
+    def get_by_id(self, app_id: int) -> types.SimpleNamespace:
+        self.lookups += 1
+        if app_id not in self.apps:
+            raise AlgodHTTPError("application does not exist", 404)
+        return self.apps[app_id]
+
+    def deploy(self, name: str, creator: str, programs: bytes) -> tuple[int, bool]:
+        for app_id, app in self.apps.items():
+            if (app.name, app.creator, app.programs) == (name, creator, programs):
+                return app_id, False
+        app_id = self.next_app_id
+        self.next_app_id += 1
+        self.apps[app_id] = types.SimpleNamespace(
+            name=name, creator=creator, programs=programs
+        )
+        return app_id, True
+
+
+class FakeFactory:
+    app_name = "SafeSendApp"
+
+    def __init__(self, algod: FakeAlgod, approval: str):
+        self.algod = algod
+        self.algorand = types.SimpleNamespace(
+            app=algod, client=types.SimpleNamespace(algod=object())
+        )
+        self.app_spec = types.SimpleNamespace(
+            source=types.SimpleNamespace(
+                approval=base64.b64encode(approval.encode()).decode(),
+                clear=base64.b64encode(b"#pragma version 10\nint 1").decode(),
+            )
+        )
+        self.deploys = 0
+
+    def get_app_client_by_id(self, app_id: int, app_name: str):
+        return types.SimpleNamespace(app_id=app_id, app_address=f"ADDRESS{app_id}")
+
+    def deploy(self, **kwargs):
+        self.deploys += 1
+        programs = self.app_spec.source.approval.encode()
+        app_id, created = self.algod.deploy(self.app_name, CREATOR, programs)
+        operation = (
+            algokit_utils.OperationPerformed.Create
+            if created
+            else algokit_utils.OperationPerformed.Nothing
+        )
+        return (
+            self.get_app_client_by_id(app_id, self.app_name),
+            types.SimpleNamespace(operation_performed=operation),
+        )
+
+
+class Steps:
+    """Records the initialize and verify calls of deploys, failing verify on request."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, int]] = []
+        self.fail_verify = False
+
+    def initialize(self, app_client) -> None:
+        self.calls.append(("initialize", app_client.app_id))
+
+    def verify(self, app_client) -> None:
+        self.calls.append(("verify", app_client.app_id))
+        if self.fail_verify:
+            raise RuntimeError("unexpected owner")
+
+
+@pytest.fixture(autouse=True)
+def ledger_file(tmp_path, monkeypatch):
+    path = tmp_path / "deployments.json"
+    monkeypatch.setattr(deploy_ledger, "ledger_path", path)
+    monkeypatch.setattr(deploy_ledger, "_ledger", None)
+    monkeypatch.setattr(deploy_ledger, "_verify", False)
+    monkeypatch.setattr(session, "genesis_hash", lambda: GENESIS_HASH)
+    return path
+
+
+def deploy(factory: FakeFactory, steps: Steps):
+    return deploy_ledger.deploy(
+        factory, CREATOR, initialize=steps.initialize, verify=steps.verify
+    )
+
+
+def ledger_entries(path) -> dict:
+    return DeployLedger.load(path).entries
+
+
+def test_unchanged_programs_are_resolved_from_the_ledger(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+    first, operation = deploy(FakeFactory(algod, "int 1"), steps)
+    assert operation == algokit_utils.OperationPerformed.Create
+
+    factory = FakeFactory(algod, "int 1")
+    app_client, operation = deploy(factory, steps)
+
+    assert operation == algokit_utils.OperationPerformed.Nothing
+    assert app_client.app_id == first.app_id
+    # One existence check instead of factory.deploy
+    assert factory.deploys == 0
+    assert algod.lookups == 1
+    assert steps.calls == [("initialize", first.app_id), ("verify", first.app_id)]
+    (entry,) = ledger_entries(ledger_file).values()
+    assert entry["app_id"] == first.app_id
+    assert entry["initialized"]
+
+
+def test_changed_programs_are_deployed(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+    first, _ = deploy(FakeFactory(algod, "int 1"), steps)
+
+    factory = FakeFactory(algod, "int 2")
+    app_client, operation = deploy(factory, steps)
+
+    assert operation == algokit_utils.OperationPerformed.Create
+    assert factory.deploys == 1
+    assert app_client.app_id != first.app_id
+    assert steps.calls == [
+        ("initialize", first.app_id),
+        ("initialize", app_client.app_id),
+    ]
+    entries = ledger_entries(ledger_file).values()
+    assert sorted(entry["app_id"] for entry in entries) == [
+        first.app_id,
+        app_client.app_id,
+    ]
+
+
+def test_deleted_apps_are_deployed_again(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+    first, _ = deploy(FakeFactory(algod, "int 1"), steps)
+    del algod.apps[first.app_id]
+
+    factory = FakeFactory(algod, "int 1")
+    app_client, operation = deploy(factory, steps)
+
+    assert operation == algokit_utils.OperationPerformed.Create
+    assert factory.deploys == 1
+    (entry,) = ledger_entries(ledger_file).values()
+    assert entry["app_id"] == app_client.app_id != first.app_id
+
+
+def test_an_entry_that_fails_verify_is_dropped(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+    first, _ = deploy(FakeFactory(algod, "int 1"), steps)
+
+    steps.fail_verify = True
+    with pytest.raises(RuntimeError, match="unexpected owner"):
+        deploy(FakeFactory(algod, "int 1"), steps)
+    assert ledger_entries(ledger_file) == {}
+
+    # The next deploy checks chain state, finds the same app and verifies it
+    steps.fail_verify = False
+    factory = FakeFactory(algod, "int 1")
+    app_client, operation = deploy(factory, steps)
+
+    assert factory.deploys == 1
+    assert operation == algokit_utils.OperationPerformed.Nothing
+    assert app_client.app_id == first.app_id
+    assert steps.calls[-1] == ("verify", first.app_id)
+    (entry,) = ledger_entries(ledger_file).values()
+    assert entry["app_id"] == first.app_id
+
+
+def test_a_failed_initialization_is_retried(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+
+    def fail(app_client):
+        raise RuntimeError("funding failed")
+
+    with pytest.raises(RuntimeError, match="funding failed"):
+        deploy_ledger.deploy(FakeFactory(algod, "int 1"), CREATOR, initialize=fail)
+    (entry,) = ledger_entries(ledger_file).values()
+    assert not entry["initialized"]
+
+    factory = FakeFactory(algod, "int 1")
+    app_client, _ = deploy(factory, steps)
+
+    assert factory.deploys == 0
+    assert steps.calls == [("initialize", app_client.app_id)]
+    (entry,) = ledger_entries(ledger_file).values()
+    assert entry["initialized"]
+
+
+def test_verification_bypasses_the_ledger(ledger_file):
+    algod = FakeAlgod()
+    steps = Steps()
+    first, _ = deploy(FakeFactory(algod, "int 1"), steps)
+    deploy_ledger.enable_verification()
+
+    factory = FakeFactory(algod, "int 1")
+    app_client, operation = deploy(factory, steps)
+
+    assert factory.deploys == 1
+    assert operation == algokit_utils.OperationPerformed.Nothing
+    assert app_client.app_id == first.app_id
+    assert steps.calls[-1] == ("verify", first.app_id)
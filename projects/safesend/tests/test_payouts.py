@@ -0,0 +1,120 @@
+import random
+import sys
+import types
+
+import pytest
+from algosdk.encoding import encode_address
+
+from smart_contracts.safesend_contracts import payouts
+from smart_contracts.safesend_contracts.payouts import (
+    MAX_ACCOUNTS_PER_CALL,
+    MAX_GROUP_SIZE,
+    MAX_INNER_TRANSACTIONS_PER_CALL,
+    split_payouts,
+)
+
+# References an app call may have, and those the audit log record can need
+MAX_REFERENCES_PER_CALL = 8
+AUDIT_LOG_REFERENCES = 2
+
+
+def addresses(count: int) -> list[str]:
+    rng = random.Random(count)
+    return [encode_address(rng.randbytes(32)) for _ in range(count)]
+
+
+def random_payouts(count: int, receivers: int) -> list[payouts.Payout]:
+    rng = random.Random(count * receivers)
+    accounts = addresses(receivers)
+    return [(rng.choice(accounts), rng.randint(1, 1_000)) for _ in range(count)]
+
+
+@pytest.mark.parametrize(
+    ("count", "receivers"), [(0, 1), (1, 1), (100, 1), (1_000, 3), (5_000, 500)]
+)
+def test_split_payouts_keeps_order_within_avm_limits(count, receivers):
+    planned = random_payouts(count, receivers)
+
+    groups = split_payouts(planned)
+
+    assert [payout for calls in groups for call in calls for payout in call] == planned
+    for calls in groups:
+        assert 1 <= len(calls) <= MAX_GROUP_SIZE
+        for call in calls:
+            assert 1 <= len(call) <= MAX_INNER_TRANSACTIONS_PER_CALL
+            distinct = {receiver for receiver, _ in call}
+            assert len(distinct) <= MAX_ACCOUNTS_PER_CALL
+            # Each receiver's account and whitelist box, plus the audit log
+            assert 2 * len(distinct) + AUDIT_LOG_REFERENCES <= MAX_REFERENCES_PER_CALL
+
+
+def test_split_payouts_fills_calls_and_groups():
+    receiver = addresses(1)[0]
+
+    groups = split_payouts([(receiver, 1)] * (17 * MAX_INNER_TRANSACTIONS_PER_CALL))
+
+    # One receiver never forces a new call, so every call is full
+    assert [len(calls) for calls in groups] == [MAX_GROUP_SIZE, 1]
+    assert all(
+        len(call) == MAX_INNER_TRANSACTIONS_PER_CALL
+        for calls in groups
+        for call in calls
+    )
+
+
+def test_split_payouts_starts_a_call_for_a_fourth_receiver():
+    a, b, c, d = addresses(4)
+
+    groups = split_payouts([(a, 1), (b, 2), (a, 3), (c, 4), (d, 5), (a, 6)])
+
+    assert groups == [[[(a, 1), (b, 2), (a, 3), (c, 4)], [(d, 5), (a, 6)]]]
+
+
+class FakeComposer:
+    def __init__(self, sent: list):
+        self.calls: list = []
+        self.sent = sent
+
+    def safe_transfer_batch(self, args, params):
+        self.calls.append((args, params))
+
+    def send(self):
+        self.sent.append(self.calls)
+        return types.SimpleNamespace(
+            returns=[
+                types.SimpleNamespace(value=sum(args.amounts)) for args, _ in self.calls
+            ]
+        )
+
+
+def test_send_payouts_references_and_fees(monkeypatch):
+    # Stands in for the client generated at build time
+    client_module = types.ModuleType("safesend_contracts_client")
+    client_module.SafeTransferBatchArgs = lambda receivers, amounts: (
+        types.SimpleNamespace(receivers=receivers, amounts=amounts)
+    )
+    monkeypatch.setitem(
+        sys.modules,
+        "smart_contracts.artifacts.safesend_contracts.safesend_contracts_client",
+        client_module,
+    )
+    sent: list = []
+    app_client = types.SimpleNamespace(
+        algorand=types.SimpleNamespace(
+            get_suggested_params=lambda: types.SimpleNamespace(min_fee=1_000)
+        ),
+        new_group=lambda: FakeComposer(sent),
+    )
+    planned = random_payouts(600, 40)
+
+    total = payouts.send_payouts(app_client, planned)
+
+    assert total == sum(amount for _, amount in planned)
+    assert len(sent) == len(split_payouts(planned))
+    for calls in sent:
+        assert len(calls) <= MAX_GROUP_SIZE
+        for args, params in calls:
+            references = len(params.account_references) + len(params.box_references)
+            assert references + AUDIT_LOG_REFERENCES <= MAX_REFERENCES_PER_CALL
+            assert set(params.account_references) == set(args.receivers)
+            assert params.extra_fee.micro_algo == 1_000 * len(args.receivers)
@@ -0,0 +1,246 @@
+import base64
+import http.server
+import json
+import socket
+import threading
+import types
+
+import pytest
+from algosdk import error
+
+from smart_contracts._helpers import pooled_algod
+from smart_contracts._helpers.pooled_algod import (
+    MAX_RETRIES,
+    SUGGESTED_PARAMS_MAX_AGE,
+    SUGGESTED_PARAMS_TTL_ROUNDS,
+    PooledAlgodClient,
+)
+
+TRANSACTION = base64.b64encode(b"signed transaction").decode()
+
+
+def params(round_: int) -> dict:
+    return {
+        "fee": 0,
+        "last-round": round_,
+        "genesis-hash": base64.b64encode(bytes(32)).decode(),
+        "genesis-id": "stub-v1",
+        "consensus-version": "stub",
+        "min-fee": 1_000,
+    }
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.sockets.append(self.connection)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.reply()
+
+    def do_POST(self):
+        self.reply()
+
+    def reply(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.command, self.path))
+        reply = self.server.replies.pop(0) if self.server.replies else (200, {})
+        if reply is None:
+            # Read the request, then close the connection without responding
+            self.close_connection = True
+            return
+        status, body = reply
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubAlgod(http.server.ThreadingHTTPServer):
+    """Answers requests with `replies` in order, a (status, JSON body) pair or
+    None to drop the connection, and 200 {} once they run out."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.replies: list[tuple[int, dict] | None] = []
+        self.requests: list[tuple[str, str]] = []
+        self.sockets: list[socket.socket] = []
+
+    def close_idle_connections(self) -> None:
+        """Close every connection from the server's side, as algod does once
+        a kept-alive connection has been idle for a while."""
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+@pytest.fixture
+def server():
+    server = StubAlgod()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=0.0, sleeps=[])
+    monkeypatch.setattr(
+        pooled_algod,
+        "time",
+        types.SimpleNamespace(
+            monotonic=lambda: clock.now, sleep=lambda delay: clock.sleeps.append(delay)
+        ),
+    )
+    return clock
+
+
+@pytest.fixture
+def client(server, clock):
+    return PooledAlgodClient("token", f"http://127.0.0.1:{server.server_port}")
+
+
+def test_reuses_one_connection(server, client):
+    for _ in range(3):
+        client.status()
+
+    assert len(server.requests) == 3
+    assert len(server.sockets) == 1
+    assert client.stats.connections == 1
+
+
+@pytest.mark.parametrize("status", sorted(pooled_algod.TRANSIENT_STATUSES))
+def test_get_is_retried_on_transient_statuses(server, client, clock, status):
+    server.replies = [(status, {"message": "busy"}), (200, {"last-round": 7})]
+
+    assert client.status() == {"last-round": 7}
+    assert len(server.requests) == 2
+    assert client.stats.retries == 1
+    assert len(clock.sleeps) == 1
+
+
+def test_get_gives_up_after_max_retries(server, client):
+    server.replies = [(503, {"message": "busy"})] * (MAX_RETRIES + 2)
+
+    with pytest.raises(error.AlgodHTTPError) as raised:
+        client.status()
+
+    assert raised.value.code == 503
+    assert len(server.requests) == MAX_RETRIES + 1
+
+
+@pytest.mark.parametrize("status", sorted(pooled_algod.UNPROCESSED_STATUSES))
+def test_post_is_retried_when_turned_away(server, client, status):
+    server.replies = [(status, {"message": "busy"}), (200, {"txId": "TX"})]
+
+    assert client.send_raw_transaction(TRANSACTION) == "TX"
+    assert server.requests == [("POST", "/v2/transactions")] * 2
+
+
+@pytest.mark.parametrize(
+    "status",
+    sorted(pooled_algod.TRANSIENT_STATUSES - pooled_algod.UNPROCESSED_STATUSES),
+)
+def test_post_is_not_retried_on_gateway_errors(server, client, status):
+    server.replies = [(status, {"message": "gateway"}), (200, {"txId": "TX"})]
+
+    with pytest.raises(error.AlgodHTTPError):
+        client.send_raw_transaction(TRANSACTION)
+
+    assert len(server.requests) == 1
+
+
+def test_post_is_not_resent_when_dropped_on_a_new_connection(server, client):
+    server.replies = [None, (200, {"txId": "TX"})]
+
+    with pytest.raises(ConnectionError):
+        client.send_raw_transaction(TRANSACTION)
+
+    assert server.requests == [("POST", "/v2/transactions")]
+
+
+def test_get_is_retried_when_dropped(server, client):
+    server.replies = [None, (200, {"last-round": 7})]
+
+    assert client.status() == {"last-round": 7}
+    assert len(server.requests) == 2
+
+
+def test_post_is_resent_once_when_a_kept_alive_connection_went_stale(server, client):
+    client.status()
+    server.close_idle_connections()
+    server.replies = [(200, {"txId": "TX"})]
+
+    assert client.send_raw_transaction(TRANSACTION) == "TX"
+    assert server.requests == [
+        ("GET", "/v2/status"),
+        ("POST", "/v2/transactions"),
+    ]
+    assert client.stats.connections == 2
+    assert client.stats.retries == 0
+
+
+def test_post_on_a_new_connection_after_a_stale_one_is_not_resent_again(server, client):
+    client.status()
+    server.close_idle_connections()
+    server.replies = [None, (200, {"txId": "TX"})]
+
+    with pytest.raises(ConnectionError):
+        client.send_raw_transaction(TRANSACTION)
+
+    assert server.requests == [
+        ("GET", "/v2/status"),
+        ("POST", "/v2/transactions"),
+    ]
+
+
+def test_suggested_params_are_cached_for_ttl_rounds(server, client):
+    server.replies = [(200, params(100))]
+    first = client.suggested_params()
+
+    server.replies = [(200, {"last-round": 100 + SUGGESTED_PARAMS_TTL_ROUNDS - 1})]
+    client.status()
+    assert client.suggested_params().first == first.first
+    assert client.stats.suggested_params_hits == 1
+
+    server.replies = [
+        (200, {"last-round": 100 + SUGGESTED_PARAMS_TTL_ROUNDS}),
+        (200, params(100 + SUGGESTED_PARAMS_TTL_ROUNDS)),
+    ]
+    client.status()
+    assert client.suggested_params().first == 100 + SUGGESTED_PARAMS_TTL_ROUNDS
+    assert client.stats.suggested_params_fetches == 2
+
+
+def test_suggested_params_expire_after_max_age(server, client, clock):
+    server.replies = [(200, params(100))]
+    client.suggested_params()
+
+    clock.now += SUGGESTED_PARAMS_MAX_AGE - 0.1
+    client.suggested_params()
+    assert client.stats.suggested_params_fetches == 1
+
+    server.replies = [(200, params(101))]
+    clock.now += 0.1
+    assert client.suggested_params().first == 101
+    assert client.stats.suggested_params_fetches == 2
+
+
+def test_suggested_params_are_copies(server, client):
+    server.replies = [(200, params(100))]
+    client.suggested_params().fee = 5_000
+
+    assert client.suggested_params().fee != 5_000
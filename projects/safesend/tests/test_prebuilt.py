@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import json
+import types
+from pathlib import Path
+
+import pytest
+from algokit_utils import AppManager
+from algosdk.v2client import algod
+
+from smart_contracts._helpers import prebuilt, source_maps
+from smart_contracts._helpers.pooled_algod import PooledAlgodClient
+
+APP_NAME = "SafeSendApp"
+APPROVAL = "#pragma version 10\n// Check the sender\nint 1\nreturn\n"
+CLEAR = "#pragma version 10\nint 1\nreturn\n"
+BYTECODE = {"approval": b"\x0a\x81\x01\x43", "clear": b"\x0a\x81\x01\x43\x00"}
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def build(output_dir: Path, approval: str = APPROVAL) -> None:
+    """Writes what a build writes for one app: its app spec and bytecode, then
+    its programs manifest."""
+    output_dir.mkdir(parents=True)
+    (output_dir / f"{APP_NAME}.arc56.json").write_text(
+        json.dumps(
+            {
+                "name": APP_NAME,
+                "source": {
+                    "approval": base64.b64encode(approval.encode()).decode(),
+                    "clear": base64.b64encode(CLEAR.encode()).decode(),
+                },
+            }
+        )
+    )
+    for program, bytecode in BYTECODE.items():
+        (output_dir / f"{APP_NAME}.{program}.bin").write_bytes(bytecode)
+    prebuilt.record(output_dir)
+
+
+def app_spec(approval: str = APPROVAL):
+    return types.SimpleNamespace(
+        name=APP_NAME,
+        source=types.SimpleNamespace(
+            get_decoded_approval=lambda: approval, get_decoded_clear=lambda: CLEAR
+        ),
+    )
+
+
+def compiled_teal(teal: str) -> str:
+    """The TEAL algokit_utils sends to algod's compile endpoint."""
+    return AppManager.strip_teal_comments(teal)
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(prebuilt, "artifacts_path", tmp_path)
+    monkeypatch.setattr(source_maps, "cached", lambda key: None)
+    build(tmp_path / "safesend_contracts")
+    return tmp_path / "safesend_contracts"
+
+
+@pytest.fixture
+def algod_compiles(monkeypatch):
+    """The TEAL the client sends on to algod, which answers with empty bytecode."""
+    compiled: list[str] = []
+
+    def compile(self, source, source_map=False, **kwargs):
+        compiled.append(source)
+        return {"hash": "", "result": ""}
+
+    monkeypatch.setattr(algod.AlgodClient, "compile", compile)
+    return compiled
+
+
+def registered_client(spec) -> PooledAlgodClient:
+    client = PooledAlgodClient("token", "http://127.0.0.1:4001")
+    factory = types.SimpleNamespace(
+        app_name=APP_NAME,
+        app_spec=spec,
+        algorand=types.SimpleNamespace(client=types.SimpleNamespace(algod=client)),
+    )
+    prebuilt.register(factory)
+    return client
+
+
+def test_record_writes_sizes_and_hashes(artifacts):
+    manifest = json.loads((artifacts / f"{APP_NAME}.programs.json").read_text())
+
+    assert manifest == {
+        program: {
+            "size": len(BYTECODE[program]),
+            "bytecode_sha256": sha256(BYTECODE[program]),
+            "teal_sha256": sha256(teal.encode()),
+        }
+        for program, teal in (("approval", APPROVAL), ("clear", CLEAR))
+    }
+    assert prebuilt.program_sizes(artifacts) == {
+        APP_NAME: {program: len(bytecode) for program, bytecode in BYTECODE.items()}
+    }
+
+
+def test_compile_serves_the_built_bytecode(artifacts, algod_compiles):
+    client = registered_client(app_spec())
+
+    result = client.compile(compiled_teal(APPROVAL))
+
+    assert base64.b64decode(result["result"]) == BYTECODE["approval"]
+    assert algod_compiles == []
+    assert client.stats.prebuilt_compiles == 1
+
+
+def test_compile_serves_the_built_bytecode_despite_comment_changes(
+    artifacts, algod_compiles
+):
+    client = registered_client(app_spec())
+
+    result = client.compile(compiled_teal(APPROVAL.replace("the sender", "nothing")))
+
+    assert base64.b64decode(result["result"]) == BYTECODE["approval"]
+    assert algod_compiles == []
+
+
+def test_compile_misses_on_changed_teal(artifacts, algod_compiles):
+    client = registered_client(app_spec())
+    # As deploy-time template values or updatable/deletable flags change it
+    changed = compiled_teal(APPROVAL.replace("int 1", "int 0"))
+
+    client.compile(changed)
+
+    assert algod_compiles == [changed]
+    assert client.stats.prebuilt_compiles == 0
+
+
+def test_load_skips_a_build_of_other_teal(artifacts, algod_compiles):
+    changed = APPROVAL.replace("int 1", "int 0")
+
+    assert prebuilt.load(app_spec(changed)) == {}
+    client = registered_client(app_spec(changed))
+    client.compile(compiled_teal(changed))
+    assert algod_compiles == [compiled_teal(changed)]
+
+
+def test_load_rejects_bytecode_that_does_not_match_the_manifest(artifacts):
+    (artifacts / f"{APP_NAME}.approval.bin").write_bytes(b"\x0a\x81\x00\x43")
+
+    with pytest.raises(ValueError, match="does not match the hash recorded"):
+        prebuilt.load(app_spec())
+    with pytest.raises(ValueError, match="does not match the hash recorded"):
+        registered_client(app_spec())
+
+
+def test_load_skips_apps_without_a_manifest(artifacts):
+    (artifacts / f"{APP_NAME}.programs.json").unlink()
+
+    assert prebuilt.load(app_spec()) == {}
@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from smart_contracts._helpers import staging
+
+
+def write(directory: Path, files: dict[str, str]) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        (directory / name).write_text(content)
+
+
+def test_link_unchanged_files_links_identical_files_only(tmp_path: Path):
+    target_dir = tmp_path / "counter"
+    write(target_dir, {"same.teal": "int 1\n", "changed.teal": "int 1\n"})
+    staging_dir = staging.create_staging_dir(target_dir)
+    write(
+        staging_dir,
+        {"same.teal": "int 1\n", "changed.teal": "int 2\n", "new.teal": "int 3\n"},
+    )
+
+    assert staging.link_unchanged_files(staging_dir, target_dir) == 1
+
+    assert (staging_dir / "same.teal").samefile(target_dir / "same.teal")
+    assert not (staging_dir / "changed.teal").samefile(target_dir / "changed.teal")
+    assert (staging_dir / "changed.teal").read_text() == "int 2\n"
+    # No temporary links are left behind
+    assert sorted(path.name for path in staging_dir.iterdir()) == [
+        "changed.teal",
+        "new.teal",
+        "same.teal",
+    ]
+
+
+def test_link_unchanged_files_without_previous_build(tmp_path: Path):
+    target_dir = tmp_path / "counter"
+    staging_dir = staging.create_staging_dir(target_dir)
+    write(staging_dir, {"new.teal": "int 1\n"})
+
+    assert staging.link_unchanged_files(staging_dir, target_dir) == 0
+
+
+def test_publish_keeps_inode_and_mtime_of_unchanged_files(tmp_path: Path):
+    target_dir = tmp_path / "counter"
+    write(target_dir, {"same.teal": "int 1\n", "removed.teal": "int 0\n"})
+    os.utime(target_dir / "same.teal", ns=(1_000_000_000, 1_000_000_000))
+    before = (target_dir / "same.teal").stat()
+    staging_dir = staging.create_staging_dir(target_dir)
+    write(staging_dir, {"same.teal": "int 1\n", "new.teal": "int 2\n"})
+    staging.link_unchanged_files(staging_dir, target_dir)
+
+    staging.publish(staging_dir, target_dir)
+
+    after = (target_dir / "same.teal").stat()
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    assert sorted(path.name for path in target_dir.iterdir()) == [
+        "new.teal",
+        "same.teal",
+    ]
+    # Neither the staging directory nor the previous build is left behind
+    assert [path.name for path in tmp_path.iterdir()] == ["counter"]
+
+
+def test_publish_creates_missing_target(tmp_path: Path):
+    target_dir = tmp_path / "counter"
+    staging_dir = staging.create_staging_dir(target_dir)
+    write(staging_dir, {"new.teal": "int 1\n"})
+
+    staging.publish(staging_dir, target_dir)
+
+    assert (target_dir / "new.teal").read_text() == "int 1\n"
+    assert not staging_dir.exists()
+
+
+def test_publish_without_atomic_exchange(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(staging, "_exchange", lambda first, second: False)
+    target_dir = tmp_path / "counter"
+    write(target_dir, {"old.teal": "int 0\n"})
+    staging_dir = staging.create_staging_dir(target_dir)
+    write(staging_dir, {"new.teal": "int 1\n"})
+
+    staging.publish(staging_dir, target_dir)
+
+    assert [path.name for path in target_dir.iterdir()] == ["new.teal"]
+    assert [path.name for path in tmp_path.iterdir()] == ["counter"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_staging_dir_matches_target_permissions(tmp_path: Path):
+    target_dir = tmp_path / "counter"
+    target_dir.mkdir(mode=0o755)
+    os.chmod(target_dir, 0o755)
+
+    staging_dir = staging.create_staging_dir(target_dir)
+
+    assert staging_dir.parent == tmp_path
+    assert staging_dir.name.startswith(".counter.staging-")
+    assert staging_dir.stat().st_mode & 0o777 == 0o755
@@ -0,0 +1,190 @@
+import json
+import random
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from algosdk.encoding import decode_address, encode_address
+
+from smart_contracts.safesend_contracts.update_whitelist import (
+    ADD,
+    MAX_BOXES_PER_CALL,
+    MAX_GROUP_SIZE,
+    REMOVE,
+    WHITELIST_BOX_MIN_BALANCE,
+    WHITELIST_BOX_PREFIX,
+    plan_funding,
+    plan_groups,
+    read_updates,
+    send_group,
+    whitelisted_receivers,
+)
+
+# References an app call may have
+MAX_REFERENCES_PER_CALL = 8
+
+
+def addresses(count: int) -> list[str]:
+    rng = random.Random(count)
+    return [encode_address(rng.randbytes(32)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("count", [0, 1, 8, 9, 128, 129, 1_000])
+def test_plan_groups_stays_within_avm_limits(count):
+    accounts = addresses(count)
+
+    groups = plan_groups([(ADD, address) for address in accounts])
+
+    assert [
+        address for calls in groups for _, receivers in calls for address in receivers
+    ] == accounts
+    assert len(groups) == -(-count // ((MAX_GROUP_SIZE - 1) * MAX_BOXES_PER_CALL))
+    for calls in groups:
+        # One transaction is left for the funding payment
+        assert 1 <= len(calls) + 1 <= MAX_GROUP_SIZE
+        for _, receivers in calls:
+            # Each receiver's whitelist box is one reference
+            assert 1 <= len(receivers) <= MAX_BOXES_PER_CALL <= MAX_REFERENCES_PER_CALL
+
+
+def test_plan_groups_keeps_the_last_change_to_each_address():
+    a, b, c = addresses(3)
+
+    groups = plan_groups([(ADD, a), (ADD, b), (REMOVE, a), (REMOVE, c), (ADD, c)])
+
+    assert groups == [[(ADD, [b, c]), (REMOVE, [a])]]
+
+
+def test_plan_groups_never_mixes_actions_in_a_call():
+    accounts = addresses(20)
+    updates = [(ADD if index % 2 else REMOVE, a) for index, a in enumerate(accounts)]
+
+    (calls,) = plan_groups(updates)
+
+    assert [(action, len(receivers)) for action, receivers in calls] == [
+        (ADD, 8),
+        (ADD, 2),
+        (REMOVE, 8),
+        (REMOVE, 2),
+    ]
+
+
+def test_read_updates_from_csv_and_jsonl(tmp_path: Path):
+    a, b = addresses(2)
+    csv_path = tmp_path / "changes.csv"
+    csv_path.write_text(f"address,action\n{a},\n {b} ,Remove\n")
+    jsonl_path = tmp_path / "changes.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"address": a})
+        + "\n\n"
+        + json.dumps({"address": b, "action": "remove"})
+    )
+
+    assert read_updates(csv_path) == [(ADD, a), (REMOVE, b)]
+    assert read_updates(jsonl_path) == [(ADD, a), (REMOVE, b)]
+
+
+@pytest.mark.parametrize(
+    ("row", "message"),
+    [("not-an-address,add", "invalid address"), ("{address},drop", "unknown action")],
+)
+def test_read_updates_rejects_bad_entries(tmp_path: Path, row, message):
+    path = tmp_path / "changes.csv"
+    path.write_text("address,action\n" + row.format(address=addresses(1)[0]) + "\n")
+
+    with pytest.raises(ValueError, match=f"entry 1: {message}"):
+        read_updates(path)
+
+
+def test_whitelist_box_min_balance_matches_the_avm():
+    # 2500 per box and 400 per byte of its name and value
+    assert WHITELIST_BOX_MIN_BALANCE == 15_700
+
+
+def test_plan_funding_counts_only_boxes_each_group_creates_on_net():
+    a, b, c, d, e = addresses(5)
+    groups = [
+        [(ADD, [a, b, c])],
+        [(ADD, [d]), (REMOVE, [e])],
+        [(REMOVE, [b, d])],
+    ]
+
+    # a is already whitelisted, and only e has a box to remove
+    funding = plan_funding(groups, whitelisted={a, e})
+
+    assert funding == [2 * WHITELIST_BOX_MIN_BALANCE, 0, 0]
+
+
+def test_plan_funding_of_a_planned_import():
+    accounts = addresses(300)
+    groups = plan_groups([(ADD, address) for address in accounts])
+
+    funding = plan_funding(groups, whitelisted=set(accounts[:100]))
+
+    assert sum(funding) == 200 * WHITELIST_BOX_MIN_BALANCE
+
+
+def test_whitelisted_receivers_reads_whitelist_boxes():
+    a, b = addresses(2)
+    names = [
+        WHITELIST_BOX_PREFIX + decode_address(a),
+        WHITELIST_BOX_PREFIX + decode_address(b),
+        b"a\x00",  # an audit log box
+        b"w",
+    ]
+    app_client = types.SimpleNamespace(
+        app_client=types.SimpleNamespace(
+            get_box_names=lambda: [types.SimpleNamespace(name_raw=n) for n in names]
+        )
+    )
+
+    assert whitelisted_receivers(app_client) == {a, b}
+
+
+class FakeComposer:
+    def __init__(self, sent: list):
+        self.transactions: list = []
+        self.sent = sent
+
+    def composer(self):
+        return types.SimpleNamespace(add_payment=self.transactions.append)
+
+    def add_to_whitelist(self, args, params):
+        self.transactions.append((ADD, args, params))
+
+    def remove_from_whitelist(self, args, params):
+        self.transactions.append((REMOVE, args, params))
+
+    def send(self):
+        self.sent.append(self.transactions)
+
+
+@pytest.mark.parametrize("funding", [0, 2 * WHITELIST_BOX_MIN_BALANCE])
+def test_send_group_pays_for_new_boxes_first(monkeypatch, funding):
+    # Stands in for the client generated at build time
+    client_module = types.ModuleType("safesend_contracts_client")
+    client_module.AddToWhitelistArgs = client_module.RemoveFromWhitelistArgs = (
+        lambda receivers: types.SimpleNamespace(receivers=receivers)
+    )
+    monkeypatch.setitem(
+        sys.modules,
+        "smart_contracts.artifacts.safesend_contracts.safesend_contracts_client",
+        client_module,
+    )
+    sent: list = []
+    owner, app, a, b = addresses(4)
+    app_client = types.SimpleNamespace(
+        app_address=app, new_group=lambda: FakeComposer(sent)
+    )
+
+    send_group(app_client, [(ADD, [a, b])], funding, owner)
+
+    (transactions,) = sent
+    if funding:
+        payment, *transactions = transactions
+        assert (payment.sender, payment.receiver) == (owner, app)
+        assert payment.amount.micro_algo == funding
+    assert [(action, args.receivers) for action, args, _ in transactions] == [
+        (ADD, [a, b])
+    ]
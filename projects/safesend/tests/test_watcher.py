@@ -0,0 +1,57 @@
+import shutil
+import sys
+
+import pytest
+
+from smart_contracts._helpers.watcher import InotifyWatcher, PollingWatcher
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux only"
+)
+
+
+@pytest.fixture
+def watcher():
+    watcher = InotifyWatcher()
+    yield watcher
+    watcher.close()
+
+
+def test_watch_skips_directories_that_no_longer_exist(tmp_path, watcher):
+    missing = tmp_path / "removed_contract"
+    present = tmp_path / "contract"
+    present.mkdir()
+
+    watcher.watch([missing, present])
+    (present / "contract.py").write_text("")
+
+    assert watcher.poll(1.0) == {present / "contract.py"}
+
+
+def test_removed_directories_are_watched_again_once_recreated(tmp_path, watcher):
+    contract = tmp_path / "contract"
+    contract.mkdir()
+    (contract / "contract.py").write_text("")
+    watcher.watch([contract])
+
+    shutil.rmtree(contract)
+    assert watcher.poll(1.0) == {contract / "contract.py"}
+    # Drains the removal of the directory's watch
+    watcher.poll(0.1)
+
+    contract.mkdir()
+    watcher.watch([contract])
+    (contract / "contract.py").write_text("")
+    assert watcher.poll(1.0) == {contract / "contract.py"}
+
+
+def test_polling_watcher_reports_files_of_removed_directories(tmp_path):
+    contract = tmp_path / "contract"
+    contract.mkdir()
+    (contract / "contract.py").write_text("")
+    watcher = PollingWatcher(interval=0.01)
+    watcher.watch([contract])
+
+    shutil.rmtree(contract)
+
+    assert watcher.poll(1.0) == {contract / "contract.py"}
@@ -1,31 +1,86 @@
+import argparse
+import contextlib
 import dataclasses
+import functools
+import hashlib
 import importlib
+import io
 import logging
+import os
+import shutil
 import subprocess
 import sys
+import time
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from shutil import rmtree
 
-from algokit_utils.config import config
-from dotenv import load_dotenv
-
-# Set trace_all to True to capture all transactions, defaults to capturing traces only on failure
-# Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
-# Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
-config.configure(debug=True, trace_all=False)
-
-# Set up logging and load environment variables.
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s %(levelname)-10s: %(message)s"
+from smart_contracts._helpers import (
+    compiler,
+    deploy_ledger,
+    prebuilt,
+    profiling,
+    session,
+    source_maps,
+    staging,
+)
+from smart_contracts._helpers.build_cache import (
+    BuildCache,
+    local_sources,
+    package_version,
+    tool_versions,
 )
+from smart_contracts._helpers.discovery import discover_contracts
+from smart_contracts._helpers.watcher import create_watcher, wait_for_changes
+
+# Set up logging. Deploy-only setup (algokit_utils config, .env, DEBUG logging) is
+# deferred to configure_deploy_environment() so builds start quickly.
+log_format = "%(asctime)s %(levelname)-10s: %(message)s"
+logging.basicConfig(level=logging.INFO, format=log_format)
 logger = logging.getLogger(__name__)
-logger.info("Loading .env")
-load_dotenv()
 
 # Determine the root path based on this file's location.
 root_path = Path(__file__).parent
 
+# Cached build state (see BuildCache and discover_contracts), kept out of artifacts.
+build_cache_dir = root_path.parent / ".algokit" / "build-cache"
+
+
+# DEPLOY_PROFILE selects how deployments trade diagnostics for speed
+DEVELOPMENT_PROFILE = "development"
+PRODUCTION_PROFILE = "production"
+
+
+def configure_deploy_environment() -> None:
+    """
+    Loads the .env and configures algokit_utils and logging for deployments,
+    according to its DEPLOY_PROFILE.
+    """
+    from algokit_utils.config import config
+    from dotenv import load_dotenv
+
+    logger.info("Loading .env")
+    load_dotenv()
+    profile = os.getenv("DEPLOY_PROFILE") or DEVELOPMENT_PROFILE
+    if profile == PRODUCTION_PROFILE:
+        # No re-simulation of failed groups and no per-request DEBUG logging;
+        # set TRACE_SAMPLE_RATE to capture traces in the background instead
+        config.configure(debug=False, trace_all=False)
+        return
+    if profile != DEVELOPMENT_PROFILE:
+        raise ValueError(
+            f"Unknown DEPLOY_PROFILE {profile!r}, "
+            f"expected {DEVELOPMENT_PROFILE!r} or {PRODUCTION_PROFILE!r}"
+        )
+
+    # Set trace_all to True to capture all transactions, defaults to capturing traces only on failure
+    # Learn more about using AlgoKit AVM Debugger to debug your TEAL source codes and inspect various kinds of
+    # Algorand transactions in atomic groups -> https://github.com/algorandfoundation/algokit-avm-vscode-debugger
+    config.configure(debug=True, trace_all=False)
+
+    logging.getLogger().setLevel(logging.DEBUG)
+
+
 # ----------------------- Contract Configuration ----------------------- #
 
 
@@ -33,7 +88,15 @@ root_path = Path(__file__).parent
 class SmartContract:
     path: Path
     name: str
-    deploy: Callable[[], None] | None = None
+    has_deploy_config: bool = False
+
+    @functools.cached_property
+    def deploy(self) -> Callable[..., None] | None:
+        """The deploy function from the contract's deploy_config, imported on first use."""
+        if not self.has_deploy_config:
+            return None
+        with profiling.contract(self.name), profiling.phase("deploy_config import"):
+            return import_deploy_if_exists(self.path.parent)
 
 
 def import_contract(folder: Path) -> Path:
@@ -45,7 +108,7 @@ def import_contract(folder: Path) -> Path:
         raise Exception(f"Contract not found in {folder}")
 
 
-def import_deploy_if_exists(folder: Path) -> Callable[[], None] | None:
+def import_deploy_if_exists(folder: Path) -> Callable[..., None] | None:
     """Imports the deploy function from a folder if it exists."""
     try:
         module_name = f"{folder.parent.name}.{folder.name}.deploy_config"
@@ -61,21 +124,59 @@ def has_contract_file(directory: Path) -> bool:
 
 
 # Use the current directory (root_path) as the base for contract folders and exclude
-# folders that start with '_' (internal helpers).
+# folders that start with '_' (internal helpers). Only paths are recorded here,
+# deploy_config modules are imported when a contract is deployed.
+discovery_start = time.perf_counter()
 contracts: list[SmartContract] = [
     SmartContract(
-        path=import_contract(folder),
-        name=folder.name,
-        deploy=import_deploy_if_exists(folder),
+        path=import_contract(root_path / str(entry["name"])),
+        name=str(entry["name"]),
+        has_deploy_config=bool(entry["has_deploy_config"]),
     )
-    for folder in root_path.iterdir()
-    if folder.is_dir() and has_contract_file(folder) and not folder.name.startswith("_")
+    for entry in discover_contracts(root_path, build_cache_dir / "contracts.json")
 ]
+discovery_seconds = time.perf_counter() - discovery_start
 
 # -------------------------- Build Logic -------------------------- #
 
 deployment_extension = "py"
 
+compile_command = ["algokit", "--no-color", "compile", "python"]
+# Flags shared by every build profile
+compile_flags = [
+    "--no-output-arc32",
+    "--output-arc56",
+    # Deploys use the assembled programs instead of compiling on algod
+    "--output-bytecode",
+]
+
+# --build-profile selects what a build optimizes for and emits
+DEV_BUILD = "dev"
+RELEASE_BUILD = "release"
+build_profile_flags = {
+    DEV_BUILD: ["--output-source-map"],
+    # Smallest programs, without the debug information and source maps deploys
+    # don't need. The sourcemaps action writes TEAL source maps on request
+    RELEASE_BUILD: ["--optimization-level", "2", "--debug-level", "0"],
+}
+
+# AVM limits: bytes per program page, and pages per app (1 + 3 extra pages)
+MAX_PROGRAM_PAGE_SIZE = 2048
+MAX_PROGRAM_PAGES = 4
+
+
+def profile_compile_flags(build_profile: str) -> list[str]:
+    """Returns the puyapy flags of a build profile."""
+    return [*compile_flags, *build_profile_flags[build_profile]]
+
+
+# Records the inputs of the last build of each contract, see BuildCache.
+build_cache_path = build_cache_dir / "manifest.json"
+
+
+# Suffix of the file recording the app spec hash a client was generated from.
+client_spec_hash_suffix = ".spec.sha256"
+
 
 def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
     """Constructs the output path for the generated client file."""
@@ -86,81 +187,589 @@ def _get_output_path(output_dir: Path, deployment_extension: str) -> Path:
     )
 
 
-def build(output_dir: Path, contract_path: Path) -> Path:
-    """
-    Builds the contract by exporting (compiling) its source and generating a client.
-    If the output directory already exists, it is cleared.
-    """
-    output_dir = output_dir.resolve()
-    if output_dir.exists():
-        rmtree(output_dir)
-    output_dir.mkdir(exist_ok=True, parents=True)
-    logger.info(f"Exporting {contract_path} to {output_dir}")
+def _spec_hash(app_spec_path: Path) -> str:
+    """Hashes an app spec together with the client generator version."""
+    digest = hashlib.sha256(app_spec_path.read_bytes())
+    digest.update(package_version("algokit-client-generator").encode())
+    return digest.hexdigest()
 
-    build_result = subprocess.run(
+
+def _run_client_generator(app_spec: Path, output: Path) -> None:
+    """Runs `algokit generate client` for an app spec file or a whole directory."""
+    generate_result = subprocess.run(
         [
             "algokit",
-            "--no-color",
-            "compile",
-            "python",
-            str(contract_path.resolve()),
-            f"--out-dir={output_dir}",
-            "--no-output-arc32",
-            "--output-arc56",
-            "--output-source-map",
+            "generate",
+            "client",
+            str(app_spec),
+            "--output",
+            str(output),
         ],
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
     )
-    if build_result.returncode:
-        raise Exception(f"Could not build contract:\n{build_result.stdout}")
+    if generate_result.returncode:
+        if "No such command" in generate_result.stdout:
+            raise Exception(
+                "Could not generate typed client, requires AlgoKit 2.0.0 or later. Please update AlgoKit"
+            )
+        else:
+            raise Exception(
+                f"Could not generate typed client:\n{generate_result.stdout}"
+            )
 
-    # Look for arc56.json files and generate the client based on them.
-    app_spec_file_names: list[str] = [
-        file.name for file in output_dir.glob("*.arc56.json")
-    ]
 
-    client_file: str | None = None
-    if not app_spec_file_names:
-        logger.warning(
-            "No '*.arc56.json' file found (likely a logic signature being compiled). Skipping client generation."
-        )
+def _generate_clients(
+    output_dir: Path,
+    app_spec_paths: list[Path],
+    previous_dir: Path,
+    in_process: bool = False,
+) -> None:
+    """
+    Generates typed clients into `output_dir` in a single pass. A spec whose hash
+    matches the one recorded beside its client in `previous_dir` reuses that
+    client instead of generating it again.
+    """
+    output_template = _get_output_path(output_dir, deployment_extension)
+    stale: list[tuple[Path, Path, Path, str]] = []
+    for app_spec_path in app_spec_paths:
+        client_path = compiler.client_path(app_spec_path, output_template)
+        hash_path = client_path.with_suffix(client_spec_hash_suffix)
+        spec_hash = _spec_hash(app_spec_path)
+        previous_client = previous_dir / client_path.name
+        previous_hash = previous_dir / hash_path.name
+        if (
+            previous_client.exists()
+            and previous_hash.exists()
+            and previous_hash.read_text().strip() == spec_hash
+        ):
+            logger.info(
+                f"{app_spec_path.name} is unchanged, keeping {client_path.name}"
+            )
+            shutil.copy2(previous_client, client_path)
+            shutil.copy2(previous_hash, hash_path)
+        else:
+            stale.append((app_spec_path, client_path, hash_path, spec_hash))
+
+    if in_process:
+        for app_spec_path, *_ in stale:
+            compiler.generate_client(app_spec_path, output_template)
+    elif stale and len(stale) == len(app_spec_paths):
+        # One run of the generator handles every spec in the directory
+        _run_client_generator(output_dir, output_template)
     else:
-        for file_name in app_spec_file_names:
-            client_file = file_name
-            print(file_name)
-            generate_result = subprocess.run(
-                [
-                    "algokit",
-                    "generate",
-                    "client",
-                    str(output_dir),
-                    "--output",
-                    str(_get_output_path(output_dir, deployment_extension)),
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
+        for app_spec_path, client_path, *_ in stale:
+            _run_client_generator(app_spec_path, client_path)
+
+    for app_spec_path, client_path, hash_path, spec_hash in stale:
+        if not client_path.exists():
+            logger.warning(f"Expected {client_path.name} to be generated")
+            continue
+        logger.info(f"Generated {client_path.name} from {app_spec_path.name}")
+        hash_path.write_text(f"{spec_hash}\n")
+
+
+def build(
+    output_dir: Path,
+    contract_path: Path,
+    in_process: bool = False,
+    build_profile: str = DEV_BUILD,
+) -> Path:
+    """
+    Builds the contract by exporting (compiling) its source and generating a client.
+    The build is written to a staging directory beside `output_dir` and swapped
+    into place once it has succeeded, so a failed build leaves the previous
+    artifacts intact and readers never see a partial build. Files whose bytes did
+    not change keep their inode and mtime. With `in_process` the compiler and
+    client generator are called through their Python APIs, which requires
+    `compiler.warm_up()` to have succeeded. The assembled programs are recorded
+    with their hashes for deploys to use (see `prebuilt`). `build_profile` picks
+    the compile flags (see `build_profile_flags`).
+    """
+    output_dir = output_dir.resolve()
+    staging_dir = staging.create_staging_dir(output_dir)
+    try:
+        logger.info(f"Exporting {contract_path} to {output_dir}")
+        with profiling.phase("compile"):
+            _compile(staging_dir, contract_path, in_process, build_profile)
+        prebuilt.record(staging_dir)
+
+        # Look for arc56.json files and generate the client based on them.
+        app_spec_paths: list[Path] = sorted(staging_dir.glob("*.arc56.json"))
+
+        if not app_spec_paths:
+            logger.warning(
+                "No '*.arc56.json' file found (likely a logic signature being compiled). Skipping client generation."
             )
-            if generate_result.returncode:
-                if "No such command" in generate_result.stdout:
-                    raise Exception(
-                        "Could not generate typed client, requires AlgoKit 2.0.0 or later. Please update AlgoKit"
-                    )
-                else:
-                    raise Exception(
-                        f"Could not generate typed client:\n{generate_result.stdout}"
-                    )
-    if client_file:
-        return output_dir / client_file
+        else:
+            with profiling.phase("client generation"):
+                _generate_clients(staging_dir, app_spec_paths, output_dir, in_process)
+
+        with profiling.phase("swap"):
+            staging.link_unchanged_files(staging_dir, output_dir)
+            staging.publish(staging_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    if app_spec_paths:
+        return output_dir / app_spec_paths[-1].name
     return output_dir
 
 
+def _compile(
+    output_dir: Path,
+    contract_path: Path,
+    in_process: bool = False,
+    build_profile: str = DEV_BUILD,
+) -> None:
+    """Compiles a contract into `output_dir` with puyapy."""
+    flags = profile_compile_flags(build_profile)
+    if in_process:
+        compiler.compile_contract(contract_path.resolve(), output_dir, flags)
+    else:
+        build_result = subprocess.run(
+            [
+                *compile_command,
+                str(contract_path.resolve()),
+                f"--out-dir={output_dir}",
+                *flags,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        if build_result.returncode:
+            raise Exception(f"Could not build contract:\n{build_result.stdout}")
+
+
 # --------------------------- Main Logic --------------------------- #
 
 
-def main(action: str, contract_name: str | None = None) -> None:
+@dataclasses.dataclass
+class _BuildResult:
+    output: str
+    error: str | None
+    mode: str
+    seconds: float
+    phases: list[dict[str, str | float | None]] = dataclasses.field(
+        default_factory=list
+    )
+
+
+def _build_captured(
+    output_dir: Path,
+    contract_path: Path,
+    in_process: bool = False,
+    profile: bool = False,
+    build_profile: str = DEV_BUILD,
+) -> _BuildResult:
+    """
+    Builds a contract inside a pool worker, capturing everything it logs or prints
+    so the parent can emit it as a single block.
+    """
+    output = io.StringIO()
+    handler = logging.StreamHandler(output)
+    handler.setFormatter(logging.Formatter(log_format))
+    root_logger = logging.getLogger()
+    previous_handlers = root_logger.handlers[:]
+    root_logger.handlers = [handler]
+    if in_process and not compiler.available():
+        logger.warning("puyapy/client generator APIs unavailable, using subprocesses")
+        in_process = False
+    mode = "in-process" if in_process else "subprocess"
+    if profile:
+        profiling.enable()
+    # A forked worker starts with the phases the parent had recorded, such as
+    # discovery; only this build's phases are sent back
+    profiling.take_records()
+    start = time.perf_counter()
+    error: str | None = None
+    try:
+        with contextlib.redirect_stdout(output), profiling.contract(output_dir.name):
+            build(output_dir, contract_path, in_process, build_profile)
+    except Exception as ex:
+        error = str(ex)
+    finally:
+        root_logger.handlers = previous_handlers
+    return _BuildResult(
+        output.getvalue(),
+        error,
+        mode,
+        time.perf_counter() - start,
+        profiling.take_records(),
+    )
+
+
+def _record_build(
+    cache: BuildCache,
+    contract: SmartContract,
+    key: str,
+    output_dir: Path,
+    mode: str,
+    seconds: float,
+) -> None:
+    """Records a successful build and logs its time against the other build mode."""
+    other_mode = "subprocess" if mode == "in-process" else "in-process"
+    previous = cache.timing(contract.name, other_mode)
+    message = f"Built {contract.name} in {seconds:.2f}s ({mode})"
+    if previous is not None:
+        message += f", last {other_mode} build took {previous:.2f}s"
+    logger.info(message)
+    cache.record(contract.name, key, output_dir.resolve())
+    cache.record_timing(contract.name, mode, seconds)
+
+
+def create_build_pool(workers: int, in_process: bool = False) -> ProcessPoolExecutor:
+    """Creates build worker processes, warming up the compiler in each if needed."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=compiler.warm_up if in_process else None,
+    )
+
+
+def _build_in_pool(
+    pending: list[tuple[SmartContract, str]],
+    artifact_path: Path,
+    cache: BuildCache,
+    jobs: int,
+    in_process: bool = False,
+    pool: ProcessPoolExecutor | None = None,
+    build_profile: str = DEV_BUILD,
+) -> list[str]:
+    """
+    Builds contracts in a pool of long-lived worker processes. Each contract's
+    output is printed as one block, in the order the contracts were given.
+    When `in_process` is set every worker imports the compiler once and reuses it
+    for all the contracts it builds. An existing `pool` is reused if given.
+    Returns the names of the contracts that failed to build.
+    """
+    failed: list[str] = []
+    with (
+        contextlib.nullcontext(pool)
+        if pool is not None
+        else create_build_pool(min(jobs, len(pending)), in_process)
+    ) as executor:
+        futures = [
+            (
+                contract,
+                key,
+                executor.submit(
+                    _build_captured,
+                    artifact_path / contract.name,
+                    contract.path,
+                    in_process,
+                    profiling.enabled(),
+                    build_profile,
+                ),
+            )
+            for contract, key in pending
+        ]
+        for contract, key, future in futures:
+            try:
+                result = future.result()
+            except Exception as ex:  # e.g. the worker process died
+                result = _BuildResult("", str(ex), "unknown", 0.0)
+            profiling.add_records(result.phases)
+            status = "failed" if result.error else "built"
+            sys.stderr.write(f"----- {contract.name} ({status}) -----\n{result.output}")
+            sys.stderr.flush()
+            if result.error:
+                sys.stderr.write(f"{result.error}\n")
+                failed.append(contract.name)
+            else:
+                _record_build(
+                    cache,
+                    contract,
+                    key,
+                    artifact_path / contract.name,
+                    result.mode,
+                    result.seconds,
+                )
+    return failed
+
+
+def _report_program_sizes(
+    built: list[SmartContract],
+    artifact_path: Path,
+    cache: BuildCache,
+    build_profile: str,
+) -> None:
+    """
+    Logs the program sizes and pages of each app against its last build in the
+    other profile, and records them for that comparison.
+    """
+    other_profile = RELEASE_BUILD if build_profile == DEV_BUILD else DEV_BUILD
+    for contract in built:
+        sizes = prebuilt.program_sizes(artifact_path / contract.name)
+        if not sizes:
+            continue
+        previous = cache.sizes(contract.name, other_profile) or {}
+        for app_name, programs in sizes.items():
+            total = programs["approval"] + programs["clear"]
+            pages = -(-total // MAX_PROGRAM_PAGE_SIZE)
+            message = (
+                f"{app_name} ({build_profile}): approval {programs['approval']} bytes, "
+                f"clear {programs['clear']} bytes, {pages}/{MAX_PROGRAM_PAGES} page(s)"
+            )
+            if app_name in previous:
+                other_total = sum(previous[app_name].values())
+                message += (
+                    f", last {other_profile} build {other_total} bytes "
+                    f"({total - other_total:+d})"
+                )
+            if pages > MAX_PROGRAM_PAGES:
+                logger.warning(f"{message}, too large to deploy")
+            else:
+                logger.info(message)
+        cache.record_sizes(contract.name, build_profile, sizes)
+
+
+def write_source_maps(
+    contracts_to_map: list[SmartContract], artifact_path: Path
+) -> None:
+    """
+    Writes TEAL source maps of the contracts' built programs for the AVM
+    Debugger, on the network configured in .env (see `source_maps`).
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    algod = session.algorand_client().client.algod
+    for contract in contracts_to_map:
+        app_spec_paths = sorted((artifact_path / contract.name).glob("*.arc56.json"))
+        if not app_spec_paths:
+            raise Exception(
+                f"No .arc56.json file found for {contract.name}, build it first"
+            )
+        for app_spec_path in app_spec_paths:
+            source_maps.generate(app_spec_path, algod)
+
+
+def build_contracts(
+    contracts_to_build: list[SmartContract],
+    artifact_path: Path,
+    force: bool = False,
+    jobs: int = 1,
+    in_process: bool = False,
+    pool: ProcessPoolExecutor | None = None,
+    build_profile: str = DEV_BUILD,
+) -> None:
+    """
+    Builds the given contracts, skipping those whose sources, compiler version and
+    compile flags are unchanged since their artifacts were last built. With
+    `jobs` > 1 the remaining contracts are built concurrently, and with
+    `in_process` they are compiled by warm worker processes instead of CLIs.
+    Ends with the program sizes of every contract built in `build_profile`.
+    """
+    cache = BuildCache.load(build_cache_path)
+    versions = tool_versions(compile_command)
+    flags = profile_compile_flags(build_profile)
+    pending: list[tuple[SmartContract, str]] = []
+    for contract in contracts_to_build:
+        key = BuildCache.compute_key(contract.path, root_path, versions, flags)
+        if not force and cache.is_fresh(
+            contract.name, key, artifact_path / contract.name
+        ):
+            cache.hits += 1
+            logger.info(f"Using cached build of {contract.name}")
+            continue
+        cache.misses += 1
+        pending.append((contract, key))
+
+    failed: list[str] = []
+    start = time.perf_counter()
+    try:
+        if pending and (
+            pool is not None or in_process or (jobs > 1 and len(pending) > 1)
+        ):
+            logger.info(f"Building {len(pending)} contract(s) with {jobs} worker(s)")
+            failed = _build_in_pool(
+                pending, artifact_path, cache, jobs, in_process, pool, build_profile
+            )
+        else:
+            for contract, key in pending:
+                output_dir = artifact_path / contract.name
+                logger.info(f"Building app at {contract.path}")
+                contract_start = time.perf_counter()
+                with profiling.contract(contract.name):
+                    build(output_dir, contract.path, build_profile=build_profile)
+                _record_build(
+                    cache,
+                    contract,
+                    key,
+                    output_dir,
+                    "subprocess",
+                    time.perf_counter() - contract_start,
+                )
+        _report_program_sizes(
+            [
+                contract
+                for contract in contracts_to_build
+                if contract.name not in failed
+            ],
+            artifact_path,
+            cache,
+            build_profile,
+        )
+    finally:
+        cache.save()
+        logger.info(f"Build cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+        logger.info(f"Build finished in {time.perf_counter() - start:.2f}s")
+    if failed:
+        raise Exception(f"Could not build contracts: {', '.join(failed)}")
+
+
+def _app_spec_exists(output_dir: Path) -> bool:
+    return output_dir.is_dir() and any(
+        file.is_file() and file.suffixes == [".arc56", ".json"]
+        for file in output_dir.iterdir()
+    )
+
+
+def deploy_contracts(contracts_to_deploy: list[SmartContract], jobs: int = 1) -> None:
+    """
+    Deploys contracts through their deploy_config with one shared AlgorandClient
+    and deployer account. With `jobs` > 1 independent deployments run on a
+    thread pool, so their network round trips and confirmation waits overlap.
+    """
+    # Import deploy_config modules up front rather than from the worker threads
+    deployable = [contract for contract in contracts_to_deploy if contract.deploy]
+    if not deployable:
+        return
+    start = time.perf_counter()
+    algorand = session.algorand_client()
+    deployer = session.deployer_account()
+
+    def deploy(contract: SmartContract) -> None:
+        with profiling.contract(contract.name):
+            logger.info(f"Deploying app {contract.name}")
+            contract_start = time.perf_counter()
+            contract.deploy(algorand, deployer)  # type: ignore[misc]
+            logger.info(
+                f"Deployed {contract.name} in "
+                f"{time.perf_counter() - contract_start:.2f}s"
+            )
+
+    failed: list[str] = []
+    if jobs <= 1 or len(deployable) == 1:
+        for contract in deployable:
+            deploy(contract)
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(deployable))) as executor:
+            futures = {
+                contract.name: executor.submit(deploy, contract)
+                for contract in deployable
+            }
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as ex:
+                    logger.error(f"Deploy of {name} failed: {ex}")
+                    failed.append(name)
+    logger.info(f"Deploy finished in {time.perf_counter() - start:.2f}s")
+    logger.info(f"Network: {session.stats().summary()}")
+    if failed:
+        raise Exception(f"Could not deploy contracts: {', '.join(failed)}")
+
+
+def _unload_generated_clients(contract: SmartContract) -> None:
+    """Drops a contract's imported client modules so a redeploy imports the new ones."""
+    prefix = f"{root_path.name}.artifacts.{contract.name}"
+    for module_name in list(sys.modules):
+        if module_name == prefix or module_name.startswith(f"{prefix}."):
+            del sys.modules[module_name]
+
+
+def watch_contracts(
+    contracts_to_watch: list[SmartContract],
+    artifact_path: Path,
+    in_process: bool = False,
+    deploy: bool = False,
+    debounce: float = 0.3,
+    build_profile: str = DEV_BUILD,
+) -> None:
+    """
+    Watches the contracts' sources, including the local modules they import, and
+    rebuilds only the contracts affected by each change. Bursts of saves are
+    debounced into one rebuild. With `deploy` a successfully rebuilt contract is
+    redeployed through its deploy_config.
+    """
+    if deploy:
+        configure_deploy_environment()
+    pool = create_build_pool(1, in_process) if in_process else None
+    sources: dict[str, set[Path]] = {}
+
+    def rebuild(contract: SmartContract) -> bool:
+        try:
+            build_contracts(
+                [contract],
+                artifact_path,
+                in_process=in_process,
+                pool=pool,
+                build_profile=build_profile,
+            )
+        except Exception as ex:
+            logger.error(f"Build of {contract.name} failed: {ex}")
+            return False
+        finally:
+            try:
+                sources[contract.name] = set(local_sources(contract.path, root_path))
+            except (OSError, SyntaxError):
+                # Deleted or saved mid-edit, keep watching the sources it had
+                sources.setdefault(contract.name, {contract.path})
+        return True
+
+    for contract in contracts_to_watch:
+        rebuild(contract)
+    watcher = create_watcher(
+        {path.parent for paths in sources.values() for path in paths}
+    )
+    logger.info(
+        f"Watching {len(contracts_to_watch)} contract(s) for changes, press Ctrl+C to stop"
+    )
+    try:
+        while True:
+            changed = wait_for_changes(watcher, debounce)
+            for contract in contracts_to_watch:
+                if not sources[contract.name] & changed:
+                    continue
+                logger.info(f"Change detected in {contract.name}, rebuilding")
+                if not rebuild(contract):
+                    continue
+                if deploy and contract.deploy:
+                    _unload_generated_clients(contract)
+                    logger.info(f"Redeploying {contract.name}")
+                    try:
+                        with profiling.contract(contract.name):
+                            contract.deploy(
+                                session.algorand_client(), session.deployer_account()
+                            )
+                    except Exception as ex:
+                        logger.error(f"Deploy of {contract.name} failed: {ex}")
+            # Rescan every contract's source directories: rebuilds may import new
+            # modules, and removed directories are watched again once recreated
+            watcher.watch(path.parent for paths in sources.values() for path in paths)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
+        if pool is not None:
+            pool.shutdown()
+
+
+def main(
+    action: str,
+    contract_name: str | None = None,
+    force: bool = False,
+    jobs: int = 1,
+    in_process: bool = False,
+    deploy: bool = False,
+    profile: bool = False,
+    verify_deployments: bool = False,
+    build_profile: str = DEV_BUILD,
+) -> None:
     """Main entry point to build and/or deploy smart contracts."""
     artifact_path = root_path / "artifacts"
     # Filter contracts based on an optional specific contract name.
@@ -170,42 +779,120 @@ def main(action: str, contract_name: str | None = None) -> None:
         if contract_name is None or contract.name == contract_name
     ]
 
-    match action:
-        case "build":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
-        case "deploy":
-            for contract in filtered_contracts:
-                output_dir = artifact_path / contract.name
-                app_spec_file_name = next(
-                    (
-                        file.name
-                        for file in output_dir.iterdir()
-                        if file.is_file() and file.suffixes == [".arc56", ".json"]
-                    ),
-                    None,
+    if profile:
+        profiling.enable()
+        profiling.record("discovery", discovery_seconds)
+    if verify_deployments:
+        deploy_ledger.enable_verification()
+    start = time.perf_counter()
+    try:
+        if action in ("deploy", "all"):
+            configure_deploy_environment()
+
+        match action:
+            case "build":
+                build_contracts(
+                    filtered_contracts,
+                    artifact_path,
+                    force,
+                    jobs,
+                    in_process,
+                    build_profile=build_profile,
                 )
-                if app_spec_file_name is None:
-                    raise Exception("Could not deploy app, .arc56.json file not found")
-                if contract.deploy:
-                    logger.info(f"Deploying app {contract.name}")
-                    contract.deploy()
-        case "all":
-            for contract in filtered_contracts:
-                logger.info(f"Building app at {contract.path}")
-                build(artifact_path / contract.name, contract.path)
-                if contract.deploy:
-                    logger.info(f"Deploying {contract.name}")
-                    contract.deploy()
-        case _:
-            logger.error(f"Unknown action: {action}")
+            case "deploy":
+                for contract in filtered_contracts:
+                    if not _app_spec_exists(artifact_path / contract.name):
+                        raise Exception(
+                            "Could not deploy app, .arc56.json file not found"
+                        )
+                deploy_contracts(filtered_contracts, jobs)
+            case "all":
+                build_contracts(
+                    filtered_contracts,
+                    artifact_path,
+                    force,
+                    jobs,
+                    in_process,
+                    build_profile=build_profile,
+                )
+                deploy_contracts(filtered_contracts, jobs)
+            case "watch":
+                watch_contracts(
+                    filtered_contracts,
+                    artifact_path,
+                    in_process,
+                    deploy,
+                    build_profile=build_profile,
+                )
+            case "sourcemaps":
+                write_source_maps(filtered_contracts, artifact_path)
+            case _:
+                logger.error(f"Unknown action: {action}")
+    finally:
+        if profile:
+            profiling.write_report(
+                artifact_path / "profiles", action, time.perf_counter() - start
+            )
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 2:
-        main(sys.argv[1], sys.argv[2])
-    elif len(sys.argv) > 1:
-        main(sys.argv[1])
-    else:
-        main("all")
+    parser = argparse.ArgumentParser(prog="python -m smart_contracts")
+    parser.add_argument("action", nargs="?", default="all")
+    parser.add_argument("contract_name", nargs="?", default=None)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every contract, ignoring the build cache",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of contracts to build or deploy concurrently "
+        "(0 uses every CPU core)",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Compile and generate clients through the puyapy and client generator "
+        "Python APIs in warm worker processes instead of spawning CLIs",
+    )
+    parser.add_argument(
+        "--deploy",
+        action="store_true",
+        help="With the watch action, redeploy each contract after it is rebuilt",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each build/deploy phase per contract and write a JSON report "
+        "to artifacts/profiles",
+    )
+    parser.add_argument(
+        "--build-profile",
+        choices=list(build_profile_flags),
+        default=DEV_BUILD,
+        help="dev builds write puyapy source maps, release builds optimize fully "
+        "and emit only what deploys need (the sourcemaps action writes TEAL "
+        "source maps of any build)",
+    )
+    parser.add_argument(
+        "--verify-deployments",
+        action="store_true",
+        help="Check every app against chain state instead of the local deployment "
+        "ledger, and refresh the ledger",
+    )
+    args = parser.parse_intermixed_args()
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    main(
+        args.action,
+        args.contract_name,
+        force=args.force,
+        jobs=jobs,
+        in_process=args.in_process,
+        deploy=args.deploy,
+        profile=args.profile,
+        verify_deployments=args.verify_deployments,
+        build_profile=args.build_profile,
+    )
@@ -0,0 +1,45 @@
+"""
+ARC-28 events: an app call logs an event as the first 4 bytes of the SHA-512/256
+hash of its signature, e.g. `Transfer(address,uint64)`, followed by its ABI
+encoded arguments. Contracts take their selectors from `selector`, and
+off-chain code decodes confirmed or simulated logs with `decode_logs`.
+"""
+
+import base64
+import dataclasses
+from collections.abc import Iterable
+from typing import Any
+
+
+@dataclasses.dataclass
+class Event:
+    name: str
+    signature: str
+    values: list[Any]
+
+
+def selector(signature: str) -> bytes:
+    from algosdk.encoding import checksum
+
+    return checksum(signature.encode())[:4]
+
+
+def decode_logs(logs: Iterable[bytes | str], signatures: Iterable[str]) -> list[Event]:
+    """
+    Decodes the logs of one transaction (raw, or base64 as algod returns them)
+    that match any of the event `signatures`, in log order. Other logs, such
+    as the ABI return value, are skipped.
+    """
+    from algosdk.abi import ABIType
+
+    by_selector = {selector(signature): signature for signature in signatures}
+    events: list[Event] = []
+    for log in logs:
+        data = base64.b64decode(log) if isinstance(log, str) else log
+        signature = by_selector.get(data[:4])
+        if signature is None:
+            continue
+        name, arguments = signature.split("(", 1)
+        values = ABIType.from_string(f"({arguments}").decode(data[4:])
+        events.append(Event(name=name, signature=signature, values=values))
+    return events
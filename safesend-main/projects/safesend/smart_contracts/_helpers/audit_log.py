@@ -0,0 +1,155 @@
+"""
+Audit log: a fixed-size ring buffer of packed records in an app's boxes.
+
+An app appends one RECORD_SIZE-byte record per audited action with a single
+`box_replace`, at slot `(seq - 1) % CAPACITY`, where `seq` is the record's
+1-based number kept in the app's `audit_seq` global. Writes therefore cost the
+same opcodes however many records came before, and once the buffer is full each
+record overwrites the oldest. Records are `(seq, round, kind, account, amount,
+ref)`, with the meaning of `kind`, `account` and `ref` defined by each app's
+interface. Slots that were never written are all zeros.
+
+The buffer is split into BOXES boxes named `BOX_PREFIX` followed by the box
+index as one byte. Each holds as many records as fit in the 1 KB of box reads
+and writes one box reference grants, so an audited call needs one more box
+reference, two when its records cross into the next box. The app creates the
+boxes in `create_audit_log`, after it has been funded with MIN_BALANCE for
+them.
+
+`read` fetches every box, concurrently, and decodes them into `Record`s, oldest
+first, without needing the app's global state.
+
+Usage: python -m smart_contracts._helpers.audit_log CONTRACT APP_ID [--last N]
+"""
+
+import argparse
+import dataclasses
+import struct
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+
+BOX_PREFIX = b"a"
+BOXES = 8
+
+# seq, round, kind, account, amount, ref; the ABI tuple
+# (uint64,uint64,uint8,address,uint64,uint64)
+RECORD_FORMAT = ">QQB32sQQ"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+# Bytes of box reads and writes each box reference grants
+BOX_REFERENCE_QUOTA = 1024
+RECORDS_PER_BOX = BOX_REFERENCE_QUOTA // RECORD_SIZE
+BOX_SIZE = RECORDS_PER_BOX * RECORD_SIZE
+CAPACITY = BOXES * RECORDS_PER_BOX
+
+# Minimum balance the boxes add to the app account: 2500 + 400 per byte of
+# name and contents, for each box
+MIN_BALANCE = BOXES * (2_500 + 400 * (len(BOX_PREFIX) + 1 + BOX_SIZE))
+
+
+@dataclasses.dataclass(frozen=True)
+class Record:
+    seq: int
+    round: int
+    kind: int
+    account: str
+    amount: int
+    ref: int
+    kind_name: str = ""
+
+
+def box_name(index: int) -> bytes:
+    return BOX_PREFIX + bytes([index])
+
+
+def decode_box(value: bytes, kinds: Mapping[int, str] | None = None) -> list[Record]:
+    """Decodes the written records of one audit log box, in slot order."""
+    from algosdk.encoding import encode_address
+
+    records = []
+    for seq, round_, kind, account, amount, ref in struct.iter_unpack(
+        RECORD_FORMAT, value[: len(value) - len(value) % RECORD_SIZE]
+    ):
+        if seq == 0:
+            continue
+        records.append(
+            Record(
+                seq=seq,
+                round=round_,
+                kind=kind,
+                account=encode_address(account),
+                amount=amount,
+                ref=ref,
+                kind_name=(kinds or {}).get(kind, str(kind)),
+            )
+        )
+    return records
+
+
+def read(
+    algod: "AlgodClient", app_id: int, kinds: Mapping[int, str] | None = None
+) -> list[Record]:
+    """
+    Returns every record in an app's audit log, oldest first. `kinds` names the
+    record kinds, e.g. an app interface's AUDIT_KINDS. A log whose boxes were
+    never created reads as empty.
+    """
+    import base64
+
+    from algosdk.error import AlgodHTTPError
+
+    def read_box(index: int) -> bytes:
+        try:
+            response = algod.application_box_by_name(app_id, box_name(index))
+        except AlgodHTTPError as ex:
+            if ex.code == 404:
+                return b""
+            raise
+        return base64.b64decode(response["value"])  # type: ignore[call-overload]
+
+    with ThreadPoolExecutor(max_workers=BOXES) as executor:
+        values = list(executor.map(read_box, range(BOXES)))
+    records = [record for value in values for record in decode_box(value, kinds)]
+    # A write landing between two box reads can leave both a record and the
+    # one it overwrote; only the newest CAPACITY records are in the log
+    records.sort(key=lambda record: record.seq)
+    return records[-CAPACITY:]
+
+
+def main() -> None:
+    import importlib
+
+    from dotenv import load_dotenv
+
+    from smart_contracts._helpers import session
+
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts._helpers.audit_log"
+    )
+    parser.add_argument("contract", help="Contract folder, for its record kinds")
+    parser.add_argument("app_id", type=int)
+    parser.add_argument(
+        "--last", type=int, default=CAPACITY, help="Number of recent records to show"
+    )
+    options = parser.parse_args()
+
+    interface = importlib.import_module(f"smart_contracts.{options.contract}.interface")
+    load_dotenv()
+    records = read(
+        session.algorand_client().client.algod,
+        options.app_id,
+        getattr(interface, "AUDIT_KINDS", None),
+    )
+    for record in records[-options.last :] if options.last > 0 else []:
+        print(
+            f"#{record.seq} round {record.round} {record.kind_name} "
+            f"{record.account} amount {record.amount} ref {record.ref}"
+        )
+    print(f"{len(records)} record(s), the log keeps the last {CAPACITY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+In-process access to the puyapy compiler and the typed client generator.
+
+Spawning `puyapy`/`algokit` for every contract pays the interpreter and CLI
+import cost each time. A long-lived build worker calls `warm_up` once and then
+compiles every contract it is given through the Python APIs instead.
+"""
+
+import contextlib
+import dataclasses
+import io
+import json
+import re
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+@dataclasses.dataclass(frozen=True)
+class _CompilerApi:
+    compile_to_teal: Callable[[Any], None]
+    options_type: Callable[..., Any]
+    configure_logging: Callable[..., None]
+    log_level_type: Any
+    generate_client: Callable[[Path, Path], None]
+
+
+_api: _CompilerApi | None = None
+
+
+def warm_up() -> None:
+    """Imports the compiler and client generator, if they are installed."""
+    global _api
+    if _api is not None:
+        return
+    try:
+        from algokit_client_generator.writer import generate_client
+        from puya.log import LogLevel, configure_logging
+        from puyapy.compile import compile_to_teal
+        from puyapy.options import PuyaPyOptions
+    except ImportError:
+        return
+    _api = _CompilerApi(
+        compile_to_teal=compile_to_teal,
+        options_type=PuyaPyOptions,
+        configure_logging=configure_logging,
+        log_level_type=LogLevel,
+        generate_client=generate_client,
+    )
+
+
+def available() -> bool:
+    """Checks whether the in-process compiler APIs could be imported."""
+    warm_up()
+    return _api is not None
+
+
+def _parse_flags(api: _CompilerApi, flags: list[str]) -> dict[str, Any]:
+    """Translates long-form puyapy command line flags into PuyaPyOptions fields."""
+    converters: dict[str, Callable[[str], Any]] = {
+        "log_level": api.log_level_type.__getitem__,
+        "optimization_level": int,
+        "debug_level": int,
+        "target_avm_version": int,
+    }
+    options: dict[str, Any] = {}
+    index = 0
+    while index < len(flags):
+        name = flags[index].removeprefix("--").replace("-", "_")
+        index += 1
+        if index < len(flags) and not flags[index].startswith("-"):
+            options[name] = converters.get(name, str)(flags[index])
+            index += 1
+        elif name.startswith("no_"):
+            options[name.removeprefix("no_")] = False
+        else:
+            options[name] = True
+    return options
+
+
+def compile_contract(contract_path: Path, output_dir: Path, flags: list[str]) -> None:
+    """Compiles a contract into `output_dir`, as `puyapy <flags>` would."""
+    if _api is None:
+        raise RuntimeError("The puyapy compiler API is not available")
+    options = _api.options_type(
+        paths=[contract_path], out_dir=output_dir, **_parse_flags(_api, flags)
+    )
+    output = io.StringIO()
+    exit_code: int | str | None = None
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        # Not cached, so each compile logs to the currently redirected stdout
+        _api.configure_logging(
+            min_log_level=options.log_level,
+            cache_logger=False,
+            reconfigure_stdio=False,
+        )
+        try:
+            _api.compile_to_teal(options)
+        except SystemExit as ex:  # puyapy exits when the contract has errors
+            exit_code = ex.code
+    if exit_code:
+        raise Exception(f"Could not build contract:\n{output.getvalue()}")
+
+
+def _snake_case(name: str) -> str:
+    """Converts a contract name the way algokit expands `{contract_name}`."""
+    name = name.replace("-", " ")
+    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
+    name = re.sub(r"([a-z\d])([A-Z])", r"\1_\2", name)
+    return re.sub(r"[-\s]", "_", name).lower()
+
+
+def client_path(app_spec_path: Path, output_template: Path) -> Path:
+    """Substitutes `{contract_name}` in a client output path for an app spec."""
+    contract_name = json.loads(app_spec_path.read_text())["name"]
+    return Path(
+        str(output_template).replace("{contract_name}", _snake_case(contract_name))
+    )
+
+
+def generate_client(app_spec_path: Path, output_template: Path) -> Path:
+    """
+    Generates the typed client for one app spec, as `algokit generate client`
+    would.
+    """
+    if _api is None:
+        raise RuntimeError("The client generator API is not available")
+    output_path = client_path(app_spec_path, output_template)
+    _api.generate_client(app_spec_path, output_path)
+    return output_path
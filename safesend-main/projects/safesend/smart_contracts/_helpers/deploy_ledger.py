@@ -0,0 +1,227 @@
+"""
+Local record of deployed apps, so deploying unchanged contracts skips
+`factory.deploy`'s app lookup by creator and name and its program comparison.
+
+Entries are keyed by network genesis hash, app name and a hash of the app's
+programs. A hit costs one `application_info` call to check the app still exists
+and belongs to the deployer. `--verify-deployments` bypasses the ledger, runs
+the full `factory.deploy` against chain state and refreshes the entries.
+
+Entries also remember whether a new app's `initialize` step (its funding and
+first calls) succeeded, so an app whose initialization failed is initialized
+again on the next deploy instead of being left unfunded. An app that fails its
+`verify` step is dropped from the ledger, so the next deploy checks it against
+chain state with `factory.deploy`.
+"""
+
+import base64
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from smart_contracts._helpers import prebuilt, profiling, session
+
+if TYPE_CHECKING:
+    import algokit_utils
+
+LEDGER_VERSION = 1
+
+ledger_path = (
+    Path(__file__).parents[2] / ".algokit" / "build-cache" / "deployments.json"
+)
+
+
+@dataclasses.dataclass
+class DeployLedger:
+    """App id and address of each deployment, by network, app name and programs."""
+
+    path: Path
+    entries: dict[str, dict] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "DeployLedger":
+        """Loads the ledger from disk, starting empty if it is missing or stale."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls(path=path)
+        if data.get("version") != LEDGER_VERSION:
+            return cls(path=path)
+        return cls(path=path, entries=data.get("deployments", {}))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        temporary_path.write_text(
+            json.dumps(
+                {"version": LEDGER_VERSION, "deployments": self.entries},
+                indent=2,
+                sort_keys=True,
+            )
+        )
+        os.replace(temporary_path, self.path)
+
+    @staticmethod
+    def compute_key(network: str, app_name: str, program_hash: str) -> str:
+        return f"{network}/{app_name}/{program_hash}"
+
+    def lookup(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def record(
+        self,
+        key: str,
+        app_id: int,
+        app_address: str,
+        creator: str,
+        initialized: bool = True,
+    ) -> None:
+        self.entries[key] = {
+            "app_id": app_id,
+            "app_address": app_address,
+            "creator": creator,
+            "initialized": initialized,
+        }
+
+    def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+
+_lock = threading.Lock()
+_ledger: DeployLedger | None = None
+_verify = False
+
+
+def enable_verification() -> None:
+    """Makes `deploy` check every app against chain state instead of the ledger."""
+    global _verify
+    _verify = True
+
+
+def _shared_ledger() -> DeployLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = DeployLedger.load(ledger_path)
+    return _ledger
+
+
+def program_hash(
+    app_spec: "algokit_utils.Arc56Contract", compilation_params: Any = None
+) -> str | None:
+    """
+    Hashes the approval and clear TEAL of an app spec, plus the compilation
+    params that can change the compiled programs. None if the spec has no source.
+    """
+    if app_spec.source is None:
+        return None
+    digest = hashlib.sha256()
+    digest.update(base64.b64decode(app_spec.source.approval))
+    digest.update(b"\0")
+    digest.update(base64.b64decode(app_spec.source.clear))
+    digest.update(json.dumps(compilation_params, default=repr).encode())
+    return digest.hexdigest()
+
+
+def _app_exists(
+    algorand: "algokit_utils.AlgorandClient", app_id: int, creator: str
+) -> bool:
+    from algosdk.error import AlgodHTTPError
+
+    try:
+        app = algorand.app.get_by_id(app_id)
+    except AlgodHTTPError as ex:
+        if ex.code == 404:
+            return False
+        raise
+    return app.creator == creator
+
+
+def _record(key: str, app_client: Any, creator: str, initialized: bool) -> None:
+    with _lock:
+        ledger = _shared_ledger()
+        ledger.record(
+            key, app_client.app_id, app_client.app_address, creator, initialized
+        )
+        ledger.save()
+
+
+def _forget(key: str) -> None:
+    with _lock:
+        ledger = _shared_ledger()
+        ledger.forget(key)
+        ledger.save()
+
+
+def deploy(
+    factory: Any,
+    creator: str,
+    initialize: Callable[[Any], None] | None = None,
+    verify: Callable[[Any], None] | None = None,
+    **deploy_kwargs: Any,
+) -> tuple[Any, Any]:
+    """
+    Deploys through a typed app factory, resolving unchanged apps from the
+    ledger. `initialize` is called with the app client of a newly created app,
+    or of one whose earlier initialization failed, and `verify` with that of
+    any other app, so an app gets one of the two and never both. Returns the
+    typed app client and the `OperationPerformed`.
+    """
+    import algokit_utils
+
+    app_name = deploy_kwargs.get("app_name") or factory.app_name
+    programs = program_hash(factory.app_spec, deploy_kwargs.get("compilation_params"))
+    key = None
+    entry = None
+    if programs is not None:
+        key = DeployLedger.compute_key(session.genesis_hash(), app_name, programs)
+        with _lock:
+            entry = _shared_ledger().lookup(key)
+        if entry is not None and entry["creator"] != creator:
+            entry = None
+
+    if entry is not None and not _verify:
+        with profiling.phase("ledger existence check"):
+            exists = _app_exists(factory.algorand, entry["app_id"], creator)
+        if exists:
+            app_client = factory.get_app_client_by_id(
+                entry["app_id"], app_name=app_name
+            )
+            operation_performed = algokit_utils.OperationPerformed.Nothing
+        else:
+            entry = None
+    if entry is None or _verify:
+        prebuilt.register(factory)
+        with profiling.phase("factory.deploy"):
+            app_client, result = factory.deploy(**deploy_kwargs)
+        operation_performed = result.operation_performed
+
+    needs_initialize = operation_performed in [
+        algokit_utils.OperationPerformed.Create,
+        algokit_utils.OperationPerformed.Replace,
+    ] or (
+        entry is not None
+        and entry["app_id"] == app_client.app_id
+        and not entry.get("initialized", True)
+    )
+    if initialize is not None and needs_initialize:
+        try:
+            initialize(app_client)
+        except BaseException:
+            if key is not None:
+                _record(key, app_client, creator, initialized=False)
+            raise
+    elif verify is not None and not needs_initialize:
+        try:
+            verify(app_client)
+        except BaseException:
+            if key is not None and entry is not None:
+                _forget(key)
+            raise
+    if key is not None and (needs_initialize or entry is None or _verify):
+        _record(key, app_client, creator, initialized=True)
+    return app_client, operation_performed
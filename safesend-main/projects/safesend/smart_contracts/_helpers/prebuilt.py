@@ -0,0 +1,135 @@
+"""
+Program bytecode assembled at build time, used by deploys instead of compiling
+the TEAL again on algod.
+
+`build()` compiles with `--output-bytecode`, and `record` writes a
+`<Contract>.programs.json` manifest beside each app spec, holding the size and
+SHA-256 of each program's bytecode and of the TEAL it was assembled from. At
+deploy time `register` checks the `.bin` files against that manifest and hands
+them to the shared `PooledAlgodClient`, whose `compile` returns them for exactly
+that TEAL. When algokit_utils compiles the app spec's TEAL unchanged, no
+request is made. When deploy-time template values or updatable/deletable flags
+change the TEAL, it differs from what was built and algod compiles it as before.
+Source maps generated for that TEAL (see `source_maps`) are served along with it.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from smart_contracts._helpers import source_maps
+
+if TYPE_CHECKING:
+    import algokit_utils
+
+logger = logging.getLogger(__name__)
+
+artifacts_path = Path(__file__).parents[1] / "artifacts"
+
+MANIFEST_SUFFIX = ".programs.json"
+PROGRAMS = ("approval", "clear")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _app_spec_teal(app_spec: dict[str, Any], program: str) -> bytes:
+    return base64.b64decode(app_spec["source"][program])
+
+
+def record(output_dir: Path) -> None:
+    """Writes the programs manifest of each app spec compiled into `output_dir`."""
+    for app_spec_path in sorted(output_dir.glob("*.arc56.json")):
+        stem = app_spec_path.name.removesuffix(".arc56.json")
+        app_spec = json.loads(app_spec_path.read_text())
+        bytecode_paths = {
+            program: output_dir / f"{stem}.{program}.bin" for program in PROGRAMS
+        }
+        if "source" not in app_spec or not all(
+            path.exists() for path in bytecode_paths.values()
+        ):
+            logger.warning(f"No bytecode was compiled for {stem}, deploys will compile")
+            continue
+        manifest = {}
+        for program, bytecode_path in bytecode_paths.items():
+            bytecode = bytecode_path.read_bytes()
+            manifest[program] = {
+                "size": len(bytecode),
+                "bytecode_sha256": _sha256(bytecode),
+                "teal_sha256": _sha256(_app_spec_teal(app_spec, program)),
+            }
+        (output_dir / f"{stem}{MANIFEST_SUFFIX}").write_text(
+            json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+        )
+
+
+def program_sizes(output_dir: Path) -> dict[str, dict[str, int]]:
+    """Returns the recorded program sizes of each app spec in `output_dir`, by name."""
+    sizes = {}
+    for manifest_path in sorted(output_dir.glob(f"*{MANIFEST_SUFFIX}")):
+        manifest = json.loads(manifest_path.read_text())
+        sizes[manifest_path.name.removesuffix(MANIFEST_SUFFIX)] = {
+            program: manifest[program]["size"] for program in PROGRAMS
+        }
+    return sizes
+
+
+def load(app_spec: "algokit_utils.Arc56Contract") -> dict[str, bytes]:
+    """
+    Returns each program's bytecode by the SHA-256 of the comment-stripped TEAL
+    algokit_utils would compile, or nothing when the build is missing or stale.
+    Raises if a `.bin` file does not match its manifest.
+    """
+    from algokit_utils import AppManager
+
+    manifest_paths = list(artifacts_path.glob(f"*/{app_spec.name}{MANIFEST_SUFFIX}"))
+    if app_spec.source is None or len(manifest_paths) != 1:
+        return {}
+    (manifest_path,) = manifest_paths
+    manifest = json.loads(manifest_path.read_text())
+    teal_sources = {
+        "approval": app_spec.source.get_decoded_approval(),
+        "clear": app_spec.source.get_decoded_clear(),
+    }
+    programs: dict[str, bytes] = {}
+    for program in PROGRAMS:
+        teal = teal_sources[program]
+        if _sha256(teal.encode()) != manifest[program]["teal_sha256"]:
+            logger.warning(
+                f"{manifest_path.name} does not match the {program} TEAL of "
+                f"{app_spec.name}, rebuild to deploy from bytecode"
+            )
+            return {}
+        bytecode_path = manifest_path.with_name(
+            f"{manifest_path.name.removesuffix(MANIFEST_SUFFIX)}.{program}.bin"
+        )
+        bytecode = bytecode_path.read_bytes()
+        if _sha256(bytecode) != manifest[program]["bytecode_sha256"]:
+            raise ValueError(
+                f"{bytecode_path.name} does not match the hash recorded in "
+                f"{manifest_path.name}"
+            )
+        programs[_sha256(AppManager.strip_teal_comments(teal).encode())] = bytecode
+    return programs
+
+
+def register(factory: Any) -> None:
+    """Lets the factory's algod client serve this app's programs from the build."""
+    algod = factory.algorand.client.algod
+    if not hasattr(algod, "prebuilt_programs"):
+        return
+    programs = load(factory.app_spec)
+    if programs:
+        algod.prebuilt_programs.update(programs)
+        for key in programs:
+            source_map = source_maps.cached(key)
+            if source_map is not None:
+                algod.prebuilt_source_maps[key] = source_map
+        logger.info(
+            f"Deploying {factory.app_name} from prebuilt bytecode "
+            f"({', '.join(_sha256(bytecode)[:12] for bytecode in programs.values())})"
+        )
@@ -0,0 +1,123 @@
+"""
+Per-phase timing for `python -m smart_contracts --profile`.
+
+Build and deploy code wraps each phase in `phase(...)`, which is a no-op unless
+profiling was enabled. Timings are attributed to the contract set by the
+enclosing `contract(...)` block and written as a JSON report by `write_report`.
+"""
+
+import contextlib
+import contextvars
+import datetime
+import json
+import logging
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_records: list[dict[str, str | float | None]] = []
+_current_contract: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "profiled_contract", default=None
+)
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def record(name: str, seconds: float, contract_name: str | None = None) -> None:
+    """Records a phase that was timed elsewhere."""
+    if _enabled:
+        _records.append(
+            {
+                "contract": contract_name or _current_contract.get(),
+                "phase": name,
+                "seconds": seconds,
+            }
+        )
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Times the enclosed block as phase `name` of the current contract."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def contract(name: str) -> Iterator[None]:
+    """Attributes the phases timed in the enclosed block to contract `name`."""
+    token = _current_contract.set(name)
+    try:
+        yield
+    finally:
+        _current_contract.reset(token)
+
+
+def take_records() -> list[dict[str, str | float | None]]:
+    """Removes and returns the phases recorded so far, e.g. to ship them from a worker."""
+    records = _records[:]
+    _records.clear()
+    return records
+
+
+def add_records(records: list[dict[str, str | float | None]]) -> None:
+    _records.extend(records)
+
+
+def write_report(output_dir: Path, action: str, total_seconds: float) -> Path:
+    """Writes the recorded phases as a JSON report and logs a summary table."""
+    created = datetime.datetime.now(datetime.timezone.utc)
+    by_contract: dict[str, dict[str, float]] = {}
+    for entry in _records:
+        phases = by_contract.setdefault(str(entry["contract"] or "-"), {})
+        name = str(entry["phase"])
+        phases[name] = phases.get(name, 0.0) + float(entry["seconds"] or 0.0)
+
+    output_dir.mkdir(exist_ok=True, parents=True)
+    report_path = output_dir / f"{action}-{created:%Y%m%d-%H%M%S}.json"
+    report_path.write_text(
+        json.dumps(
+            {
+                "created": created.isoformat(),
+                "action": action,
+                "total_seconds": total_seconds,
+                "contracts": by_contract,
+                "phases": _records,
+            },
+            indent=2,
+        )
+    )
+
+    rows = [
+        (contract_name, name, seconds)
+        for contract_name, phases in by_contract.items()
+        for name, seconds in phases.items()
+    ]
+    contract_width = max([len("contract")] + [len(row[0]) for row in rows])
+    phase_width = max([len("phase")] + [len(row[1]) for row in rows])
+    lines = [f"{'contract':<{contract_width}}  {'phase':<{phase_width}}  seconds"]
+    lines += [
+        f"{contract_name:<{contract_width}}  {name:<{phase_width}}  {seconds:7.3f}"
+        for contract_name, name, seconds in rows
+    ]
+    lines.append(
+        f"{'total':<{contract_width}}  {'':<{phase_width}}  {total_seconds:7.3f}"
+    )
+    logger.info("Profile summary:\n" + "\n".join(lines))
+    logger.info(f"Profile report written to {report_path}")
+    return report_path
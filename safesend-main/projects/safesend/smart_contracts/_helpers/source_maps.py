@@ -0,0 +1,95 @@
+"""
+TEAL source maps generated on request from built artifacts.
+
+Release builds don't ask puyapy for source maps, and deploys from prebuilt
+bytecode (see `prebuilt`) skip the algod compile that would return them.
+`generate` assembles the TEAL already in a contract's app specs on algod with
+`sourcemap=true`, so no Python is recompiled, and writes the maps to
+`.algokit/sources/<app>/` for the AVM Debugger, as algokit_utils' debug mode
+does. Each map is also cached under `.algokit/build-cache/source-maps` by the
+SHA-256 of its TEAL, where `prebuilt.register` picks it up so later debug-mode
+deploys persist it instead of an empty map.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parents[2]
+cache_path = project_root / ".algokit" / "build-cache" / "source-maps"
+# Where algokit_utils' debug mode persists source maps, and the AVM Debugger finds them
+sources_path = project_root / ".algokit" / "sources"
+
+PROGRAMS = ("approval", "clear")
+
+
+def teal_key(teal: str) -> str:
+    """The SHA-256 that prebuilt programs and cached source maps are looked up by."""
+    return hashlib.sha256(teal.encode()).hexdigest()
+
+
+def cached(key: str) -> dict[str, Any] | None:
+    """Returns the cached source map of the TEAL with SHA-256 `key`, if any."""
+    try:
+        return json.loads((cache_path / f"{key}.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write(app_name: str, program: str, teal: str, source_map: dict[str, Any]) -> None:
+    """
+    Writes a program's TEAL and its source map under the file names debug-mode
+    deploys use, e.g. `approval.teal.teal` and `approval.teal.teal.map`.
+    """
+    file_name = f"{program}.teal.teal"
+    output_dir = sources_path / app_name
+    output_dir.mkdir(exist_ok=True, parents=True)
+    (output_dir / f"{file_name}.map").write_text(
+        json.dumps({**source_map, "sources": [file_name]})
+    )
+    (output_dir / file_name).write_text(teal)
+
+
+def generate(app_spec_path: Path, algod: "AlgodClient") -> None:
+    """
+    Writes the AVM Debugger source maps of an app spec's programs, warning when
+    algod assembles the TEAL to different bytecode than the build did.
+    """
+    from algokit_utils import AppManager, Arc56Contract
+
+    app_spec = Arc56Contract.from_json(app_spec_path.read_text())
+    if app_spec.source is None:
+        logger.warning(f"{app_spec_path.name} has no TEAL source, skipping")
+        return
+    stem = app_spec_path.name.removesuffix(".arc56.json")
+    teal_sources = {
+        "approval": app_spec.source.get_decoded_approval(),
+        "clear": app_spec.source.get_decoded_clear(),
+    }
+    for program in PROGRAMS:
+        # The same TEAL algokit_utils compiles when deploying
+        teal = AppManager.strip_teal_comments(teal_sources[program])
+        compiled = algod.compile(teal, source_map=True)
+        bytecode = base64.b64decode(compiled["result"])
+        bytecode_path = app_spec_path.with_name(f"{stem}.{program}.bin")
+        if bytecode_path.exists() and bytecode_path.read_bytes() != bytecode:
+            logger.warning(
+                f"algod assembles the {program} TEAL of {app_spec.name} differently "
+                f"from {bytecode_path.name}"
+            )
+        cache_path.mkdir(exist_ok=True, parents=True)
+        (cache_path / f"{teal_key(teal)}.json").write_text(
+            json.dumps(compiled["sourcemap"])
+        )
+        write(app_spec.name, program, teal, compiled["sourcemap"])
+    logger.info(
+        f"Wrote source maps of {app_spec.name} to .algokit/sources/{app_spec.name}"
+    )
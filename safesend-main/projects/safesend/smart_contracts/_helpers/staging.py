@@ -0,0 +1,102 @@
+"""
+Staged, atomic replacement of a contract's artifact directory.
+
+A build writes into a staging directory next to its target. Before publishing,
+every staged file whose bytes match the current artifact is replaced by a hard
+link to it, so unchanged files keep their inode and mtime. The two directories
+are then exchanged in one rename, so readers see either the old or the new
+artifacts, never a partial build, and a failed build leaves the old ones intact.
+"""
+
+import ctypes
+import ctypes.util
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def create_staging_dir(target_dir: Path) -> Path:
+    """Creates an empty staging directory beside `target_dir`."""
+    target_dir.parent.mkdir(exist_ok=True, parents=True)
+    staging_dir = Path(
+        tempfile.mkdtemp(prefix=f".{target_dir.name}.staging-", dir=target_dir.parent)
+    )
+    # mkdtemp creates owner-only directories, match the usual permissions instead
+    shutil.copymode(
+        target_dir if target_dir.is_dir() else target_dir.parent, staging_dir
+    )
+    return staging_dir
+
+
+def link_unchanged_files(staging_dir: Path, target_dir: Path) -> int:
+    """
+    Replaces each staged file that is byte-identical to its counterpart in
+    `target_dir` with a hard link to that file. Returns how many were linked.
+    """
+    linked = 0
+    if not target_dir.is_dir():
+        return linked
+    for staged_file in staging_dir.iterdir():
+        target_file = target_dir / staged_file.name
+        if not staged_file.is_file() or not target_file.is_file():
+            continue
+        if staged_file.samefile(target_file):
+            linked += 1
+            continue
+        if not filecmp.cmp(staged_file, target_file, shallow=False):
+            continue
+        temporary_link = staged_file.with_name(f".{staged_file.name}.link")
+        try:
+            os.link(target_file, temporary_link)
+        except OSError:
+            continue  # e.g. a filesystem without hard links, keep the copy
+        os.replace(temporary_link, staged_file)
+        linked += 1
+    return linked
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    """Atomically swaps two paths with renameat2, where the platform supports it."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    result = renameat2(
+        _AT_FDCWD, os.fsencode(first), _AT_FDCWD, os.fsencode(second), _RENAME_EXCHANGE
+    )
+    return result == 0
+
+
+def publish(staging_dir: Path, target_dir: Path) -> None:
+    """Moves a completed staging directory into place as `target_dir`."""
+    if not target_dir.exists():
+        os.rename(staging_dir, target_dir)
+        return
+    if _exchange(staging_dir, target_dir):
+        # staging_dir now holds the previous artifacts
+        shutil.rmtree(staging_dir)
+        return
+    # Fall back to two renames, leaving a brief window without `target_dir`
+    previous_dir = Path(
+        tempfile.mkdtemp(prefix=f".{target_dir.name}.old-", dir=target_dir.parent)
+    )
+    os.rmdir(previous_dir)
+    os.rename(target_dir, previous_dir)
+    os.rename(staging_dir, target_dir)
+    shutil.rmtree(previous_dir)
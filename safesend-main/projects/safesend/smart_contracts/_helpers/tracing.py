@@ -0,0 +1,155 @@
+"""
+Sampled AVM trace capture for transactions sent through the shared algod client.
+
+With TRACE_SAMPLE_RATE set (a fraction between 0 and 1), that fraction of the
+groups sent is traced without slowing down the send itself: the signed group is
+handed to a background thread, which waits for it to confirm and simulates it
+again at the round before, with full execution traces. Traces are written to
+`debug_traces/` in the AlgoKit AVM Debugger format, and the oldest are removed
+once the folder holds more than TRACE_BUFFER_SIZE_MB megabytes.
+
+Unlike algokit_utils' debug mode, which simulates every group (`trace_all`) or
+every failed group before returning, sampling never adds a round trip to the
+caller. Groups that arrive while MAX_QUEUED_TRACES are waiting are not traced.
+"""
+
+import base64
+import datetime
+import io
+import json
+import logging
+import queue
+import random
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+
+logger = logging.getLogger(__name__)
+
+traces_path = Path(__file__).parents[2] / "debug_traces"
+
+# Same suffix as algokit_utils' traces, which the AVM Debugger looks for
+TRACE_FILE_SUFFIX = ".trace.avm.json"
+DEFAULT_BUFFER_SIZE_MB = 64
+MAX_QUEUED_TRACES = 32
+CONFIRMATION_ROUNDS = 10
+
+
+def split_signed_group(raw_group: bytes) -> list[str]:
+    """Splits concatenated msgpack signed transactions into base64 strings."""
+    import msgpack
+
+    unpacker = msgpack.Unpacker(io.BytesIO(raw_group), raw=True)
+    transactions = []
+    start = 0
+    for _ in unpacker:
+        end = unpacker.tell()
+        transactions.append(base64.b64encode(raw_group[start:end]).decode())
+        start = end
+    return transactions
+
+
+def rotate(directory: Path, buffer_size_mb: float) -> None:
+    """Removes the oldest traces until the rest fit in `buffer_size_mb`."""
+    traces = sorted(
+        directory.glob(f"*{TRACE_FILE_SUFFIX}"), key=lambda path: path.stat().st_mtime
+    )
+    total = sum(path.stat().st_size for path in traces)
+    limit = buffer_size_mb * 1024 * 1024
+    for path in traces:
+        if total <= limit:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+class TraceSampler:
+    def __init__(
+        self,
+        algod: "AlgodClient",
+        rate: float,
+        directory: Path = traces_path,
+        buffer_size_mb: float = DEFAULT_BUFFER_SIZE_MB,
+    ):
+        self.algod = algod
+        self.rate = rate
+        self.directory = directory
+        self.buffer_size_mb = buffer_size_mb
+        self._random = random.Random()
+        self._queue: queue.Queue[bytes] = queue.Queue(MAX_QUEUED_TRACES)
+        self._thread = threading.Thread(
+            target=self._run, name="trace-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def offer(self, raw_group: bytes) -> None:
+        """Queues a sent group for tracing if it is sampled."""
+        if self._random.random() >= self.rate:
+            return
+        try:
+            self._queue.put_nowait(raw_group)
+        except queue.Full:
+            logger.debug("Trace queue full, not tracing a sampled group")
+
+    def flush(self, timeout: float) -> None:
+        """Waits up to `timeout` seconds for queued traces, e.g. before exiting."""
+        done = threading.Event()
+        threading.Thread(
+            target=lambda: (self._queue.join(), done.set()), daemon=True
+        ).start()
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            raw_group = self._queue.get()
+            try:
+                self._capture(raw_group)
+            except Exception as ex:
+                logger.warning(f"Could not capture a sampled trace: {ex}")
+            finally:
+                self._queue.task_done()
+
+    def _capture(self, raw_group: bytes) -> None:
+        from algosdk import encoding
+        from algosdk.transaction import wait_for_confirmation
+        from algosdk.v2client.models import (
+            SimulateRequest,
+            SimulateRequestTransactionGroup,
+            SimulateTraceConfig,
+        )
+
+        transactions = [
+            encoding.msgpack_decode(transaction)
+            for transaction in split_signed_group(raw_group)
+        ]
+        txid = transactions[0].get_txid()
+        confirmed_round = wait_for_confirmation(self.algod, txid, CONFIRMATION_ROUNDS)[
+            "confirmed-round"
+        ]
+        # Replays the group on the state it was evaluated against; by now it is
+        # in the ledger, so it would be rejected as a duplicate at later rounds
+        response = self.algod.simulate_transactions(
+            SimulateRequest(
+                txn_groups=[SimulateRequestTransactionGroup(txns=transactions)],
+                round=confirmed_round - 1,
+                allow_more_logs=True,
+                exec_trace_config=SimulateTraceConfig(
+                    enable=True,
+                    stack_change=True,
+                    scratch_change=True,
+                    state_change=True,
+                ),
+            )
+        )
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        self.directory.mkdir(exist_ok=True, parents=True)
+        trace_path = (
+            self.directory
+            / f"{timestamp:%Y%m%d_%H%M%S}_r{confirmed_round}_{txid[:8]}{TRACE_FILE_SUFFIX}"
+        )
+        trace_path.write_text(json.dumps(response, indent=2))
+        rotate(self.directory, self.buffer_size_mb)
+        logger.debug(f"Wrote sampled trace {trace_path.name}")
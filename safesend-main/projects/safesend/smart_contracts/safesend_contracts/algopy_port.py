@@ -0,0 +1,256 @@
+# pyright: reportMissingModuleSource=false
+"""
+Algorand Python port of the beaker `SafeSendApp` in contract.py, for load tests.
+
+algorand-python-testing only executes algopy contracts, so `load_test_config`
+drives this port. It mirrors the app's global state, its 80-byte pending
+request boxes keyed by request id, the escrow and deposit each request pays,
+its audit log records, its guardian checks and its pooled-fee payouts; keep the
+two in step when either changes.
+
+The audit log layout comes from `smart_contracts._helpers.audit_log` and the
+record kinds from interface.py, as in contract.py.
+"""
+
+from algopy import (
+    ARC4Contract,
+    Bytes,
+    Global,
+    GlobalState,
+    Txn,
+    UInt64,
+    arc4,
+    gtxn,
+    itxn,
+    log,
+    op,
+    subroutine,
+    uenumerate,
+    urange,
+)
+
+from smart_contracts._helpers import audit_log
+from smart_contracts.safesend_contracts import interface
+
+PENDING_REQUEST_PREFIX = b"p"
+STATUS_AUTO_APPROVED = 0
+STATUS_PENDING = 1
+
+
+class PendingRequest(arc4.Struct):
+    sender: arc4.Address
+    receiver: arc4.Address
+    amount: arc4.UInt64
+    round: arc4.UInt64
+
+
+class RequestOutcome(arc4.Struct):
+    status: arc4.UInt8
+    request_id: arc4.UInt64
+    amount: arc4.UInt64
+
+
+@subroutine
+def _request_box(request_id: UInt64) -> Bytes:
+    return Bytes(PENDING_REQUEST_PREFIX) + op.itob(request_id)
+
+
+class SafeSendPort(ARC4Contract):
+    def __init__(self) -> None:
+        self.guardian = GlobalState(Bytes)
+        self.safe_limit = GlobalState(UInt64)
+        self.next_request_id = GlobalState(UInt64)
+        self.audit_seq = GlobalState(UInt64)
+
+    @arc4.abimethod(create="require")
+    def create(self) -> None:
+        self.guardian.value = Bytes(b"REPLACE_WITH_GUARDIAN_ADDRESS")
+        self.safe_limit.value = UInt64(0)
+        self.next_request_id.value = UInt64(0)
+        self.audit_seq.value = UInt64(0)
+
+    @arc4.abimethod()
+    def create_audit_log(self) -> None:
+        assert Txn.sender == Global.creator_address
+        for index in urange(audit_log.BOXES):
+            op.Box.create(
+                Bytes(audit_log.BOX_PREFIX) + op.extract(op.itob(index), 7, 1),
+                audit_log.BOX_SIZE,
+            )
+
+    @arc4.abimethod()
+    def set_guardian(self, guardian: arc4.Address) -> None:
+        assert Txn.sender == Global.creator_address
+        self.guardian.value = guardian.bytes
+        self._audit(
+            UInt64(interface.AUDIT_GUARDIAN_SET), guardian.bytes, UInt64(0), UInt64(0)
+        )
+        # One-argument events are logged by hand, algorand-python-testing's
+        # arc4.emit cannot encode one-element tuples
+        log(arc4.arc4_signature("GuardianSet(address)"), guardian)
+
+    @arc4.abimethod()
+    def set_limit(self, limit: arc4.UInt64) -> None:
+        assert Txn.sender == Global.creator_address
+        self.safe_limit.value = limit.native
+        self._audit(
+            UInt64(interface.AUDIT_LIMIT_SET), Txn.sender.bytes, limit.native, UInt64(0)
+        )
+        log(arc4.arc4_signature("LimitSet(uint64)"), limit)
+
+    @subroutine
+    def _audit(self, kind: UInt64, account: Bytes, amount: UInt64, ref: UInt64) -> None:
+        self.audit_seq.value += 1
+        slot = (self.audit_seq.value - 1) % audit_log.CAPACITY
+        op.Box.replace(
+            Bytes(audit_log.BOX_PREFIX)
+            + op.extract(op.itob(slot // audit_log.RECORDS_PER_BOX), 7, 1),
+            slot % audit_log.RECORDS_PER_BOX * audit_log.RECORD_SIZE,
+            op.itob(self.audit_seq.value)
+            + op.itob(Global.round)
+            + op.extract(op.itob(kind), 7, 1)
+            + account
+            + op.itob(amount)
+            + op.itob(ref),
+        )
+
+    @subroutine
+    def _audit_request(
+        self, kind: UInt64, request_id: UInt64, request: PendingRequest
+    ) -> None:
+        self._audit(kind, request.receiver.bytes, request.amount.native, request_id)
+
+    @subroutine
+    def _assert_guardian(self) -> None:
+        assert self.guardian.value != Bytes()
+        assert Txn.sender.bytes == self.guardian.value
+
+    @subroutine
+    def _load_request(self, request_id: UInt64) -> PendingRequest:
+        stored, exists = op.Box.get(_request_box(request_id))
+        assert exists
+        return PendingRequest.from_bytes(stored)
+
+    @subroutine
+    def _settle_request(self, request_id: UInt64) -> PendingRequest:
+        request = self._load_request(request_id)
+        op.Box.delete(_request_box(request_id))
+        return request.copy()
+
+    @subroutine
+    def _pay_out(self, request: PendingRequest) -> None:
+        itxn.Payment(
+            receiver=request.receiver.native, amount=request.amount.native, fee=0
+        ).submit()
+        itxn.Payment(
+            receiver=request.sender.native, amount=interface.REQUEST_DEPOSIT, fee=0
+        ).submit()
+
+    @subroutine
+    def _refund(self, request: PendingRequest) -> None:
+        itxn.Payment(
+            receiver=request.sender.native,
+            amount=request.amount.native + interface.REQUEST_DEPOSIT,
+            fee=0,
+        ).submit()
+
+    @arc4.abimethod()
+    def request_transaction(
+        self,
+        payment: gtxn.PaymentTransaction,
+        receiver: arc4.Address,
+        amount: arc4.UInt64,
+    ) -> RequestOutcome:
+        sender = arc4.Address(Txn.sender)
+        assert payment.receiver == Global.current_application_address
+        if amount.native <= self.safe_limit.value:
+            assert payment.amount == amount.native, "payment must be the amount"
+            itxn.Payment(receiver=receiver.native, amount=amount.native, fee=0).submit()
+            arc4.emit("TransactionAutoApproved", sender, receiver, amount)
+            self._audit(
+                UInt64(interface.AUDIT_AUTO_APPROVED),
+                receiver.bytes,
+                amount.native,
+                UInt64(0),
+            )
+            return RequestOutcome(
+                status=arc4.UInt8(STATUS_AUTO_APPROVED),
+                request_id=arc4.UInt64(0),
+                amount=amount,
+            )
+        assert (
+            payment.amount == amount.native + interface.REQUEST_DEPOSIT
+        ), "payment must be the amount plus the box deposit"
+        request_id = arc4.UInt64(self.next_request_id.value)
+        request = PendingRequest(
+            sender=sender,
+            receiver=receiver,
+            amount=amount,
+            round=arc4.UInt64(Global.round),
+        )
+        op.Box.put(_request_box(request_id.native), request.bytes)
+        self.next_request_id.value = request_id.native + 1
+        arc4.emit("TransactionQueued", request_id, request)
+        self._audit(
+            UInt64(interface.AUDIT_QUEUED),
+            receiver.bytes,
+            amount.native,
+            request_id.native,
+        )
+        return RequestOutcome(
+            status=arc4.UInt8(STATUS_PENDING), request_id=request_id, amount=amount
+        )
+
+    @arc4.abimethod()
+    def approve_transaction(self, request_id: arc4.UInt64) -> PendingRequest:
+        self._assert_guardian()
+        request = self._settle_request(request_id.native)
+        self._pay_out(request)
+        arc4.emit("TransactionApproved", request_id, request)
+        self._audit_request(
+            UInt64(interface.AUDIT_APPROVED), request_id.native, request
+        )
+        return request
+
+    @arc4.abimethod()
+    def approve_transactions(
+        self, request_ids: arc4.DynamicArray[arc4.UInt64], allow_settled: arc4.Bool
+    ) -> arc4.DynamicBytes:
+        self._assert_guardian()
+        bitmap = op.bzero((request_ids.length + 7) // 8)
+        approved = UInt64(0)
+        total = UInt64(0)
+        for index, request_id in uenumerate(request_ids):
+            stored, exists = op.Box.get(_request_box(request_id.native))
+            if exists:
+                request = PendingRequest.from_bytes(stored)
+                op.Box.delete(_request_box(request_id.native))
+                self._pay_out(request)
+                bitmap = op.setbit_bytes(bitmap, index, 1)
+                approved += 1
+                total += request.amount.native
+                self._audit_request(
+                    UInt64(interface.AUDIT_APPROVED), request_id.native, request
+                )
+            else:
+                assert allow_settled.native, "request is not pending"
+        arc4.emit("TransactionsApproved", arc4.UInt64(approved), arc4.UInt64(total))
+        return arc4.DynamicBytes(bitmap)
+
+    @arc4.abimethod()
+    def cancel_request(self, request_id: arc4.UInt64) -> PendingRequest:
+        request = self._settle_request(request_id.native)
+        assert (
+            Txn.sender == request.sender.native
+            or Txn.sender.bytes == self.guardian.value
+        )
+        self._refund(request)
+        arc4.emit("RequestCancelled", request_id, request)
+        self._audit_request(
+            UInt64(interface.AUDIT_CANCELLED), request_id.native, request
+        )
+        return request
+
+    @arc4.abimethod(readonly=True)
+    def get_request(self, request_id: arc4.UInt64) -> PendingRequest:
+        return self._load_request(request_id.native)
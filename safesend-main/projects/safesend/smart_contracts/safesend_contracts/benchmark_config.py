@@ -0,0 +1,66 @@
+# Calls measured by `python -m smart_contracts._helpers.cost_benchmark`. Setup creates
+# the audit log, makes the deployer the guardian, sets a 1 Algo safe limit and queues
+# two requests over it (ids 0 and 1), so approvals and cancellations have pending
+# requests to settle.
+from smart_contracts._helpers.cost_benchmark import MethodCall
+from smart_contracts.safesend_contracts import interface
+
+LIMIT = 1_000_000
+
+
+def _payment(context, amount):
+    """The payment request_transaction takes, from the deployer to the app."""
+    import algokit_utils
+
+    return algokit_utils.PaymentParams(
+        sender=context.deployer,
+        receiver=context.app_address,
+        amount=algokit_utils.AlgoAmount(micro_algo=amount),
+    )
+
+
+def _request(amount):
+    deposit = interface.REQUEST_DEPOSIT if amount > LIMIT else 0
+    return lambda context: [_payment(context, amount + deposit), context.other, amount]
+
+
+setup = [
+    MethodCall("create_audit_log"),
+    MethodCall("set_guardian", lambda context: [context.deployer]),
+    MethodCall("set_limit", [LIMIT]),
+    MethodCall("request_transaction", _request(2 * LIMIT)),
+    MethodCall("request_transaction", _request(2 * LIMIT)),
+]
+
+benchmarks = [
+    MethodCall("set_guardian", lambda context: [context.deployer]),
+    MethodCall("set_limit", [LIMIT]),
+    MethodCall(
+        "request_transaction",
+        _request(LIMIT),
+        name="request_transaction (auto-approved)",
+        inner_transactions=interface.AUTO_APPROVAL_INNER_TRANSACTIONS,
+    ),
+    MethodCall(
+        "request_transaction",
+        _request(2 * LIMIT),
+        name="request_transaction (queued)",
+    ),
+    MethodCall("get_request", [0]),
+    MethodCall(
+        "approve_transaction",
+        [0],
+        inner_transactions=interface.APPROVAL_INNER_TRANSACTIONS,
+    ),
+    MethodCall(
+        "approve_transactions",
+        [[0, 1], False],
+        name="approve_transactions (2 requests)",
+        inner_transactions=2 * interface.APPROVAL_INNER_TRANSACTIONS,
+    ),
+    MethodCall(
+        "cancel_request",
+        [1],
+        inner_transactions=interface.CANCEL_INNER_TRANSACTIONS,
+    ),
+]
@@ -1,6 +1,34 @@
 from beaker import Application, GlobalStateValue, Authorize, client
 from pyteal import *
 
+from smart_contracts._helpers import arc28, audit_log
+from smart_contracts.safesend_contracts import interface
+
+# Box key prefix for pending requests, followed by the 8-byte request id
+PENDING_REQUEST_PREFIX = Bytes("p")
+
+
+# ARC-28 event log: selector followed by the ABI encoded arguments
+def emit(signature: str, *encoded_args):
+    return Log(Concat(Bytes(arc28.selector(signature)), *encoded_args))
+
+
+# Pending guardian approval, stored as one fixed-width 80-byte box per request
+class PendingRequest(abi.NamedTuple):
+    sender: abi.Field[abi.Address]
+    receiver: abi.Field[abi.Address]
+    amount: abi.Field[abi.Uint64]
+    round: abi.Field[abi.Uint64]
+
+
+# Outcome of request_transaction: one of the interface.STATUS_* codes, the id the
+# request was queued under (0 when auto-approved) and the amount requested
+class RequestOutcome(abi.NamedTuple):
+    status: abi.Field[abi.Uint8]
+    request_id: abi.Field[abi.Uint64]
+    amount: abi.Field[abi.Uint64]
+
+
 # Define SafeSend Contract
 class SafeSendApp(Application):
 
@@ -14,6 +42,16 @@ class SafeSendApp(Application):
         stack_type=TealType.uint64, descr="Limit below which txns are auto-approved"
     )
 
+    # Id the next pending request will get, never reused
+    next_request_id = GlobalStateValue(
+        stack_type=TealType.uint64, descr="Id of the next pending request"
+    )
+
+    # Number of audit log records written, see smart_contracts._helpers.audit_log
+    audit_seq = GlobalStateValue(
+        stack_type=TealType.uint64, descr="Audit log records written"
+    )
+
     @Application.create
     def create(self):
         """Create the contract with default guardian and safe limit."""
@@ -22,28 +60,43 @@ class SafeSendApp(Application):
         return Seq(
             self.guardian.set(Bytes("REPLACE_WITH_GUARDIAN_ADDRESS")),
             self.safe_limit.set(Int(0)),
+            self.next_request_id.set(Int(0)),
+            self.audit_seq.set(Int(0)),
+        )
+
+    # Create the audit log boxes (only creator, once the app account is funded)
+    @Application.external(authorize=Authorize.only_creator())
+    def create_audit_log(self):
+        """Create the audit log ring buffer; the app account must hold its minimum balance."""
+        return Seq(
+            *[
+                Pop(App.box_create(Bytes(audit_log.box_name(index)), Int(audit_log.BOX_SIZE)))
+                for index in range(audit_log.BOXES)
+            ]
         )
 
     # Set Guardian (only creator can set)
     @Application.external(authorize=Authorize.only_creator())
-    def set_guardian(self, guardian: abi.Address, *, output: abi.String):
+    def set_guardian(self, guardian: abi.Address):
         """Set the guardian account for large transactions."""
         # CHANGE: added debug print to track guardian updates
         print("Debug: set_guardian called with address:", guardian.get())
         return Seq(
             self.guardian.set(guardian.get()),
-            output.set("Guardian set successfully"),
+            emit(interface.GUARDIAN_SET_EVENT, guardian.encode()),
+            self.audit(interface.AUDIT_GUARDIAN_SET, guardian.get(), Int(0), Int(0)),
         )
 
     # Set Safe Limit (only creator can set)
     @Application.external(authorize=Authorize.only_creator())
-    def set_limit(self, limit: abi.Uint64, *, output: abi.String):
+    def set_limit(self, limit: abi.Uint64):
         """Set the maximum amount allowed for auto-approved transactions."""
         # CHANGE: added debug print to track safe limit updates
         print("Debug: set_limit called with amount:", limit.get())
         return Seq(
             self.safe_limit.set(limit.get()),
-            output.set("Safe limit set successfully"),
+            emit(interface.LIMIT_SET_EVENT, limit.encode()),
+            self.audit(interface.AUDIT_LIMIT_SET, Txn.sender(), limit.get(), Int(0)),
         )
 
     # Helper function to check if transaction is safe
@@ -52,39 +105,164 @@ class SafeSendApp(Application):
         """Check if transaction amount is within the safe limit."""
         return amount.get() <= self.safe_limit.get()
 
+    # Helper functions for the audit log
+    def audit(self, kind: int, account: Expr, amount: Expr, ref: Expr):
+        """Append a record to the audit log, overwriting the oldest once it is full."""
+        slot = ScratchVar(TealType.uint64)
+        return Seq(
+            self.audit_seq.increment(),
+            slot.store((self.audit_seq.get() - Int(1)) % Int(audit_log.CAPACITY)),
+            App.box_replace(
+                Concat(
+                    Bytes(audit_log.BOX_PREFIX),
+                    Extract(Itob(slot.load() / Int(audit_log.RECORDS_PER_BOX)), Int(7), Int(1)),
+                ),
+                slot.load() % Int(audit_log.RECORDS_PER_BOX) * Int(audit_log.RECORD_SIZE),
+                Concat(
+                    Itob(self.audit_seq.get()),
+                    Itob(Global.round()),
+                    Bytes(bytes([kind])),
+                    account,
+                    Itob(amount),
+                    Itob(ref),
+                ),
+            ),
+        )
+
+    def audit_request(self, kind: int, request_id: Expr, request: PendingRequest):
+        """Append a record of a pending request's receiver and amount to the audit log."""
+        receiver = abi.Address()
+        amount = abi.Uint64()
+        return Seq(
+            request.receiver.store_into(receiver),
+            request.amount.store_into(amount),
+            self.audit(kind, receiver.get(), amount.get(), request_id),
+        )
+
+    # Helper functions for the pending request boxes
+    def request_box(self, request_id: Expr):
+        """Box name of a pending request."""
+        return Concat(PENDING_REQUEST_PREFIX, Itob(request_id))
+
+    def load_request(self, request_id: Expr, request: PendingRequest):
+        """Load a pending request into `request`, failing if there is none."""
+        stored = App.box_get(self.request_box(request_id))
+        return Seq(
+            stored,
+            Assert(stored.hasValue()),
+            request.decode(stored.value()),
+        )
+
+    def settle_request(self, request_id: Expr, request: PendingRequest):
+        """Load a pending request and delete its box, reclaiming its minimum balance."""
+        return Seq(
+            self.load_request(request_id, request),
+            Pop(App.box_delete(self.request_box(request_id))),
+        )
+
+    def pay(self, receiver: Expr, amount: Expr):
+        """Send amount from the app account; the caller pools the payment's fee."""
+        return InnerTxnBuilder.Execute(
+            {
+                TxnField.type_enum: TxnType.Payment,
+                TxnField.receiver: receiver,
+                TxnField.amount: amount,
+                TxnField.fee: Int(0),
+            }
+        )
+
+    def pay_out(self, request: PendingRequest):
+        """Send an approved request's escrowed amount to its receiver and its deposit back to its sender."""
+        sender = abi.Address()
+        receiver = abi.Address()
+        amount = abi.Uint64()
+        return Seq(
+            request.sender.store_into(sender),
+            request.receiver.store_into(receiver),
+            request.amount.store_into(amount),
+            self.pay(receiver.get(), amount.get()),
+            self.pay(sender.get(), Int(interface.REQUEST_DEPOSIT)),
+        )
+
+    def refund(self, request: PendingRequest):
+        """Send a cancelled request's escrowed amount and deposit back to its sender."""
+        sender = abi.Address()
+        amount = abi.Uint64()
+        return Seq(
+            request.sender.store_into(sender),
+            request.amount.store_into(amount),
+            self.pay(sender.get(), amount.get() + Int(interface.REQUEST_DEPOSIT)),
+        )
+
     # Request Transaction
     @Application.external
     def request_transaction(
         self,
-        sender: abi.Address,
+        payment: abi.PaymentTransaction,
         receiver: abi.Address,
         amount: abi.Uint64,
         *,
-        output: abi.String,
+        output: RequestOutcome,
     ):
-        """Handle a transaction request."""
+        """
+        Handle a transaction request from its sender, funded by `payment` to the app.
+        A request within the safe limit is paid out at once and its payment must be
+        exactly `amount`. A request over it is queued for the guardian and its payment
+        must be `amount` plus interface.REQUEST_DEPOSIT: the amount is escrowed until
+        the request is approved, when it is paid out, or cancelled, when it is
+        refunded, and the deposit pays for the pending box and is refunded either way.
+        Requests never draw on the app's own balance.
+        """
         # TODO: improve error handling here (e.g., check sender balance)
         # Debug log for tracking
-        print("Debug LOG: request_transaction called by", sender.get(), "for amount:", amount.get())
+        print("Debug LOG: request_transaction called for amount:", amount.get())
 
-        # CHANGE: added output message clarity
+        sender = abi.Address()
+        request = PendingRequest()
+        current_round = abi.Uint64()
+        status = abi.Uint8()
+        request_id = abi.Uint64()
         return Seq(
+            sender.set(Txn.sender()),
+            Assert(
+                payment.get().receiver() == Global.current_application_address(),
+                comment="payment must be made to the app",
+            ),
             If(self.is_safe(amount))
-            .Then(output.set(Concat(Bytes("Transaction auto-approved: "), Itob(amount.get()))))
-            .Else(output.set(Concat(Bytes("Transaction pending guardian approval for amount: "), Itob(amount.get()))))
+            .Then(
+                Assert(payment.get().amount() == amount.get(), comment="payment must be the amount"),
+                self.pay(receiver.get(), amount.get()),
+                status.set(Int(interface.STATUS_AUTO_APPROVED)),
+                request_id.set(Int(0)),
+                emit(interface.TRANSACTION_AUTO_APPROVED_EVENT, sender.encode(), receiver.encode(), amount.encode()),
+                self.audit(interface.AUDIT_AUTO_APPROVED, receiver.get(), amount.get(), Int(0)),
+            )
+            .Else(
+                Assert(
+                    payment.get().amount() == amount.get() + Int(interface.REQUEST_DEPOSIT),
+                    comment="payment must be the amount plus the box deposit",
+                ),
+                status.set(Int(interface.STATUS_PENDING)),
+                request_id.set(self.next_request_id.get()),
+                current_round.set(Global.round()),
+                request.set(sender, receiver, amount, current_round),
+                App.box_put(self.request_box(request_id.get()), request.encode()),
+                self.next_request_id.increment(),
+                emit(interface.TRANSACTION_QUEUED_EVENT, request_id.encode(), request.encode()),
+                self.audit(interface.AUDIT_QUEUED, receiver.get(), amount.get(), request_id.get()),
+            ),
+            output.set(status, request_id, amount),
         )
 
     # Guardian Approves Transaction
     @Application.external
     def approve_transaction(
         self,
-        sender: abi.Address,
-        receiver: abi.Address,
-        amount: abi.Uint64,
+        request_id: abi.Uint64,
         *,
-        output: abi.String,
+        output: PendingRequest,
     ):
-        """Approve transaction as the guardian."""
+        """Approve a pending request as the guardian, paying out its escrow and returning its details."""
         # TODO: improve error handling here (e.g., ensure guardian exists)
         # Debug log for tracking
         print("Debug LOG: approve_transaction called by sender:", Txn.sender())
@@ -93,9 +271,100 @@ class SafeSendApp(Application):
         return Seq(
             Assert(self.guardian.get() != Bytes("")),
             Assert(Txn.sender() == self.guardian.get()),
-            output.set(Concat(Bytes("Transaction approved by guardian for amount: "), Itob(amount.get())))
+            self.settle_request(request_id.get(), output),
+            self.pay_out(output),
+            emit(interface.TRANSACTION_APPROVED_EVENT, request_id.encode(), output.encode()),
+            self.audit_request(interface.AUDIT_APPROVED, request_id.get(), output),
+        )
+
+    # Guardian Approves many pending requests in one call
+    @Application.external
+    def approve_transactions(
+        self,
+        request_ids: abi.DynamicArray[abi.Uint64],
+        allow_settled: abi.Bool,
+        *,
+        output: abi.DynamicBytes,
+    ):
+        """
+        Approve and pay out many pending requests as the guardian. Returns a bitmap
+        with bit i (most significant bit first) set if request_ids[i] was paid out.
+        A request that is not pending fails the call, unless allow_settled is set,
+        in which case it is skipped and its bit left clear.
+        """
+        # The fees of each request's payout and deposit refund are pooled into this
+        # call's fee (interface.APPROVAL_INNER_TRANSACTIONS). Each request needs a box
+        # reference and its receiver available, and the call the audit log box(es) its
+        # records land in; extra app calls in the group pool both references and opcode
+        # budget, so the batch size is only bounded by AVM limits.
+        index = ScratchVar(TealType.uint64)
+        bitmap = ScratchVar(TealType.bytes)
+        approved = ScratchVar(TealType.uint64)
+        total = ScratchVar(TealType.uint64)
+        request_id = abi.Uint64()
+        request = PendingRequest()
+        amount = abi.Uint64()
+        stored = App.box_get(self.request_box(request_id.get()))
+        return Seq(
+            Assert(self.guardian.get() != Bytes("")),
+            Assert(Txn.sender() == self.guardian.get()),
+            bitmap.store(BytesZero((request_ids.length() + Int(7)) / Int(8))),
+            approved.store(Int(0)),
+            total.store(Int(0)),
+            For(
+                index.store(Int(0)),
+                index.load() < request_ids.length(),
+                index.store(index.load() + Int(1)),
+            ).Do(
+                request_ids[index.load()].store_into(request_id),
+                stored,
+                If(stored.hasValue())
+                .Then(
+                    request.decode(stored.value()),
+                    Pop(App.box_delete(self.request_box(request_id.get()))),
+                    self.pay_out(request),
+                    bitmap.store(SetBit(bitmap.load(), index.load(), Int(1))),
+                    request.amount.store_into(amount),
+                    approved.store(approved.load() + Int(1)),
+                    total.store(total.load() + amount.get()),
+                    self.audit_request(interface.AUDIT_APPROVED, request_id.get(), request),
+                )
+                .Else(Assert(allow_settled.get(), comment="request is not pending")),
+            ),
+            emit(interface.TRANSACTIONS_APPROVED_EVENT, Itob(approved.load()), Itob(total.load())),
+            output.set(bitmap.load()),
         )
 
+    # Cancel a pending request (its sender or the guardian)
+    @Application.external
+    def cancel_request(
+        self,
+        request_id: abi.Uint64,
+        *,
+        output: PendingRequest,
+    ):
+        """Cancel a pending request, settling it without approval and refunding its escrow and deposit."""
+        sender = abi.Address()
+        return Seq(
+            self.settle_request(request_id.get(), output),
+            output.sender.store_into(sender),
+            Assert(Or(Txn.sender() == sender.get(), Txn.sender() == self.guardian.get())),
+            self.refund(output),
+            emit(interface.REQUEST_CANCELLED_EVENT, request_id.encode(), output.encode()),
+            self.audit_request(interface.AUDIT_CANCELLED, request_id.get(), output),
+        )
+
+    # Look up a pending request
+    @Application.external(read_only=True)
+    def get_request(
+        self,
+        request_id: abi.Uint64,
+        *,
+        output: PendingRequest,
+    ):
+        """Return a pending request, failing if it has settled or never existed."""
+        return self.load_request(request_id.get(), output)
+
 
 # Boilerplate to allow CLI interaction
 if __name__ == "__main__":
@@ -0,0 +1,559 @@
+"""
+Guardian approval service: follows the SafeSend app's pending requests on chain
+and approves those its policy accepts, in batches.
+
+Usage: python -m smart_contracts.safesend_contracts.guardian_service APP_ID
+[--max-amount MICROALGOS] [--receiver ADDRESS...] [--concurrency N]
+[--queue-size N] [--linger SECONDS] [--checkpoint PATH]
+
+The service reads every block from algod, decodes the app's ARC-28 events and
+queues each TransactionQueued request. Requests the policy accepts are approved
+with `approve_transactions`, REQUESTS_PER_CALL per app call and up to a full
+atomic group of calls per submission, with at most --concurrency groups in
+flight. Requests it rejects stay pending for the guardian to handle by hand.
+When the queue is full the follower stops reading blocks until approvals catch
+up. Failed submissions are retried with backoff, up to MAX_SUBMIT_ATTEMPTS
+times. When the app rejects a group, its requests are split in halves that are
+submitted on their own, so the request it rejects is dropped, and logged for the
+guardian, without holding back the others. A submission that fails otherwise,
+for instance on saving the checkpoint, is logged and stops the service.
+
+The checkpoint file holds the last round up to which every queued request has
+been settled, so a restarted service resumes from the following round. Requests
+that were approved just before a restart are replayed harmlessly, since
+`allow_settled` makes the app skip them.
+
+Approvals are signed by the DEPLOYER account of the network configured in .env,
+which must be the app's guardian. algod is only used through `status`,
+`status_after_block` and msgpack `block_info`, so a local stand-in providing
+those (an HTTP server, or any object with those methods) can replace it, as can
+the `submit` callable that sends approval groups.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import statistics
+import time
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from smart_contracts._helpers import arc28
+from smart_contracts.safesend_contracts import interface
+
+if TYPE_CHECKING:
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
+    )
+
+logger = logging.getLogger(__name__)
+
+MAX_GROUP_SIZE = 16
+# Each approved request references its box, its receiver and its sender, who gets
+# the deposit back, and an app call may reference at most 8 resources; the other
+# two are left for the audit log box(es) algokit_utils adds for the records of
+# the approvals
+REQUESTS_PER_CALL = 2
+PENDING_REQUEST_PREFIX = b"p"
+MAX_RETRY_DELAY = 30.0
+MAX_SUBMIT_ATTEMPTS = 5
+
+checkpoint_path = (
+    Path(__file__).parents[2] / ".algokit" / "checkpoints" / "guardian.json"
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class PendingRequest:
+    request_id: int
+    sender: str
+    receiver: str
+    amount: int
+    round: int
+    # Timestamp of the block that queued the request, for end-to-end latency
+    requested_at: float
+
+    @property
+    def box_name(self) -> bytes:
+        return PENDING_REQUEST_PREFIX + self.request_id.to_bytes(8, "big")
+
+
+@dataclasses.dataclass
+class Policy:
+    """Decides which pending requests the service approves."""
+
+    max_amount: int | None = None
+    receivers: frozenset[str] | None = None
+
+    def accepts(self, request: PendingRequest) -> bool:
+        if self.max_amount is not None and request.amount > self.max_amount:
+            return False
+        return self.receivers is None or request.receiver in self.receivers
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    """The last round of an app whose queued requests have all been settled."""
+
+    path: Path
+    app_id: int
+    round: int | None = None
+
+    @classmethod
+    def load(cls, path: Path, app_id: int) -> "Checkpoint":
+        """Loads the checkpoint, starting without one if it is missing or for another app."""
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls(path=path, app_id=app_id)
+        if data.get("app_id") != app_id:
+            return cls(path=path, app_id=app_id)
+        return cls(path=path, app_id=app_id, round=data.get("round"))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        temporary_path = self.path.with_name(f".{self.path.name}.tmp")
+        temporary_path.write_text(
+            json.dumps({"app_id": self.app_id, "round": self.round})
+        )
+        os.replace(temporary_path, self.path)
+
+
+@dataclasses.dataclass
+class Metrics:
+    started: float = dataclasses.field(default_factory=time.monotonic)
+    approved: int = 0
+    # Requests that were already settled (approved or cancelled) when submitted
+    skipped: int = 0
+    rejected: int = 0
+    # Requests given up on after the app rejected them or submissions kept failing
+    dropped: int = 0
+    failed_submissions: int = 0
+    latencies: list[float] = dataclasses.field(default_factory=list)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        text = (
+            f"{self.approved} approved ({self.approved / elapsed:.1f}/s), "
+            f"{self.skipped} already settled, {self.rejected} rejected by policy, "
+            f"{self.dropped} dropped, {self.failed_submissions} failed submission(s)"
+        )
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            text += (
+                f"; latency from request block p50 "
+                f"{statistics.median(latencies):.2f}s, p95 {p95:.2f}s, "
+                f"max {latencies[-1]:.2f}s"
+            )
+        return text
+
+
+def _app_call_logs(signed_txn: dict, app_id: int) -> Iterator[list[bytes]]:
+    """Yields the logs of each call to `app_id` in a block transaction, inner ones included."""
+    txn = signed_txn.get(b"txn", {})
+    apply_data = signed_txn.get(b"dt", {})
+    if txn.get(b"type") == b"appl" and txn.get(b"apid") == app_id:
+        yield apply_data.get(b"lg", [])
+    for inner_txn in apply_data.get(b"itx", []):
+        yield from _app_call_logs(inner_txn, app_id)
+
+
+def unpack_block(raw_block: bytes) -> dict:
+    """
+    Decodes a msgpack block from algod. Strings are left as bytes, since logs
+    are msgpack strings holding arbitrary bytes, so keys are bytes too.
+    """
+    import msgpack
+
+    return msgpack.unpackb(raw_block, raw=True, strict_map_key=False)
+
+
+def decode_block(block: dict, app_id: int) -> tuple[list[PendingRequest], list[int]]:
+    """
+    Returns the requests queued in a block decoded by `unpack_block`, and the
+    ids of the requests approved one at a time or cancelled in it.
+    """
+    header = block[b"block"]
+    queued: list[PendingRequest] = []
+    settled: list[int] = []
+    for signed_txn in header.get(b"txns", []):
+        for logs in _app_call_logs(signed_txn, app_id):
+            for event in arc28.decode_logs(logs, interface.EVENTS):
+                if event.signature == interface.TRANSACTION_QUEUED_EVENT:
+                    request_id, (sender, receiver, amount, round_) = event.values
+                    queued.append(
+                        PendingRequest(
+                            request_id=request_id,
+                            sender=sender,
+                            receiver=receiver,
+                            amount=amount,
+                            round=round_,
+                            requested_at=header.get(b"ts", 0),
+                        )
+                    )
+                elif event.signature in (
+                    interface.TRANSACTION_APPROVED_EVENT,
+                    interface.REQUEST_CANCELLED_EVENT,
+                ):
+                    settled.append(event.values[0])
+    return queued, settled
+
+
+def algorand_submitter(
+    app_client: "SafesendContractsClient",
+) -> Callable[[Sequence[Sequence[PendingRequest]]], set[int]]:
+    """
+    Returns a function that sends one `approve_transactions` call per list of
+    requests, as one atomic group, and returns the ids that were paid out.
+    """
+    import algokit_utils
+
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        ApproveTransactionsArgs,
+    )
+
+    def submit(calls: Sequence[Sequence[PendingRequest]]) -> set[int]:
+        min_fee = app_client.algorand.get_suggested_params().min_fee
+        composer = app_client.new_group()
+        for call in calls:
+            composer.approve_transactions(
+                args=ApproveTransactionsArgs(
+                    request_ids=[request.request_id for request in call],
+                    allow_settled=True,
+                ),
+                params=algokit_utils.CommonAppCallParams(
+                    account_references=list(
+                        dict.fromkeys(
+                            account
+                            for request in call
+                            for account in (request.receiver, request.sender)
+                        )
+                    ),
+                    box_references=[request.box_name for request in call],
+                    # Covers the inner payments, whose fees are pooled into the call
+                    extra_fee=algokit_utils.AlgoAmount(
+                        micro_algo=min_fee
+                        * interface.APPROVAL_INNER_TRANSACTIONS
+                        * len(call)
+                    ),
+                ),
+            )
+        result = composer.send()
+        paid: set[int] = set()
+        for call, returned in zip(calls, result.returns):
+            bitmap = bytes(returned.value)
+            paid.update(
+                request.request_id
+                for index, request in enumerate(call)
+                if bitmap[index // 8] & (0x80 >> index % 8)
+            )
+        return paid
+
+    return submit
+
+
+def _is_rejected(ex: Exception) -> bool:
+    """Whether a submission failed because the app rejected it, so retrying can't help."""
+    return "logic eval error" in str(ex)
+
+
+class GuardianService:
+    def __init__(
+        self,
+        algod: Any,
+        submit: Callable[[Sequence[Sequence[PendingRequest]]], set[int]],
+        app_id: int,
+        policy: Policy,
+        checkpoint: Checkpoint,
+        concurrency: int = 4,
+        queue_size: int = 1024,
+        linger: float = 0.5,
+    ):
+        self.algod = algod
+        self.submit = submit
+        self.app_id = app_id
+        self.policy = policy
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.linger = linger
+        self.batch_size = MAX_GROUP_SIZE * REQUESTS_PER_CALL
+        self.queue: asyncio.Queue[PendingRequest] = asyncio.Queue(queue_size)
+        self.metrics = Metrics()
+        # Queued requests not yet settled, by id, with the round that queued them
+        self.unsettled: dict[int, int] = {}
+        self.followed_round: int | None = None
+        # Failed with the first exception a submission raises, which stops `run`
+        self.submission_failure: asyncio.Future[None] | None = None
+
+    def _settle(self, request_id: int) -> None:
+        self.unsettled.pop(request_id, None)
+        self._advance_checkpoint()
+
+    def _advance_checkpoint(self) -> None:
+        if self.followed_round is None:
+            return
+        settled_round = (
+            min(self.unsettled.values()) - 1 if self.unsettled else self.followed_round
+        )
+        if settled_round != self.checkpoint.round:
+            self.checkpoint.round = settled_round
+            self.checkpoint.save()
+
+    async def follow(self) -> None:
+        """Reads blocks from the checkpoint on, queueing the app's new requests."""
+        if self.checkpoint.round is not None:
+            next_round = self.checkpoint.round + 1
+        else:
+            status = await asyncio.to_thread(self.algod.status)
+            next_round = status["last-round"] + 1
+        last_round = next_round - 1
+        logger.info(f"Following app {self.app_id} from round {next_round}")
+        while True:
+            if next_round > last_round:
+                # Long-polls until algod has the next block
+                status = await asyncio.to_thread(
+                    self.algod.status_after_block, next_round - 1
+                )
+                last_round = status["last-round"]
+                continue
+            raw_block = await asyncio.to_thread(
+                self.algod.block_info, next_round, response_format="msgpack"
+            )
+            queued, settled = decode_block(unpack_block(raw_block), self.app_id)
+            for request in queued:
+                self.unsettled[request.request_id] = request.round
+            for request in queued:
+                # Waits while the queue is full, so blocks are only read as fast
+                # as requests are approved
+                await self.queue.put(request)
+            self.followed_round = next_round
+            for request_id in settled:
+                self.unsettled.pop(request_id, None)
+            self._advance_checkpoint()
+            next_round += 1
+
+    async def _next_batch(self) -> list[PendingRequest]:
+        """Waits for a request, then gathers more for up to `linger` seconds."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+        return batch
+
+    async def approve(self) -> None:
+        """Applies the policy to queued requests and submits approval groups."""
+        in_flight = asyncio.Semaphore(self.concurrency)
+        submissions: set[asyncio.Task] = set()
+        while True:
+            batch = await self._next_batch()
+            accepted = []
+            for request in batch:
+                if request.request_id not in self.unsettled:
+                    continue  # approved or cancelled on chain meanwhile
+                if self.policy.accepts(request):
+                    accepted.append(request)
+                else:
+                    logger.info(
+                        f"Leaving request {request.request_id} for the guardian"
+                    )
+                    self.metrics.rejected += 1
+                    self._settle(request.request_id)
+            if not accepted:
+                continue
+            # Waits while `concurrency` groups are in flight; the queue then
+            # fills up and holds back the follower
+            await in_flight.acquire()
+            submission = asyncio.create_task(self._submit(accepted, in_flight))
+            submissions.add(submission)
+            submission.add_done_callback(submissions.discard)
+            submission.add_done_callback(self._submission_done)
+
+    def _submission_done(self, submission: asyncio.Task) -> None:
+        """Logs a submission that raised, such as on failing to save the
+        checkpoint, and stops the service."""
+        if submission.cancelled() or submission.exception() is None:
+            return
+        ex = submission.exception()
+        logger.error("Submitting approvals failed, stopping", exc_info=ex)
+        if self.submission_failure is not None and not self.submission_failure.done():
+            self.submission_failure.set_exception(ex)
+
+    async def _submit(
+        self, requests: list[PendingRequest], in_flight: asyncio.Semaphore
+    ) -> None:
+        """Submits approvals for requests, releasing the `in_flight` slot the
+        caller acquired when done, even if settling them raises."""
+        holding = True
+        try:
+            # Batches still to submit, with the number of times each has failed
+            batches = [(requests, 0)]
+            while batches:
+                batch, failures = batches.pop()
+                calls = [
+                    batch[start : start + REQUESTS_PER_CALL]
+                    for start in range(0, len(batch), REQUESTS_PER_CALL)
+                ]
+                try:
+                    paid = await asyncio.to_thread(self.submit, calls)
+                except Exception as ex:
+                    self.metrics.failed_submissions += 1
+                    failures += 1
+                    if _is_rejected(ex) and len(batch) > 1:
+                        logger.warning(
+                            f"The app rejected approving {len(batch)} request(s), "
+                            f"submitting them in halves: {ex}"
+                        )
+                        middle = len(batch) // 2
+                        batches += [(batch[middle:], 0), (batch[:middle], 0)]
+                    elif _is_rejected(ex) or failures == MAX_SUBMIT_ATTEMPTS:
+                        self._drop(batch, ex)
+                    else:
+                        delay = min(MAX_RETRY_DELAY, 2 ** (failures - 1))
+                        logger.warning(
+                            f"Approving {len(batch)} request(s) failed, "
+                            f"retrying in {delay}s: {ex}"
+                        )
+                        in_flight.release()
+                        holding = False
+                        await asyncio.sleep(delay)
+                        await in_flight.acquire()
+                        holding = True
+                        batches.append((batch, failures))
+                    continue
+                now = time.time()
+                for request in batch:
+                    if request.request_id in paid:
+                        self.metrics.approved += 1
+                        self.metrics.latencies.append(now - request.requested_at)
+                    else:
+                        self.metrics.skipped += 1
+                    self._settle(request.request_id)
+                logger.info(
+                    f"Approved {len(paid)} of {len(batch)} request(s) "
+                    f"in {len(calls)} call(s)"
+                )
+        finally:
+            if holding:
+                in_flight.release()
+
+    def _drop(self, requests: list[PendingRequest], ex: Exception) -> None:
+        """Gives up on approving requests, leaving them pending for the guardian."""
+        for request in requests:
+            logger.error(
+                f"Leaving request {request.request_id} for the guardian, "
+                f"approving it failed: {ex}"
+            )
+            self.metrics.dropped += 1
+            self._settle(request.request_id)
+
+    async def report(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(self.metrics.summary())
+
+    async def run(self, report_interval: float = 30.0) -> None:
+        self.submission_failure = asyncio.get_running_loop().create_future()
+        tasks = [
+            asyncio.create_task(self.follow()),
+            asyncio.create_task(self.approve()),
+            asyncio.create_task(self.report(report_interval)),
+        ]
+        try:
+            # The tasks only return by raising, which stops the service, as does
+            # a submission raising
+            done, _ = await asyncio.wait(
+                [*tasks, self.submission_failure],
+                return_when=asyncio.FIRST_EXCEPTION,
+            )
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            logger.info(self.metrics.summary())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m smart_contracts.safesend_contracts.guardian_service"
+    )
+    parser.add_argument("app_id", type=int)
+    parser.add_argument(
+        "--max-amount",
+        type=int,
+        default=None,
+        help="Leave requests over this many microAlgos for the guardian",
+    )
+    parser.add_argument(
+        "--receiver",
+        action="append",
+        default=None,
+        help="Only approve payments to these receivers (repeatable)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Approval groups in flight"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1024,
+        help="Requests queued before the service stops reading blocks",
+    )
+    parser.add_argument(
+        "--linger",
+        type=float,
+        default=0.5,
+        help="Seconds to wait for more requests to fill a group",
+    )
+    parser.add_argument("--checkpoint", type=Path, default=checkpoint_path)
+    options = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    from smart_contracts._helpers import session
+    from smart_contracts.artifacts.safesend_contracts.safesend_contracts_client import (
+        SafesendContractsClient,
+    )
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    load_dotenv()
+    algorand = session.algorand_client()
+    guardian = session.deployer_account()
+    app_client = algorand.client.get_typed_app_client_by_id(
+        SafesendContractsClient, app_id=options.app_id, default_sender=guardian.address
+    )
+    service = GuardianService(
+        algod=algorand.client.algod,
+        submit=algorand_submitter(app_client),
+        app_id=options.app_id,
+        policy=Policy(
+            max_amount=options.max_amount,
+            receivers=frozenset(options.receiver) if options.receiver else None,
+        ),
+        checkpoint=Checkpoint.load(options.checkpoint, options.app_id),
+        concurrency=options.concurrency,
+        queue_size=options.queue_size,
+        linger=options.linger,
+    )
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Network: {session.stats().summary()}")
+
+
+if __name__ == "__main__":
+    main()
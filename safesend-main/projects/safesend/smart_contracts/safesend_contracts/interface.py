@@ -0,0 +1,68 @@
+"""
+Return status codes, ARC-28 events and audit log record kinds of the SafeSend
+app, shared by contract.py and off-chain code, which decodes the events with
+`smart_contracts._helpers.arc28.decode_logs` and the audit log with
+`smart_contracts._helpers.audit_log.read`.
+"""
+
+# RequestOutcome.status returned by request_transaction
+STATUS_AUTO_APPROVED = 0
+STATUS_PENDING = 1
+
+# A pending request as stored in its box and returned by approve/cancel/get:
+# sender, receiver, amount, round
+PENDING_REQUEST = "(address,address,uint64,uint64)"
+
+# Requests are funded by request_transaction's payment argument, never by the
+# app's own balance. An auto-approved request pays exactly its amount, which the
+# app pays out at once. A queued request pays its amount, escrowed until it is
+# approved or cancelled, plus this deposit: the minimum balance of its box (2500 +
+# 400 per byte of its 9-byte name and 80-byte value), refunded to the requester
+# when the request settles either way
+REQUEST_DEPOSIT = 2_500 + 400 * (1 + 8 + 80)
+# Inner payments per call or settled request, whose fees the caller pools into
+# its own: the payout of an auto-approved request, the payout and the deposit
+# refund when approved, the refund of amount and deposit when cancelled
+AUTO_APPROVAL_INNER_TRANSACTIONS = 1
+APPROVAL_INNER_TRANSACTIONS = 2
+CANCEL_INNER_TRANSACTIONS = 1
+
+GUARDIAN_SET_EVENT = "GuardianSet(address)"
+LIMIT_SET_EVENT = "LimitSet(uint64)"
+# sender, receiver, amount
+TRANSACTION_AUTO_APPROVED_EVENT = "TransactionAutoApproved(address,address,uint64)"
+# request id, request
+TRANSACTION_QUEUED_EVENT = f"TransactionQueued(uint64,{PENDING_REQUEST})"
+TRANSACTION_APPROVED_EVENT = f"TransactionApproved(uint64,{PENDING_REQUEST})"
+REQUEST_CANCELLED_EVENT = f"RequestCancelled(uint64,{PENDING_REQUEST})"
+# Logged once by approve_transactions: requests paid out, total paid. Per request
+# events could exceed the AVM's 1 KB of logs per call on large batches
+TRANSACTIONS_APPROVED_EVENT = "TransactionsApproved(uint64,uint64)"
+
+EVENTS = [
+    GUARDIAN_SET_EVENT,
+    LIMIT_SET_EVENT,
+    TRANSACTION_AUTO_APPROVED_EVENT,
+    TRANSACTION_QUEUED_EVENT,
+    TRANSACTION_APPROVED_EVENT,
+    REQUEST_CANCELLED_EVENT,
+    TRANSACTIONS_APPROVED_EVENT,
+]
+
+# Audit log record kinds, with the account, amount and ref each records. Every
+# request approved by approve_transactions gets its own record
+AUDIT_AUTO_APPROVED = 1  # receiver, amount, 0
+AUDIT_QUEUED = 2  # receiver, amount, request id
+AUDIT_APPROVED = 3  # receiver, amount, request id
+AUDIT_CANCELLED = 4  # receiver, amount, request id
+AUDIT_GUARDIAN_SET = 5  # guardian, 0, 0
+AUDIT_LIMIT_SET = 6  # creator, limit, 0
+
+AUDIT_KINDS = {
+    AUDIT_AUTO_APPROVED: "AutoApproved",
+    AUDIT_QUEUED: "Queued",
+    AUDIT_APPROVED: "Approved",
+    AUDIT_CANCELLED: "Cancelled",
+    AUDIT_GUARDIAN_SET: "GuardianSet",
+    AUDIT_LIMIT_SET: "LimitSet",
+}
@@ -0,0 +1,95 @@
+# Scenarios run by `python -m smart_contracts._helpers.load_test` against the
+# algopy port of the app. The default sender creates it and is its guardian, its
+# audit log is created, the safe limit is LIMIT and requests over it are queued in
+# boxes until approved; every request pays its amount, and queued ones the box
+# deposit too, to the app.
+from smart_contracts._helpers.load_test import (
+    Scenario,
+    deterministic_addresses,
+    fund,
+)
+from smart_contracts.safesend_contracts import interface
+
+LIMIT = 1_000_000
+BATCH_SIZE = 8  # requests settled per approve_transactions call
+
+
+def _create(context, rng):
+    from algopy import arc4
+
+    from smart_contracts.safesend_contracts.algopy_port import SafeSendPort
+
+    contract = SafeSendPort()
+    contract.create()
+    fund(context, context.ledger.get_app(contract).address)
+    contract.create_audit_log()
+    contract.set_guardian(arc4.Address(context.default_sender))
+    contract.set_limit(arc4.UInt64(LIMIT))
+    return contract, [
+        arc4.Address(address) for address in deterministic_addresses(rng, 64)
+    ]
+
+
+def _payment(context, contract, amount):
+    """The payment request_transaction takes for a request of `amount`."""
+    from algopy import UInt64
+
+    deposit = interface.REQUEST_DEPOSIT if amount.native > LIMIT else 0
+    return context.any.txn.payment(
+        receiver=context.ledger.get_app(contract).address,
+        amount=UInt64(amount.native.value + deposit),
+    )
+
+
+def request_transaction(context, rng):
+    """Requests below and above the limit, so about half are queued."""
+    from algopy import arc4
+
+    contract, accounts = _create(context, rng)
+    requests = [
+        (rng.choice(accounts), arc4.UInt64(rng.randint(1, 2 * LIMIT)))
+        for _ in range(1_024)
+    ]
+
+    def call(number):
+        receiver, amount = requests[number % len(requests)]
+        contract.request_transaction(
+            _payment(context, contract, amount), receiver, amount
+        )
+        return amount.native.value
+
+    return call
+
+
+def approve_transactions(context, rng):
+    """Queues BATCH_SIZE requests over the limit, then approves them in one call."""
+    from algopy import arc4
+
+    contract, accounts = _create(context, rng)
+    amounts = [arc4.UInt64(rng.randint(LIMIT + 1, 2 * LIMIT)) for _ in range(1_024)]
+    allow_settled = arc4.Bool(False)
+
+    def call(number):
+        step = number % (BATCH_SIZE + 1)
+        if step < BATCH_SIZE:
+            amount = amounts[number % len(amounts)]
+            contract.request_transaction(
+                _payment(context, contract, amount),
+                accounts[number % len(accounts)],
+                amount,
+            )
+            return 0
+        first = contract.next_request_id.value - BATCH_SIZE
+        bitmap = contract.approve_transactions(
+            arc4.DynamicArray(*(arc4.UInt64(first + i) for i in range(BATCH_SIZE))),
+            allow_settled,
+        )
+        return sum(bin(byte).count("1") for byte in bitmap.native.value)
+
+    return call
+
+
+scenarios = [
+    Scenario("request_transaction", request_transaction),
+    Scenario("approve_transactions", approve_transactions, calls=50_000),
+]
@@ -0,0 +1,252 @@
+import asyncio
+from pathlib import Path
+
+import msgpack
+import pytest
+from algosdk.abi import ABIType
+from algosdk.encoding import encode_address
+
+from smart_contracts._helpers import arc28
+from smart_contracts.safesend_contracts import guardian_service, interface
+from smart_contracts.safesend_contracts.guardian_service import (
+    Checkpoint,
+    GuardianService,
+    PendingRequest,
+    Policy,
+)
+
+APP_ID = 1234
+SENDER = encode_address(bytes(range(32)))
+RECEIVER = encode_address(bytes(range(32, 64)))
+
+
+def event_log(signature: str, *values) -> bytes:
+    arguments = signature.split("(", 1)[1]
+    return arc28.selector(signature) + ABIType.from_string(f"({arguments}").encode(
+        list(values)
+    )
+
+
+def app_call(app_id: int, logs: list[bytes], inner: list[dict] | None = None) -> dict:
+    apply_data: dict = {b"lg": logs}
+    if inner:
+        apply_data[b"itx"] = inner
+    return {b"txn": {b"type": b"appl", b"apid": app_id}, b"dt": apply_data}
+
+
+def pack_block(txns: list[dict], timestamp: int = 1_700_000_000) -> bytes:
+    # algod encodes byte strings, logs included, as msgpack str
+    return msgpack.packb(
+        {b"block": {b"rnd": 10, b"ts": timestamp, b"txns": txns}}, use_bin_type=False
+    )
+
+
+def test_decode_block_reads_events_from_msgpack_block():
+    # Amounts with 0xff bytes make the logs invalid UTF-8, as logs often are
+    amount = 0xFFFF_FFFF
+    request = [SENDER, RECEIVER, amount, 9]
+    raw_block = pack_block(
+        [
+            app_call(
+                APP_ID,
+                [event_log(interface.TRANSACTION_QUEUED_EVENT, 7, request), b"\xff"],
+            ),
+            # Settled by an inner call from another app
+            app_call(
+                99,
+                [],
+                inner=[
+                    app_call(
+                        APP_ID,
+                        [event_log(interface.REQUEST_CANCELLED_EVENT, 3, request)],
+                    )
+                ],
+            ),
+            # Events of other apps are ignored
+            app_call(99, [event_log(interface.TRANSACTION_APPROVED_EVENT, 4, request)]),
+            {b"txn": {b"type": b"pay"}},
+        ]
+    )
+
+    queued, settled = guardian_service.decode_block(
+        guardian_service.unpack_block(raw_block), APP_ID
+    )
+
+    assert queued == [
+        PendingRequest(
+            request_id=7,
+            sender=SENDER,
+            receiver=RECEIVER,
+            amount=amount,
+            round=9,
+            requested_at=1_700_000_000,
+        )
+    ]
+    assert settled == [3]
+
+
+def test_decode_block_without_transactions():
+    raw_block = msgpack.packb({b"block": {b"rnd": 10}}, use_bin_type=False)
+
+    assert guardian_service.decode_block(
+        guardian_service.unpack_block(raw_block), APP_ID
+    ) == ([], [])
+
+
+def pending(request_id: int) -> PendingRequest:
+    return PendingRequest(
+        request_id=request_id,
+        sender=SENDER,
+        receiver=RECEIVER,
+        amount=1,
+        round=request_id + 1,
+        requested_at=0,
+    )
+
+
+def run_submit(tmp_path: Path, submit, requests: list[PendingRequest]):
+    service = GuardianService(
+        algod=None,
+        submit=submit,
+        app_id=APP_ID,
+        policy=Policy(),
+        checkpoint=Checkpoint(path=tmp_path / "checkpoint.json", app_id=APP_ID),
+    )
+    service.followed_round = 100
+    service.unsettled = {request.request_id: request.round for request in requests}
+
+    async def main():
+        in_flight = asyncio.Semaphore(1)
+        await in_flight.acquire()
+        await service._submit(requests, in_flight)
+        # The submission released its slot
+        assert not in_flight.locked()
+
+    asyncio.run(main())
+    return service
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    async def sleep(delay):
+        pass
+
+    monkeypatch.setattr(guardian_service.asyncio, "sleep", sleep)
+
+
+def test_submit_drops_the_request_the_app_rejects(tmp_path):
+    submitted: list[list[int]] = []
+
+    def submit(calls):
+        ids = [request.request_id for call in calls for request in call]
+        submitted.append(ids)
+        if 5 in ids:
+            raise RuntimeError("logic eval error: assert failed pc=123")
+        return set(ids)
+
+    requests = [pending(request_id) for request_id in range(8)]
+    service = run_submit(tmp_path, submit, requests)
+
+    assert service.metrics.approved == 7
+    assert service.metrics.dropped == 1
+    # Only halves holding the rejected request are split further
+    assert submitted == [
+        [0, 1, 2, 3, 4, 5, 6, 7],
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        [4, 5],
+        [4],
+        [5],
+        [6, 7],
+    ]
+    assert service.unsettled == {}
+    assert service.checkpoint.round == 100
+
+
+def test_submit_gives_up_after_max_attempts(tmp_path):
+    attempts = 0
+
+    def submit(calls):
+        nonlocal attempts
+        attempts += 1
+        raise OSError("connection refused")
+
+    service = run_submit(tmp_path, submit, [pending(0), pending(1)])
+
+    assert attempts == guardian_service.MAX_SUBMIT_ATTEMPTS
+    assert service.metrics.dropped == 2
+    assert service.metrics.approved == 0
+    assert service.unsettled == {}
+
+
+def test_submit_retries_transient_failures(tmp_path):
+    failures = iter([OSError("timed out")])
+
+    def submit(calls):
+        ex = next(failures, None)
+        if ex:
+            raise ex
+        return {request.request_id for call in calls for request in call}
+
+    service = run_submit(tmp_path, submit, [pending(0), pending(1), pending(2)])
+
+    assert service.metrics.failed_submissions == 1
+    assert service.metrics.approved == 3
+    assert service.metrics.dropped == 0
+
+
+class FailingCheckpoint(Checkpoint):
+    def save(self) -> None:
+        raise OSError("No space left on device")
+
+
+def approve_all(calls):
+    return {request.request_id for call in calls for request in call}
+
+
+def failing_service(tmp_path: Path) -> GuardianService:
+    service = GuardianService(
+        algod=None,
+        submit=approve_all,
+        app_id=APP_ID,
+        policy=Policy(),
+        checkpoint=FailingCheckpoint(path=tmp_path / "checkpoint.json", app_id=APP_ID),
+        linger=0,
+    )
+    service.followed_round = 100
+    return service
+
+
+def test_submit_releases_its_slot_when_settling_raises(tmp_path):
+    service = failing_service(tmp_path)
+    service.unsettled = {0: 1}
+
+    async def main():
+        in_flight = asyncio.Semaphore(1)
+        await in_flight.acquire()
+        with pytest.raises(OSError, match="No space left"):
+            await service._submit([pending(0)], in_flight)
+        assert not in_flight.locked()
+
+    asyncio.run(main())
+    assert service.metrics.approved == 1
+
+
+def test_a_failed_submission_is_logged_and_stops_the_service(tmp_path, caplog):
+    service = failing_service(tmp_path)
+
+    async def follow():
+        service.unsettled[0] = 1
+        await service.queue.put(pending(0))
+        await asyncio.Event().wait()
+
+    async def report(interval):
+        # asyncio.sleep returns at once here
+        await asyncio.Event().wait()
+
+    service.follow = follow
+    service.report = report
+
+    with pytest.raises(OSError, match="No space left"):
+        asyncio.run(asyncio.wait_for(service.run(), timeout=5))
+    assert "Submitting approvals failed, stopping" in caplog.text